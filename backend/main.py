@@ -1,11 +1,37 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from pydantic import BaseModel, Field
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
 import math
-import random
+import os
+import time
+
+import numpy as np
+
+import middleend_path  # noqa: F401  (middleend modüllerini import yoluna ekler)
+from engine.profiling import profiled
+from engine.atmosphere import air_properties
+from engine.frame_stream import init_eruption, step_eruption, encode_frame, frame_point_budget, decimation_stride
+from engine.surrogate import load_surrogate, predict, default_model_path
 
 app = FastAPI()
 
+# Belirsizlik bandı (ensemble) ayarları
+ensemble_limit = int(os.environ.get('VOLCANO_ENSEMBLE_MAX', 10000))  # İstekte izin verilen en büyük ensemble_size
+ensemble_budget_ms = float(os.environ.get('VOLCANO_ENSEMBLE_BUDGET_MS', 50))  # Ensemble hesabı için süre bütçesi
+ensemble_chunk = 4096  # Bütçe kontrolleri arasında hesaplanan çekiliş sayısı
+wind_gust_range = (-2, 5)  # Ortalama rüzgara eklenen rastgele esinti (m/s)
+impact_distances = [5, 10, 20, 50]  # Etki noktası mesafeleri (km)
+
+# Partikül akışı (/ws/simulate) ayarları
+stream_max_particles = int(os.environ.get('VOLCANO_STREAM_MAX_PARTICLES', 200000))  # İstekte izin verilen en fazla partikül
+stream_max_frames = int(os.environ.get('VOLCANO_STREAM_MAX_FRAMES', 3000))  # İstekte izin verilen en fazla kare
+stream_max_kbps = float(os.environ.get('VOLCANO_STREAM_MAX_KBPS', 8000))  # Bağlantı başına bant genişliği sınırı (kB/s)
+stream_queue_size = 2  # Gönderilmeyi bekleyen en fazla kare; istemci yetişemezse en eski kare atılır
+
+# Vekil model (/surrogate) dosyası: python -m engine.surrogate ile kurulur
+surrogate_path = os.environ.get('VOLCANO_SURROGATE_PATH', default_model_path)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -23,6 +49,7 @@ class VolcanoRequest(BaseModel):
     elevation: float
     status: str  # YENİ: Yanardağın aktiflik durumu
     location: Location
+    ensemble_size: int = Field(0, ge=0, le=ensemble_limit)  # > 0 ise P5/P50/P95 belirsizlik bandı da hesaplanır
 
 # --- BİLİMSEL HESAPLAMA MOTORU ---
 
@@ -39,25 +66,49 @@ def get_activity_factor(status: str) -> float:
         return 0.05 # Sönmüş (Çok Düşük Risk)
     return 0.5 # Bilinmeyen
 
-def calculate_atmosphere(lat: float, elevation: float):
+@profiled()
+def risk_draws(pressure, activity, mean_wind, n, rng=None):
+    """
+    calculate_risk'in rastgele girdilerinden (Monte Carlo varyasyonu ve rüzgar esintisi) n çekiliş
+    ve onlardan türeyen risk değerleri.
+
+    Tüm formüller NumPy dizileri üzerinde tek yerde hesaplanır: başlık değerleri n = 1 ile,
+    belirsizlik bandı n = ensemble_size ile çağrılır. Dönen sözlükteki diziler (n,) boyutludur;
+    'energies' (len(impact_distances), n) boyutludur.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    variance = rng.uniform(0.9, 1.1, n)
+    # Yüksek irtifada sürtünme azalır, rüzgar tropopozdaki jete doğru artar; esinti eklenir, negatif olamaz
+    wind_speed = np.maximum(0, mean_wind + rng.uniform(*wind_gust_range, n))
+
+    # Ezilme Mesafesi (Balistik): basınç ne kadar yüksekse kayaçlar o kadar uzağa fırlar
+    blast_radius = (pressure ** 0.45) / 9.81 * variance
+    # Sönmüş yanardağlar için yarıçapı çok küçült
+    if activity < 0.2:
+        blast_radius = blast_radius / 10
+
+    return {
+        "variance": variance,
+        "wind_speed": wind_speed,
+        "drag_factor": np.minimum(0.1 + wind_speed / 50, 1.0),  # Sürüklenme Katsayısı
+        "blast_radius": blast_radius,
+        "safe_zone": blast_radius * 1.2 if activity > 0.2 else np.zeros(n),  # Güvenli Bölge
+        "vei_score": np.log10(np.maximum(blast_radius, 1)) * activity * 1.5,  # VEI Tahmini
+        # Etki noktaları: mesafe arttıkça enerji düşer
+        "energies": (pressure / np.array(impact_distances, dtype=float)[:, None]**2) * variance
+    }
+
+@profiled()
+def calculate_atmosphere(air, wind_speed: float, drag_factor: float):
     """
     Coğrafi konuma dayalı atmosfer simülasyonu.
+
+    air: enleme bağlı standart atmosfer tablolarından (engine/atmosphere.py) okunan hava
+    özellikleri; wind_speed / drag_factor: risk_draws çekilişindeki rüzgar ve sürüklenme.
     """
-    # 1. Sıcaklık (Enlem ve Yükseklik Etkisi)
-    # Ekvator (0°) ~30°C, Kutuplar (90°) ~-20°C
-    lat_factor = 1 - (abs(lat) / 90)
-    base_temp = -15 + (45 * lat_factor) 
-    
-    # Lapse Rate: Her 1000m'de 6.5°C düşüş
-    final_temp = base_temp - (elevation / 1000 * 6.5)
-    
-    # 2. Rüzgar (Yükseklik Etkisi)
-    # Yüksek irtifada sürtünme azalır, rüzgar artar.
-    base_wind = 5 + (elevation / 500) + random.uniform(-2, 5)
-    wind_speed = max(0, base_wind) # Negatif olamaz
-    
-    # Sürüklenme Katsayısı
-    drag_factor = 0.1 + (wind_speed / 50)
+    # Sıcaklık (Enlem ve Yükseklik Etkisi)
+    # Ekvator (0°) ~30°C, Kutuplar (90°) ~-15°C; troposferde her 1000m'de 6.5°C düşüş, tropopozda sabit
+    final_temp = float(air['temperature']) - 273.15
 
     # Durum Metni
     if wind_speed > 25: behavior = "Fırtınalı Dağılım"
@@ -67,46 +118,80 @@ def calculate_atmosphere(lat: float, elevation: float):
     return {
         "temp_c": round(final_temp, 1),
         "wind_speed": round(wind_speed, 1),
-        "drag_factor": round(min(drag_factor, 1.0), 2),
-        "plume_behavior": behavior
+        "drag_factor": round(drag_factor, 2),
+        "plume_behavior": behavior,
+        "air_density": round(float(air['density']), 3),
+        "pressure_hpa": round(float(air['pressure']) / 100, 1)
+    }
+
+def _band(p5, p50, p95):
+    return {"p5": float(p5), "p50": float(p50), "p95": float(p95)}
+
+@profiled()
+def risk_ensemble(pressure, activity, mean_wind, size, budget_ms=None, rng=None):
+    """
+    calculate_risk'in rastgele girdilerinin size çekilişlik topluluğu (formüller risk_draws'ta).
+
+    Çekilişler parçalar halinde üretilir; süre bütçesi (varsayılan ensemble_budget_ms) aşılırsa
+    kalan parçalar atlanır ve 'ensemble_size' gerçekten hesaplanan çekiliş sayısını gösterir.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    budget_ms = ensemble_budget_ms if budget_ms is None else budget_ms
+    start = time.perf_counter()
+    parts = []
+    done = 0
+    while done < size:
+        n = min(ensemble_chunk, size - done)
+        draw = risk_draws(pressure, activity, mean_wind, n, rng)
+        parts.append(np.vstack([draw["blast_radius"], draw["safe_zone"], draw["vei_score"], draw["wind_speed"],
+                                draw["drag_factor"], draw["energies"]]))
+        done += n
+        if (time.perf_counter() - start) * 1e3 > budget_ms:
+            break
+
+    p5, p50, p95 = np.percentile(np.concatenate(parts, axis=1), [5, 50, 95], axis=1)
+    bands = [_band(*values) for values in zip(p5, p50, p95)]
+    return {
+        "ensemble_size": done,
+        "truncated": done < size,
+        "crush_distance": bands[0],
+        "safe_zone": bands[1],
+        "intensity": bands[2],
+        "wind_speed": bands[3],
+        "drag_factor": bands[4],
+        "impact_points": [{"distance_km": dist, "energy_j": band} for dist, band in zip(impact_distances, bands[5:])]
     }
 
 @app.post("/calculate")
+@profiled('calculate_risk', run=True)
 async def calculate_risk(volcano: VolcanoRequest):
     try:
         activity = get_activity_factor(volcano.status)
-        atmos = calculate_atmosphere(volcano.location.lat, volcano.elevation)
+        air = air_properties(volcano.elevation, volcano.location.lat)
+        mean_wind = float(air['wind_speed'])
         
         # 1. Magma Basıncı (Paskal)
         # Aktif yanardağlarda basınç tam, pasiflerde %30 seviyesinde simüle edilir.
         pressure = (volcano.elevation * 3000 * activity) + 100000 
         
-        # 2. Monte Carlo Varyasyonu
-        variance = random.uniform(0.9, 1.1)
-        
-        # 3. Ezilme Mesafesi (Balistik)
-        # Basınç ne kadar yüksekse kayaçlar o kadar uzağa fırlar.
-        blast_radius = (pressure ** 0.45) / 9.81 * variance
-        
-        # Sönmüş yanardağlar için yarıçapı çok küçült
-        if activity < 0.2: 
-            blast_radius = blast_radius / 10
+        # 2. Monte Carlo Varyasyonu, rüzgar, ezilme mesafesi, VEI ve etki enerjileri (tek çekiliş)
+        draw = {name: values[..., 0] for name, values in
+                risk_draws(pressure, activity, mean_wind, 1).items()}
+        variance = float(draw["variance"])
+        blast_radius = float(draw["blast_radius"])
+        vei_score = float(draw["vei_score"])
+        atmos = calculate_atmosphere(air, float(draw["wind_speed"]), float(draw["drag_factor"]))
 
-        # 4. Volkanik Patlama İndeksi (VEI Tahmini)
-        vei_score = math.log10(max(blast_radius, 1)) * activity * 1.5
-
-        # 5. Nihai Karar
+        # 3. Nihai Karar
         if vei_score < 1: decision = "ÇOK DÜŞÜK RİSK"
         elif vei_score < 2.5: decision = "DÜŞÜK RİSK"
         elif vei_score < 4.0: decision = "ORTA SEVİYE RİSK"
         elif vei_score < 5.5: decision = "YÜKSEK RİSK"
         else: decision = "KRİTİK TAHLİYE!"
 
-        # 6. Etki Noktaları
+        # 4. Etki Noktaları
         impact_points = []
-        for dist in [5, 10, 20, 50]:
-            # Mesafe arttıkça enerji düşer
-            energy = (pressure / (dist ** 2)) * variance
+        for dist, energy in zip(impact_distances, draw["energies"]):
             # Sıcaklık lav akışına göre düşer
             temp_drop = 50 * dist 
             lava_temp = (1200 * activity) - temp_drop
@@ -119,35 +204,127 @@ async def calculate_risk(volcano: VolcanoRequest):
                 "label": f"{dist}km Menzil"
             })
 
-        # 7. Güvenli Bölge
-        safe_zone = blast_radius * 1.2 if activity > 0.2 else 0
-
-        # 8. Parçacık Yayılımı (3D)
+        # 5. Parçacık Yayılımı (3D)
         particle_spread = {
             "x": blast_radius * (1 + atmos["wind_speed"]/10),
             "y": blast_radius * 0.9,
             "z": volcano.elevation + (pressure / 5000)
         }
 
-        return {
+        result = {
             "monte_carlo": {
                 "density": int(2600 * variance),
                 "pressure": pressure,
                 "temp": int(1200 * activity) if activity > 0.1 else int(atmos["temp_c"])
             },
             "crush_distance": blast_radius,
-            "safe_zone": safe_zone,
+            "safe_zone": float(draw["safe_zone"]),
             "impact_points": impact_points,
             "particle_spread": particle_spread,
             "intensity": round(vei_score, 1),
             "atmosphere": atmos,
             "final_decision": decision
         }
+        if volcano.ensemble_size > 0:
+            result["uncertainty"] = risk_ensemble(pressure, activity, mean_wind, volcano.ensemble_size)
+        return result
 
     except Exception as e:
         print(f"Hata: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/surrogate")
+@profiled('surrogate_lookup')
+def surrogate_lookup(elevation: float, wind_speed: float, pressure: float = 20e6):
+    """
+    run_full_simulation çıktılarının vekil modelden okunan ortalama ve P5/P50/P95 değerleri.
+
+    Izgara dışındaki girdiler kenar değerine kırpılır. 'error_bound' doğrulamada görülen en
+    büyük mutlak hatadır (çıktının biriminde; model doğrulanmadan kurulduysa None).
+    """
+    try:
+        model = load_surrogate(surrogate_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=503, detail="Vekil model bulunamadı; 'python -m engine.surrogate' ile kurun.")
+    validation = model['validation'] or {}
+    return {
+        "inputs": {"elevation": elevation, "pressure": pressure, "wind_speed": wind_speed},
+        "outputs": {name: {stat: float(value) for stat, value in stats.items()}
+                    for name, stats in predict(model, elevation, pressure, wind_speed).items()},
+        "error_bound": {name: row["max_abs_error"] for name, row in validation.get("outputs", {}).items()} or None,
+        "replicates": model['replicates']
+    }
+
+def _offer(queue, item):
+    """Kuyruğa ekler; kuyruk doluysa en eski kareyi atar ve atılıp atılmadığını döner."""
+    dropped = queue.full()
+    if dropped:
+        queue.get_nowait()
+    queue.put_nowait(item)
+    return dropped
+
+def _next_frame(state, frame, dt, max_points, quantize):
+    step_eruption(state, dt)
+    return encode_frame(state['particles'], frame, state['sim_time'], max_points, quantize)
+
+async def _produce_frames(state, queue, stats, frames, fps, dt, max_points, quantize):
+    """
+    Simülasyonu fps hızında ilerletip kodlanmış kareleri kuyruğa koyar.
+
+    Bittiğinde ya da hata verdiğinde kuyruğa None koyar; hata task üzerinden yeniden fırlatılır.
+    """
+    period = 1 / fps
+    try:
+        for frame in range(frames):
+            start = time.perf_counter()
+            data = await asyncio.to_thread(_next_frame, state, frame, dt, max_points, quantize)
+            stats["dropped"] += _offer(queue, data)
+            await asyncio.sleep(max(0.0, period - (time.perf_counter() - start)))
+    finally:
+        stats["dropped"] += _offer(queue, None)
+
+@app.websocket("/ws/simulate")
+async def simulate_stream(websocket: WebSocket, n_particles: int = 5000, frames: int = 300, fps: float = 30,
+                          dt: float = 0.1, quantize: bool = True, max_kbps: float = stream_max_kbps,
+                          wind_x: float = 0.0, wind_y: float = 0.0, latitude: float = 45.0,
+                          elevation: float = 0.0, seed: int | None = None):
+    """
+    Partikül simülasyonunu sunucuda çalıştırıp her kareyi ikili mesaj olarak gönderir.
+
+    Kare biçimi engine/frame_stream.py'de tanımlıdır. Kare başına nokta sayısı max_kbps
+    sınırına göre seyreltilir; istemci yetişemezse bekleyen kareler atılır. Akış bitince
+    {"frames", "sent", "dropped", "points_per_frame"} özeti JSON olarak gönderilir; simülasyon
+    hata verirse özete "error" eklenir ve bağlantı 1011 koduyla kapanır.
+    """
+    await websocket.accept()
+    n_particles = min(max(n_particles, 1), stream_max_particles)
+    frames = min(max(frames, 1), stream_max_frames)
+    fps = min(max(fps, 1.0), 120.0)
+    max_kbps = min(max(max_kbps, 1.0), stream_max_kbps)
+    max_points = frame_point_budget(max_kbps * 1000, fps, quantize)
+
+    state = await asyncio.to_thread(init_eruption, n_particles, site_elevation=elevation, site_latitude=latitude,
+                                    wind=(wind_x, wind_y), seed=seed)
+    queue = asyncio.Queue(maxsize=stream_queue_size)
+    points_per_frame = math.ceil(n_particles / decimation_stride(n_particles, max_points))
+    stats = {"frames": frames, "sent": 0, "dropped": 0, "points_per_frame": points_per_frame}
+    producer = asyncio.create_task(_produce_frames(state, queue, stats, frames, fps, dt, max_points, quantize))
+    try:
+        while (data := await queue.get()) is not None:
+            await websocket.send_bytes(data)
+            stats["sent"] += 1
+        await producer
+        await websocket.send_json(stats)
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        print(f"Akış hatası: {e}")
+        await websocket.send_json({**stats, "error": str(e)})
+        await websocket.close(code=1011)
+    finally:
+        producer.cancel()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Simülasyon paketinin (engine) bulunduğu middleend klasörünü import yoluna ekler.
+MIDDLEEND_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'middleend'))
+
+if MIDDLEEND_DIR not in sys.path:
+    sys.path.append(MIDDLEEND_DIR)
@@ -0,0 +1,263 @@
+import argparse
+import asyncio
+import contextlib
+import inspect
+import io
+import json
+import os
+import platform
+import random
+import runpy
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+# Simülasyon çekirdekleri ve API için benchmark paketi.
+#
+# Her benchmark sabit seed ve boyutlarla çalışır; sonuçlar (p50, p99, ortalama, min,
+# tekrar sayısı ve benchmark'a özel ek değerler) JSON dosyasına yazılır. --compare ile
+# kayıtlı bir temel (baseline) dosyayla karşılaştırılır; p50 süresi eşikten fazla
+# artan benchmark'lar gerileme olarak işaretlenir ve çıkış kodu 1 olur.
+#
+#   python benchmarks/run_benchmarks.py --output benchmarks/baseline.json
+#   python benchmarks/run_benchmarks.py --compare benchmarks/baseline.json
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(ROOT, 'backend')
+MIDDLEEND_DIR = os.path.join(ROOT, 'middleend')
+for path in (BACKEND_DIR, MIDDLEEND_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+os.environ.setdefault('MPLBACKEND', 'Agg')  # Scriptler pencere açmadan yüklenir
+
+def seed_all(seed=0):
+    random.seed(seed)
+    np.random.seed(seed)
+
+def timings(fn, repeat, warmup=1):
+    """fn'i warmup + repeat kez çalıştırır; her tekrarın süresini (s) döner."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return np.array(samples)
+
+def stats(samples, **extra):
+    """Süre örneklerinin özet istatistikleri (s)."""
+    result = {
+        'p50': float(np.percentile(samples, 50)),
+        'p99': float(np.percentile(samples, 99)),
+        'mean': float(np.mean(samples)),
+        'min': float(np.min(samples)),
+        'repeat': int(len(samples))
+    }
+    result.update(extra)
+    return result
+
+def load_script(name):
+    """Numaralı bir middleend scriptini (Agg, çıktı bastırılmış) yükleyip global sözlüğünü döner."""
+    seed_all()
+    with contextlib.redirect_stdout(io.StringIO()):
+        namespace = runpy.run_path(os.path.join(MIDDLEEND_DIR, name))
+    # Fonksiyonların gördüğü asıl global sözlük (run_path kopya döner; profil sarmalayıcıları açılır)
+    for value in namespace.values():
+        if callable(value) and getattr(value, '__module__', None) == '<run_path>':
+            return inspect.unwrap(value).__globals__
+    return namespace
+
+# #########################
+# # Benchmark'lar
+# #########################
+def bench_api_calculate_risk(requests=300):
+    """main.calculate_risk: süreç içi ASGI istekleri (gecikme p50/p99 ve saniyedeki istek)."""
+    import httpx
+    from main import app
+
+    payload = {'name': 'Etna', 'elevation': 3357, 'status': 'Historical',
+               'location': {'lat': 37.75, 'lng': 14.99}}
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+            for _ in range(20):
+                await client.post('/calculate', json=payload)
+            samples = []
+            start = time.perf_counter()
+            for _ in range(requests):
+                t0 = time.perf_counter()
+                response = await client.post('/calculate', json=payload)
+                samples.append(time.perf_counter() - t0)
+                response.raise_for_status()
+            return np.array(samples), time.perf_counter() - start
+
+    seed_all()
+    samples, total = asyncio.run(run())
+    return stats(samples, throughput_rps=requests / total)
+
+def bench_run_full_simulation(repeat=50):
+    """engine.full_simulation.run_full_simulation (bir volkan için tüm adımlar)."""
+    from engine import full_simulation
+    seed_all()
+    full_simulation.get_monte_carlo_params()  # Örnek bankası hazırlansın
+    return stats(timings(lambda: full_simulation.run_full_simulation(1421, 'Bench'), repeat))
+
+def bench_particle_spread(counts=(200, 2000, 20000, 200000), repeat=20):
+    """engine.full_simulation.calculate_particle_spread, farklı partikül sayılarında."""
+    from engine import full_simulation
+    results = {}
+    for n in counts:
+        seed_all()
+        results[f'n={n}'] = stats(timings(
+            lambda: full_simulation.calculate_particle_spread(1421, 1.5, 30.0, 0.7, 2500.0, n), repeat))
+    return results
+
+def bench_simulate_volcano(repeat=20):
+    """2_SONmagmalos simulate_volcano: 800 x 800 ızgara değerlendirmesi."""
+    g = load_script('2_SONmagmalos_v2_random.py')
+    simulate_volcano = g['simulate_volcano']
+    return stats(timings(lambda: simulate_volcano(g['intensity'], g['base_size'], g['spread'], 5,
+                                                  g['vent_radius'], g['vent_height']), repeat))
+
+def bench_eziliyormuyuz_integrator(frames=20, steps_per_frame=100, repeat=5):
+    """engine.ejecta_2d (1_eziliyormuyuz fiziği): frames frame, her biri steps_per_frame adım."""
+    from engine.ejecta_2d import init_ejecta, step_ejecta
+
+    def run():
+        seed_all()
+        state = init_ejecta()
+        for step in range(frames * steps_per_frame):
+            step_ejecta(state, step * 0.05)
+
+    return stats(timings(run, repeat), frames=frames, steps_per_frame=steps_per_frame)
+
+def bench_whatever_split_steps(steps=60, repeat=5):
+    """engine.ejecta_3d (6_whatever fiziği) bölünme ağırlıklı adımlar: partiküller yere yakın başlar, art arda bölünür."""
+    from engine.ejecta_3d import create_ejecta, reset_ejecta, step_ejecta
+    seed_all()
+    state = create_ejecta()
+    pool = state['particle_pool']
+
+    def run():
+        seed_all()
+        reset_ejecta(state)
+        live = pool.indices()
+        pool.pos[live, 2] = 5.0
+        pool.vel[live, 2] = -100.0
+        for _ in range(steps):
+            step_ejecta(state)
+
+    samples = timings(run, repeat)
+    return stats(samples, steps=steps, live_particles=int(len(pool)))
+
+def bench_monte_carlo_trials(count=20000, repeat=5):
+    """5_monte_carlo deneme motoru: count deneme (partikül + kayaç), sonuç dosyası yazılmadan."""
+    g = load_script('5_monte_carlo_hesaplamasi.py')
+    return stats(timings(lambda: g['run_trial_set'](count, seed=0, workers=1), repeat), trials=count)
+
+def bench_monte_carlo_quadratic(count=20000, repeat=5):
+    """5_monte_carlo deneme motoru, karesel sürüklenme (tablo düzeltmeli) modeliyle."""
+    from engine.ballistics import load_drag_table
+    g = load_script('5_monte_carlo_hesaplamasi.py')
+    g['drag_model'] = 'quadratic'
+    load_drag_table()  # Tablo üretimi ölçüme katılmaz
+    return stats(timings(lambda: g['run_trial_set'](count, seed=0, workers=1), repeat), trials=count)
+
+benchmarks = {
+    'api_calculate_risk': bench_api_calculate_risk,
+    'run_full_simulation': bench_run_full_simulation,
+    'calculate_particle_spread': bench_particle_spread,
+    'simulate_volcano': bench_simulate_volcano,
+    'eziliyormuyuz_integrator': bench_eziliyormuyuz_integrator,
+    'whatever_split_steps': bench_whatever_split_steps,
+    'monte_carlo_trials': bench_monte_carlo_trials,
+    'monte_carlo_quadratic': bench_monte_carlo_quadratic
+}
+
+# #########################
+# # Çalıştırma ve karşılaştırma
+# #########################
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmarks(names=None):
+    """Seçilen (varsayılan: tüm) benchmark'ları çalıştırır; JSON'a yazılacak sözlüğü döner."""
+    results = {}
+    for name in names or benchmarks:
+        print(f"{name} ...", flush=True)
+        results[name] = benchmarks[name]()
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()
+        },
+        'benchmarks': results
+    }
+
+def _flatten(results, prefix=''):
+    """İç içe benchmark sonuçlarını 'ad/alt_ad' -> istatistik sözlüğüne düzleştirir."""
+    flat = {}
+    for name, value in results.items():
+        if 'p50' in value:
+            flat[prefix + name] = value
+        else:
+            flat.update(_flatten(value, prefix + name + '/'))
+    return flat
+
+def compare(current, baseline, threshold=0.2):
+    """
+    p50 sürelerini temel sonuçlarla karşılaştırır.
+
+    (ad, temel p50, güncel p50, oran, gerileme mi) satırlarını döner; oran > 1 + threshold gerilemedir.
+    """
+    now = _flatten(current['benchmarks'])
+    before = _flatten(baseline['benchmarks'])
+    rows = []
+    for name in now:
+        if name in before:
+            ratio = now[name]['p50'] / before[name]['p50']
+            rows.append((name, before[name]['p50'], now[name]['p50'], ratio, ratio > 1 + threshold))
+    return rows
+
+def print_table(results):
+    print(f"\n{'Benchmark':<42}{'p50 (ms)':>12}{'p99 (ms)':>12}{'tekrar':>8}")
+    for name, value in _flatten(results['benchmarks']).items():
+        print(f"{name:<42}{value['p50'] * 1e3:>12.3f}{value['p99'] * 1e3:>12.3f}{value['repeat']:>8}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simülasyon ve API benchmark paketi")
+    parser.add_argument("--output", default=os.path.join(ROOT, 'benchmarks', 'results.json'),
+                        help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--compare", help="Karşılaştırılacak temel (baseline) JSON dosyası")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Gerileme eşiği (0.2 = %%20 daha yavaş)")
+    parser.add_argument("--only", nargs='+', choices=list(benchmarks), help="Sadece bu benchmark'lar")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.only)
+    print_table(results)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nSonuçlar kaydedildi: {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = 0
+        print(f"\n{'Benchmark':<42}{'temel (ms)':>12}{'güncel (ms)':>12}{'oran':>8}")
+        for name, before, now, ratio, regressed in compare(results, baseline, args.threshold):
+            regressions += regressed
+            flag = '  GERİLEME' if regressed else ''
+            print(f"{name:<42}{before * 1e3:>12.3f}{now * 1e3:>12.3f}{ratio:>8.2f}{flag}")
+        sys.exit(1 if regressions else 0)
@@ -31,6 +31,9 @@ export default function SimulationResults({ results, loading, darkMode, cardClas
                     <div className="text-center">
                         <p className="text-lg opacity-80">Maksimum Kaya Menzili</p>
                         <p className="text-5xl font-black text-volcano-red my-3 drop-shadow-lg">{(results.crush_distance/1000).toFixed(2)} km</p>
+                        {results.uncertainty && (
+                            <p className="text-sm opacity-70 mb-1">P5–P95: {(results.uncertainty.crush_distance.p5/1000).toFixed(2)} – {(results.uncertainty.crush_distance.p95/1000).toFixed(2)} km</p>
+                        )}
                         <p className="text-xs opacity-60">Bu mesafeye kadar kayaç düşme riski var.</p>
                     </div>
                 )}
@@ -105,6 +108,9 @@ export default function SimulationResults({ results, loading, darkMode, cardClas
                     <div className={`p-4 rounded border-2 text-center ${darkMode ? 'border-green-800 bg-green-900/20' : 'border-green-300 bg-green-100'}`}>
                         <p className="font-bold text-green-600 mb-2">Önerilen Güvenli Mesafe</p>
                         <p className="text-3xl font-black">{(results.safe_zone / 1000).toFixed(1)} km</p>
+                        {results.uncertainty && (
+                            <p className="text-sm opacity-70">P5–P95: {(results.uncertainty.safe_zone.p5/1000).toFixed(1)} – {(results.uncertainty.safe_zone.p95/1000).toFixed(1)} km</p>
+                        )}
                         <p className="text-xs mt-2 opacity-70">Merkezden itibaren bu yarıçap dışı güvenlidir.</p>
                     </div>
                 )}
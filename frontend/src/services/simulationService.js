@@ -2,7 +2,8 @@ import axios from 'axios';
 
 const API_URL = 'https://tuievolution-volcanos-backend.onrender.com';
 
-export const runSimulation = async (volcanoData) => {
+// ensembleSize > 0 ise backend P5/P50/P95 belirsizlik bandını da döner (results.uncertainty)
+export const runSimulation = async (volcanoData, ensembleSize = 1000) => {
     try {
         const response = await axios.post(`${API_URL}/calculate`, {
             name: volcanoData.name,
@@ -11,11 +12,68 @@ export const runSimulation = async (volcanoData) => {
             location: { 
                 lat: volcanoData.position[0], 
                 lng: volcanoData.position[1] 
-            }
+            },
+            ensemble_size: ensembleSize
         });
         return response.data;
     } catch (error) {
         console.error("Simülasyon Hatası:", error);
         throw error;
     }
-};
\ No newline at end of file
+};
+
+// --- Canlı partikül akışı (/ws/simulate) ---
+// Kare biçimi: 44 baytlık başlık (magic 'VOLC', sürüm, veri tipi, seyreltme adımı, kare no,
+// simülasyon zamanı, nokta sayısı, kutu min/max) + nokta sayısı x 3 değer (float32 ya da uint16).
+const FRAME_HEADER_SIZE = 44;
+const FRAME_MAGIC = 'VOLC';
+
+export const decodeFrame = (buffer) => {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+    if (magic !== FRAME_MAGIC) throw new Error(`Geçersiz kare başlığı: ${magic}`);
+    const quantized = view.getUint8(5) === 1;
+    const count = view.getUint32(16, true);
+    const lower = [0, 1, 2].map(i => view.getFloat32(20 + 4 * i, true));
+    const upper = [0, 1, 2].map(i => view.getFloat32(32 + 4 * i, true));
+
+    let positions;
+    if (quantized) {
+        // uint16 değerler kutu içine geri ölçeklenir
+        const raw = new Uint16Array(buffer, FRAME_HEADER_SIZE, count * 3);
+        positions = new Float32Array(count * 3);
+        const scale = upper.map((u, k) => (u - lower[k]) / 65535);
+        for (let i = 0; i < raw.length; i++) {
+            positions[i] = lower[i % 3] + raw[i] * scale[i % 3];
+        }
+    } else {
+        positions = new Float32Array(buffer, FRAME_HEADER_SIZE, count * 3);
+    }
+    return {
+        frame: view.getUint32(8, true),
+        simTime: view.getFloat32(12, true),
+        stride: view.getUint16(6, true),
+        count,
+        bounds: { lower, upper },
+        positions  // [x0, y0, z0, x1, y1, z1, ...]
+    };
+};
+
+// options: { n_particles, frames, fps, quantize, max_kbps, wind_x, wind_y, latitude, elevation, seed }
+// onFrame her karede çözülmüş kareyle, onDone akış sonunda sunucu özetiyle çağrılır. Bağlantıyı döner.
+export const streamSimulation = (options, onFrame, onDone) => {
+    const query = new URLSearchParams(options).toString();
+    const socket = new WebSocket(`${API_URL.replace(/^http/, 'ws')}/ws/simulate?${query}`);
+    socket.binaryType = 'arraybuffer';
+    socket.onmessage = (event) => {
+        if (typeof event.data === 'string') {
+            const summary = JSON.parse(event.data);
+            if (summary.error) console.error("Akış Hatası:", summary.error);
+            if (onDone) onDone(summary);
+        } else {
+            onFrame(decodeFrame(event.data));
+        }
+    };
+    socket.onerror = (error) => console.error("Akış Hatası:", error);
+    return socket;
+};
@@ -1,6 +1,13 @@
+import argparse
 import tkinter as tk
 from tkinter import scrolledtext
 import numpy as np
+from engine.checkpoint import save_checkpoint, load_checkpoint, checkpoint_due
+from engine.trajectory import TrajectoryRecorder
+from engine.ejecta_2d import init_ejecta, step_ejecta
+from engine.wind_field import load_wind_field
+from engine.sample_bank import simulate_distribution
+from engine.profiling import profiled
 
 #########################
 # Monte Carlo Parametreleri
@@ -8,44 +15,9 @@ import numpy as np
 g = 9.81  # Yerçekimi ivmesi (m/s²)
 w0 = 100  # Çıkış hızı (m/s) - Daha gerçekçi bir değer için 100 m/s'ye düşürüldü
 air_resistance = 0.98
+rock_gravity = 5.0  # Kayaçlar için yerçekimi katı
 
-initial_mixture_density_mu = 5.74
-initial_mixture_density_sigma = 0.5
-mass_discharge_rate_mu = 1.5e6
-mass_discharge_rate_sigma = 1e5
-magma_temperature_mu = 1273.15
-magma_temperature_sigma = 50
-volatile_content_a = 3
-volatile_content_b = 2
-gas_constant_mu = 462
-gas_constant_sigma = 50
-Cva_min = 680
-Cva_max = 740
-Cvg_alpha = 2
-Cvg_beta = 0.5
-Cvs_mu = 1100
-Cvs_sigma = 100
-
-def simulate_distribution(n=1000):
-    initial_mixture_density = np.random.normal(initial_mixture_density_mu, initial_mixture_density_sigma, n)
-    mass_discharge_rate = np.random.normal(mass_discharge_rate_mu, mass_discharge_rate_sigma, n)
-    magma_temperature = np.random.normal(magma_temperature_mu, magma_temperature_sigma, n)
-    volatile_content = np.random.beta(volatile_content_a, volatile_content_b, n) * 100
-    gas_constant = np.random.normal(gas_constant_mu, gas_constant_sigma, n)
-    Cva = np.random.triangular(Cva_min, (Cva_min + Cva_max) / 2, Cva_max, n)
-    Cvg = np.random.gamma(Cvg_alpha, Cvg_beta, n)
-    Cvs = np.random.normal(Cvs_mu, Cvs_sigma, n)
-    return {
-        'initial_mixture_density': np.mean(initial_mixture_density),
-        'mass_discharge_rate': np.mean(mass_discharge_rate),
-        'magma_temperature': np.mean(magma_temperature),
-        'volatile_content': np.mean(volatile_content),
-        'gas_constant': np.mean(gas_constant),
-        'Cva': np.mean(Cva),
-        'Cvg': np.mean(Cvg),
-        'Cvs': np.mean(Cvs)
-    }
-
+# Parametre ortalamaları ortak örnek bankasından okunur (bkz. engine/sample_bank.py); tüm scriptler aynı örnekleri kullanır
 dist_results = simulate_distribution()
 
 #########################
@@ -58,83 +30,77 @@ vent_height = 1421      # Ventin yüksekliği (m)
 n_particles = 100
 n_rocks = 20
 
-# Partiküller
-particles = np.zeros((n_particles, 2))      # 2D konum (x, y)
-velocities = np.zeros((n_particles, 2))     # 2D hız (vx, vy)
+# Simülasyon durumu (konumlar, hızlar, rüzgar, izlenen en uzak noktalar, çökelme ızgarası);
+# fizik engine/ejecta_2d.py'de, bu script sadece çalıştırır ve raporlar
+state = None
 
-# Kayaçlar
-rocks = np.zeros((n_rocks, 2))              # 2D konum (x, y)
-rock_velocities = np.zeros((n_rocks, 2))    # 2D hız (vx, vy)
-
-# Simülasyon ayarları
-current_wind = np.array([0.0, 0.0])
+# Izgaralı rüzgar alanı (zaman x yükseklik x X x Y, bkz. wind_field.py); None ise sabit rüzgar kullanılır.
+# 2B simülasyonda partiküller y = 0 düzleminde örnekler: u yatay, (varsa) w dikey hıza eklenir.
+wind_field_path = None
+wind_field = load_wind_field(wind_field_path) if wind_field_path else None
 
 # Simülasyon hızı ve süresi
 steps_per_frame = 100  # Her frame için 100 adım
 total_frames = 300     # Toplam frame sayısı
+dt = 0.05              # Zaman adımı (s)
 
-# Maksimum mesafe takibi
-max_particle_distance = 0
-max_particle_id = -1
-max_particle_pos = np.array([0.0, 0.0])
+# Çökelme ızgarası: yere ilk kez inen her partikül ve kayacın kütlesi eklenir
+particle_mass = 0.01    # Temsili partikül kütlesi (kg)
+rock_mass = 50.0        # Temsili kayaç kütlesi (kg)
+deposition_extent = 200000  # Izgaranın merkezden kenara uzaklığı (m)
+deposition_resolution = 1000
 
-max_rock_distance = 0
-max_rock_id = -1
-max_rock_pos = np.array([0.0, 0.0])
+# Kontrol noktası: her checkpoint_every frame'de tüm durum (RNG dahil) kaydedilir; 0 ise kapalı
+# (varsayılan; --checkpoint ile açılır, --end-frame ile durdurulan koşu her zaman yazar)
+checkpoint_path = 'eziliyormuyuz_checkpoint.npz'
+checkpoint_every = 0
 
-# Kayaç çarpma hızları
-rock_impact_speeds = [None] * n_rocks
+# Yörünge kaydı: trajectory_path verilirse konumlar her trajectory_stride adımda bir memmap dosyaya
+# yazılır (bkz. engine/trajectory.py); tekrar oynatmak için yeni simülasyon gerekmez
+trajectory_path = None
+trajectory_stride = 10
+trajectory_subset = None  # Grup -> kaydedilecek indeksler, ör. {'particles': slice(0, None, 10)}; None ise hepsi
 
 def initialize():
-    global particles, velocities, rocks, rock_velocities
-    global max_particle_distance, max_particle_id, max_particle_pos
-    global max_rock_distance, max_rock_id, max_rock_pos, rock_impact_speeds
-    global current_wind
-    
-    # Rüzgarın rastgele hızı ve yönü (10-30 m/s)
-    wind_magnitude = np.random.uniform(10, 30)  # m/s
-    wind_direction = np.random.uniform(0, 2 * np.pi)  # Radyan cinsinden
-    current_wind = np.array([
-        wind_magnitude * np.cos(wind_direction),
-        wind_magnitude * np.sin(wind_direction)
-    ])
-    
-    # Partiküllerin rastgele yönlerde fırlatılması
-    theta_p = np.random.uniform(0, 2 * np.pi, n_particles)
-    speed_p = np.random.uniform(w0 / 2, w0, n_particles)  # Hız aralığı: 50-100 m/s
-    velocities[:, 0] = speed_p * np.cos(theta_p)  # vx
-    velocities[:, 1] = speed_p * np.sin(theta_p)  # vy
-    # Partiküllerin başlangıç konumu (vent noktası)
-    particles[:, 0] = 0.0
-    particles[:, 1] = vent_height
-    
-    # Kayaçların rastgele yönlerde fırlatılması
-    theta_r = np.random.uniform(0, 2 * np.pi, n_rocks)
-    speed_r = np.random.uniform(w0 / 2, w0, n_rocks)  # Hız aralığı: 50-100 m/s
-    rock_velocities[:, 0] = speed_r * np.cos(theta_r)  # vx
-    rock_velocities[:, 1] = speed_r * np.sin(theta_r)  # vy
-    # Kayaçların başlangıç konumu (vent noktası)
-    rocks[:, 0] = 0.0
-    rocks[:, 1] = vent_height
-    
-    # Takip değişkenlerini sıfırlama
-    max_particle_distance = 0
-    max_particle_id = -1
-    max_particle_pos = np.array([0.0, 0.0])
-    
-    max_rock_distance = 0
-    max_rock_id = -1
-    max_rock_pos = np.array([0.0, 0.0])
-    rock_impact_speeds[:] = [None] * n_rocks
-
-def run_simulation():
-    global particles, velocities, rocks, rock_velocities
-    global max_particle_distance, max_particle_id, max_particle_pos
-    global max_rock_distance, max_rock_id, max_rock_pos, rock_impact_speeds
-    global current_wind
-    
+    global state
+    state = init_ejecta(n_particles, n_rocks, w0, vent_height, deposition_extent, deposition_resolution)
+
+def simulation_state(frame):
+    """Devam ettirmek için gereken tüm simülasyon durumu (frame: tamamlanan frame sayısı)."""
+    return {**state, 'frame': frame, 'dist_results': dist_results}
+
+def restore_state(saved):
+    """Kontrol noktasından okunan durumu yükler; kalınan frame'i döner."""
+    global state, dist_results
+    saved = dict(saved)
+    frame = saved.pop('frame')
+    dist_results = saved.pop('dist_results')
+    saved['rock_impact_speeds'] = np.asarray(saved['rock_impact_speeds'], dtype=float)
+    state = saved
+    return frame
+
+@profiled(run=True)
+def run_simulation(resume_from=None, end_frame=None):
+    """
+    Simülasyonu çalıştırır.
+
+    resume_from: devam edilecek kontrol noktası dosyası; end_frame: durulacak frame (uzun
+    koşuları zaman dilimlerine bölmek için, varsayılan total_frames).
+    """
     print("Simülasyon başlatılıyor...")
-    initialize()
+    start_frame = 0
+    if resume_from:
+        start_frame = restore_state(load_checkpoint(resume_from))
+        print(f"Kontrol noktasından devam ediliyor: {resume_from} ({start_frame}. frame)")
+    else:
+        initialize()
+    end_frame = total_frames if end_frame is None else min(end_frame, total_frames)
+    recorder = None
+    if trajectory_path:
+        recorder = TrajectoryRecorder(trajectory_path, {'particles': n_particles, 'rocks': n_rocks},
+                                      total_frames * steps_per_frame, dims=2, stride=trajectory_stride,
+                                      subset=trajectory_subset, dt=dt, resume=bool(resume_from))
+    current_wind = state['current_wind']
     wind_speed = np.linalg.norm(current_wind)
     wind_angle = np.arctan2(current_wind[1], current_wind[0]) * 180 / np.pi  # Derece cinsinden
     wind_angle = wind_angle if wind_angle >=0 else wind_angle + 360  # 0-360 derece aralığı
@@ -146,55 +112,36 @@ def run_simulation():
         print(f"{k}: {v:.2f}")
     print("\nSimülasyon başlıyor...\n")
     
-    for frame in range(total_frames):
-        for _ in range(steps_per_frame):
-            # Partiküllerin hız ve konum güncellenmesi
-            velocities[:, 1] -= g * 0.05  # Yerçekimi
-            velocities[:, 0] *= air_resistance  # Hava direnci
-            velocities[:, 0] += current_wind[0] * 0.05  # Rüzgar etkisi x
-            velocities[:, 1] += current_wind[1] * 0.05  # Rüzgar etkisi y
-            particles += velocities * 0.05  # Konum güncellemesi
-            
-            # Kayaçların hız ve konum güncellenmesi
-            rock_velocities[:, 1] -= g * 0.05 * 5  # Kayaçlar için daha güçlü yerçekimi
-            rock_velocities[:, 0] *= air_resistance  # Hava direnci
-            rock_velocities[:, 0] += current_wind[0] * 0.05  # Rüzgar etkisi x
-            rock_velocities[:, 1] += current_wind[1] * 0.05  # Rüzgar etkisi y
-            rocks += rock_velocities * 0.05  # Konum güncellemesi
-            
-            # En uzağa giden partikülün takibi
-            distances_p = np.sqrt(particles[:, 0]**2 + particles[:, 1]**2)
-            current_max_particle_distance = np.max(distances_p)
-            if current_max_particle_distance > max_particle_distance:
-                max_particle_distance = current_max_particle_distance
-                max_particle_id = np.argmax(distances_p)
-                max_particle_pos = particles[max_particle_id].copy()
-            
-            # En uzağa giden kayaçın takibi
-            distances_r = np.sqrt(rocks[:, 0]**2 + rocks[:, 1]**2)
-            current_max_rock_distance = np.max(distances_r)
-            if current_max_rock_distance > max_rock_distance:
-                max_rock_distance = current_max_rock_distance
-                max_rock_id = np.argmax(distances_r)
-                max_rock_pos = rocks[max_rock_id].copy()
-            
-            # Kayaç çarpma hızı
-            for j in range(n_rocks):
-                if rocks[j, 1] <= 0 and rock_impact_speeds[j] is None:
-                    speed_magnitude = np.linalg.norm(rock_velocities[j])
-                    rock_impact_speeds[j] = speed_magnitude
+    for frame in range(start_frame, end_frame):
+        for step in range(frame * steps_per_frame, (frame + 1) * steps_per_frame):
+            if recorder:
+                recorder.record(step, particles=state['particles'], rocks=state['rocks'])
+            step_ejecta(state, step * dt, dt, g, air_resistance, rock_gravity, particle_mass, rock_mass, wind_field)
         
         # İsteğe bağlı olarak, her 50 frame'de bir ilerlemeyi yazdır
         if (frame +1) % 50 ==0 or frame ==0:
             print(f"{frame +1}. Frame tamamlandı.")
+
+        if checkpoint_due(frame + 1, checkpoint_every):
+            save_checkpoint(checkpoint_path, simulation_state(frame + 1))
+    if recorder:
+        recorder.close()
+    
+    if end_frame < total_frames:
+        save_checkpoint(checkpoint_path, simulation_state(end_frame))
+        print(f"\n{end_frame}. frame'de durduruldu, kontrol noktası: {checkpoint_path}")
+        return
     
     print("\nSimülasyon tamamlandı.\n")
     print_results()
 
+@profiled()
 def print_results():
-    global dist_results
-    global max_particle_distance, max_particle_id, max_particle_pos
-    global max_rock_distance, max_rock_id, max_rock_pos, rock_impact_speeds
+    max_particle_distance, max_particle_id = state['max_particle_distance'], state['max_particle_id']
+    max_particle_pos = state['max_particle_pos']
+    max_rock_distance, max_rock_id, max_rock_pos = state['max_rock_distance'], state['max_rock_id'], state['max_rock_pos']
+    rock_impact_speeds = state['rock_impact_speeds']
+    deposition_grid = state['deposition_grid']
 
     root = tk.Tk()
     root.title("Simülasyon Raporu")
@@ -234,7 +181,7 @@ def print_results():
         append_to_text_area(f"  ID: {max_rock_id}")
         append_to_text_area(f"  Yanardağ bacasından Mesafe: {(max_rock_distance_km)/10} m")
         append_to_text_area(f"  Konum: X = {(max_rock_x_km)*20} m, Y = {(max_rock_y_km)/10} m")
-        if rock_impact_speeds[max_rock_id] is not None:
+        if not np.isnan(rock_impact_speeds[max_rock_id]):
             rock_impact_speed = int(rock_impact_speeds[max_rock_id])
             append_to_text_area(f"  Çarpma Hızı: {(rock_impact_speed)*2} m/s")
         else:
@@ -251,9 +198,28 @@ def print_results():
         append_to_text_area(f"\nKaya altında kalmamak için uzak durun! Ama ezilmeyi hesap edecek kadar yakınsanız zaten ölüsünüz, "
                             f"ama yine de iyi kaçmaya çalışmalar :)")
     
+    append_to_text_area("\nÇökelme:")
+    append_to_text_area(f"  Izgaraya çökelen kütle: {deposition_grid['deposited_mass']:.2f} kg")
+    append_to_text_area(f"  Izgara dışına düşen kütle: {deposition_grid['outside_mass']:.2f} kg")
+
     append_to_text_area("\n#############################")
 
     root.mainloop()
 
 if __name__ == "__main__":
-    run_simulation()
+    parser = argparse.ArgumentParser(description="Kayaç ve partikül fırlatma simülasyonu")
+    parser.add_argument("--resume", help="Devam edilecek kontrol noktası dosyası (.npz)")
+    parser.add_argument("--end-frame", type=int, help="Bu frame'de durup kontrol noktası yaz")
+    parser.add_argument("--checkpoint", nargs="?", const=checkpoint_path,
+                        help="Kontrol noktalarını aç (isteğe bağlı dosya adı, varsayılan %(const)s)")
+    parser.add_argument("--checkpoint-every", type=int, default=50,
+                        help="--checkpoint ile kaç frame'de bir kontrol noktası yazılır")
+    parser.add_argument("--record", help="Yörünge kayıt dosyası (.npy, yanında .json)")
+    parser.add_argument("--record-stride", type=int, default=trajectory_stride, help="Kaç adımda bir kare kaydedilir")
+    args = parser.parse_args()
+    if args.checkpoint:
+        checkpoint_path = args.checkpoint
+        checkpoint_every = args.checkpoint_every
+    trajectory_path = args.record
+    trajectory_stride = args.record_stride
+    run_simulation(args.resume, args.end_frame)
@@ -1,6 +1,9 @@
 import matplotlib.pyplot as plt
 import numpy as np
 import matplotlib.animation as animation
+from engine.heat_field import temperature_field
+from engine.settlement_timeline import energy_table, hazard_timeline, alert_schedule
+from engine.profiling import profiled
 
 # Simulation parameters
 vent_radius = 350  # Volcano diameter (m)
@@ -31,36 +34,16 @@ settlements = [
      {abs(tuana_dist):.1f} km""")   
 ]
 
-# Energy decay function based on distance and time
-def energy_at_distance(distance, intensity, time, decay_factor=0.1):
-    """Calculate the energy at a given distance from the eruption center at a given time."""
-    # Energy decays with distance and time
-    energy = intensity / (1 + decay_factor * (distance**2)) * np.exp(-time / 10)
-    return energy
+# Energy thresholds (J) for the settlement alert schedule
+energy_thresholds = [0.5, 1.0, 5.0]
 
+@profiled()
 def simulate_volcano(intensity, size, spread, time, vent_radius, vent_height):
     """Simulate volcanic eruption temperature distribution."""
-    # Create a grid of points
-    x = np.linspace(-size, size, 800)  # Increased resolution
-    y = np.linspace(-size, size, 800)
-    x, y = np.meshgrid(x, y)
-
-    # Calculate distance from the center
-    d = np.sqrt(x**2 + y**2)
-
-    # Temperature distribution based on intensity, spread, and time
-    z = intensity * np.exp(-d / spread) * np.exp(-time / 10)
-
-    # Add shockwave effect for dynamic eruption visuals
-    shockwave = np.sin(d - time) * (np.exp(-d / spread) * 0.5)
-    z += shockwave * np.clip(intensity / (time + 1), 0, 1)
-
-    # Incorporate vent-specific effects (vent height adjusted)
-    vent_effect = (vent_radius / (vent_radius + d)) * np.exp(-vent_height / max_height)
-    z += vent_effect
-
-    return x, y, z, d  # Return distance array for calculating energy
+    # Returns the distance array as well for calculating energy
+    return temperature_field(intensity, size, spread, time, vent_radius, vent_height, max_height)
 
+@profiled()
 def update_plot(frame, intensity, size, spread, vent_radius, vent_height, plot, settlements, impact_texts):
     """Update the animation plot for each frame."""
     x, y, z, distance_array = simulate_volcano(intensity, size, spread, frame, vent_radius, vent_height)
@@ -78,15 +61,21 @@ def update_plot(frame, intensity, size, spread, vent_radius, vent_height, plot,
         if impact_texts[i] is not None:
             impact_texts[i].remove()
 
-        # Calculate distance from the volcano to the settlement (in km)
-        dist = np.sqrt(settlement[0]**2 + settlement[1]**2)
-
-        # Calculate the energy impact at the settlement based on the distance and time
-        energy_impact = energy_at_distance(dist, intensity, frame)
+        # Energy impact is precomputed for every frame and settlement (see settlement_energy)
+        energy_impact = settlement_energy[frame, i]
 
         # Display the updated energy impact (calculated as energy decay)
         impact_texts[i] = ax.text(settlement[0], settlement[1] - 5, f'Energy Impact: {energy_impact:.2f} J', color='black', fontsize=9)
 
+# Precompute energy impact for all frames and the threshold-crossing alert schedule in one pass
+settlement_distances = np.array([np.sqrt(s[0]**2 + s[1]**2) for s in settlements])
+settlement_energy = energy_table(settlement_distances, intensity, np.arange(eruption_time))
+timeline = hazard_timeline(settlement_distances, energy_thresholds, intensity=intensity, spread=spread)
+schedule = alert_schedule(timeline['energy_start'], timeline['energy_end'])
+for i, j, t_start, t_end in zip(schedule['settlement'], schedule['threshold'], schedule['start'], schedule['end']):
+    name = settlements[i][2].splitlines()[0]
+    print(f"{name}: Energy > {energy_thresholds[j]} J between t={t_start:.1f} s and t={t_end:.1f} s")
+
 # Set up the figure and axis
 fig, ax = plt.subplots(figsize=(16, 12))  # Larger figure size
 x, y, z, distance_array = simulate_volcano(intensity, base_size, spread, 0, vent_radius, vent_height)
@@ -1,49 +1,14 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from engine.sample_bank import simulate_distribution
+from engine.settlement_timeline import energy_at_distance, temperature_at_distance, is_survivable
 
 # Önceki parametrelerden bazılarını kullanıyoruz (temsilî):
 g = 9.81  # Yerçekimi
 w0 = 800  # Çıkış hızı
 air_resistance = 0.98
 
-# Monte Carlo sonuçlarını varsayım olarak alıyoruz (daha önce elde edilmesi gerekirdi)
-initial_mixture_density_mu = 5.74
-initial_mixture_density_sigma = 0.5
-mass_discharge_rate_mu = 1.5e6
-mass_discharge_rate_sigma = 1e5
-magma_temperature_mu = 1273.15
-magma_temperature_sigma = 50
-volatile_content_a = 3
-volatile_content_b = 2
-gas_constant_mu = 462
-gas_constant_sigma = 50
-Cva_min = 680
-Cva_max = 740
-Cvg_alpha = 2
-Cvg_beta = 0.5
-Cvs_mu = 1100
-Cvs_sigma = 100
-
-def simulate_distribution(n=1000):
-    initial_mixture_density = np.random.normal(initial_mixture_density_mu, initial_mixture_density_sigma, n)
-    mass_discharge_rate = np.random.normal(mass_discharge_rate_mu, mass_discharge_rate_sigma, n)
-    magma_temperature = np.random.normal(magma_temperature_mu, magma_temperature_sigma, n)
-    volatile_content = np.random.beta(volatile_content_a, volatile_content_b, n)*100
-    gas_constant = np.random.normal(gas_constant_mu, gas_constant_sigma, n)
-    Cva = np.random.triangular(Cva_min, (Cva_min+Cva_max)/2, Cva_max, n)
-    Cvg = np.random.gamma(Cvg_alpha, Cvg_beta, n)
-    Cvs = np.random.normal(Cvs_mu, Cvs_sigma, n)
-    return {
-        'initial_mixture_density': np.mean(initial_mixture_density),
-        'mass_discharge_rate': np.mean(mass_discharge_rate),
-        'magma_temperature': np.mean(magma_temperature),
-        'volatile_content': np.mean(volatile_content),
-        'gas_constant': np.mean(gas_constant),
-        'Cva': np.mean(Cva),
-        'Cvg': np.mean(Cvg),
-        'Cvs': np.mean(Cvs)
-    }
-
+# Monte Carlo sonuçları ortak örnek bankasından okunur (bkz. engine/sample_bank.py); tüm scriptler aynı örnekleri kullanır
 dist_results = simulate_distribution()
 
 # Önceki simülasyonda kullanılan bazı varsayılan parametreler
@@ -53,14 +18,6 @@ vent_height = 1421      # metre
 spread = 50             # Rastgele bir yayılım parametresi
 time = 0                # Patlama anı
 
-def energy_at_distance(distance, intensity, time, decay_factor=0.1):
-    energy = intensity / (1 + decay_factor*(distance**2))
-    return energy
-
-def temperature_at_distance(distance, magma_temp, spread):
-    T = magma_temp * np.exp(-distance/spread)
-    return T
-
 distances = np.arange(0, 110, 10)  # 0,10,20,...,100
 
 magma_temp = dist_results['magma_temperature']  # ortalama magma sıcaklığı (K)
@@ -83,16 +40,10 @@ cities = [
 energy_death_threshold = 20     
 temperature_death_threshold = 473  
 
-def is_survivable(distance):
-    E = energy_at_distance(distance, adjusted_intensity, time)
-    T = temperature_at_distance(distance, magma_temp, spread)
-    if E > energy_death_threshold or T > temperature_death_threshold:
-        return False
-    return True
-
 city_survival = []
 for (cdist, cname) in cities:
-    survive = is_survivable(cdist)
+    survive = bool(is_survivable(cdist, adjusted_intensity, magma_temp, spread,
+                                 energy_death_threshold, temperature_death_threshold, time))
     city_survival.append((cname, cdist, survive))
 
 fig, ax1 = plt.subplots(figsize=(10,6))
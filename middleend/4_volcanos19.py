@@ -1,8 +1,18 @@
+import argparse
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 from mpl_toolkits.mplot3d import Axes3D
 from matplotlib.widgets import Button, RadioButtons
+from engine.heightmap import build_heightmap, resolve_ground_collision, concave_cone_surface, sample_heightmap
+from engine.terrain import TerrainSource, volcano_heightmap, catalog_site
+from engine.heat_field import eruption_surface
+from engine.grain_size import sample_grain_sizes, grain_density, reynolds_number, terminal_velocity, apply_drag
+from engine.particle_interactions import collide_particles
+from engine.atmosphere import air_properties
+from engine.wind_field import load_wind_field, sample_air_velocity
+from engine.checkpoint import save_checkpoint, load_checkpoint, checkpoint_due
+from engine.profiling import profiled
 
 # Parametrelerin tanımlanması
 vent_radius = 50  # Yanardağ çapı (m)
@@ -10,64 +20,74 @@ vent_height = 20  # Yanardağ yüksekliği (m)
 n_particles = 500  # Partikül sayısı
 g = 9.81  # Yerçekimi ivmesi (m/s^2)
 sigma = 1000.0  # Partikül yoğunluğu (kg/m^3)
-mu = 1.81e-5   # Havanın dinamik viskozitesi (kg/(m.s))
-rho_a = 1.225  # Hava yoğunluğu (kg/m^3)
-particle_diameter = 0.1  # Partikül çapı (m)
+site_elevation = 0.0  # Yanardağ tabanının deniz seviyesinden yüksekliği (m); hava yoğunluğu ve viskozitesi buna göre
+site_latitude = 45.0  # Enlem (derece), standart atmosfer tabloları için
+particle_diameter = 0.1  # Medyan partikül çapı (m)
+grain_sorting = 1.0  # Tane boyu dağılımının phi cinsinden standart sapması
 w0 = 134.0  # Çıkış hızı (m/s)
 T0 = 1273.15  # Magma sıcaklığı (K)
 frame_interval = 100  # Animasyon kare süresi (ms)
 current_wind = np.array([0.0, 0.0])  # Başlangıçta rüzgar etkisi yok (x, y bileşenleri)
+wind_field_path = None  # Izgaralı rüzgar alanı dosyası (.npz / .npy); None ise sabit current_wind kullanılır
+wind_field = load_wind_field(wind_field_path) if wind_field_path else None
+sim_time = 0.0  # Simülasyon zamanı (s), rüzgar alanını örneklemek için
 current_model = 'Volcano'  # Başlangıç modeli
 start_time = 0  # Simülasyon başlangıç zamanı
 eruption_time = 10  # Patlamanın başlangıcı
+heightmap_extent = 20 * vent_radius  # Yükseklik haritasının kapsadığı alan (m), dışında kenar değeri kullanılır
+heightmap_resolution = 1024  # Yükseklik haritası çözünürlüğü
+volcano_name = None  # Katalogdaki yanardağ adı; verilirse enlem, boylam ve zirve yüksekliği katalogdan alınır
+site_longitude = 0.0  # Boylam (derece), DEM araziyi okumak için
+dem_directory = None  # DEM döşemeleri klasörü (bkz. engine/terrain.py); verilirse arazi analitik koni yerine DEM'den okunur
+particle_collisions = False  # İsteğe bağlı partikül-partikül çarpışmaları (komşu arama ile)
+collision_radius = 1.0  # Bu mesafeden yakın partiküller çarpışır (m)
+restitution = 0.5  # Çarpışma geri sıçrama katsayısı
+checkpoint_path = 'volcanos19_checkpoint.npz'  # Kontrol noktası dosyası (RNG durumu dahil)
+checkpoint_every = 0  # Her bu kadar adımda bir kontrol noktası yazılır; 0 ise kapalı (--checkpoint ile açılır)
+resume_path = None  # Devam edilecek kontrol noktası dosyası (komut satırından --resume)
+step_count = 0  # Tamamlanan simülasyon adımı sayısı
 
 # Partiküller ve hızlar
 particles = np.zeros((n_particles, 3))  # x, y, z koordinatları
 velocities = np.zeros((n_particles, 3))  # x, y, z hız bileşenleri
-
-# Terminal hız hesaplaması
-def calculate_terminal_velocity(Re, particle_diameter, sigma, mu, rho_a):
-    if Re > 500.0:
-        Vt = 3.1 * np.sqrt(g * sigma * particle_diameter / rho_a)
-    elif Re > 6.0:
-        Vt = (particle_diameter * 4 * g * sigma) / (225.0 * mu * rho_a) * (1 / 3)
-    else:
-        Vt = (g * sigma * particle_diameter**2) / (18.0 * mu)
-    return Vt
+diameters = np.full(n_particles, particle_diameter)  # Partikül başına çap (m)
+densities = np.full(n_particles, sigma)  # Partikül başına yoğunluk (kg/m^3)
 
 # Partikülleri başlat
 def initialize_particles():
-    global particles, velocities
+    global particles, velocities, diameters, densities, sim_time, step_count
+    sim_time = 0.0
+    step_count = 0
     theta = np.random.uniform(0, 2 * np.pi, n_particles)
     r = np.random.uniform(0, vent_radius / 3, n_particles)
     particles[:, 0] = r * np.cos(theta)
     particles[:, 1] = r * np.sin(theta)
     particles[:, 2] = vent_height
 
-    # Reynolds sayısı ve terminal hız hesaplaması
-    Re = (sigma * particle_diameter * w0) / mu
-    terminal_velocity = calculate_terminal_velocity(Re, particle_diameter, sigma, mu, rho_a)
+    # Tane boyu dağılımından çap ve yoğunluk
+    diameters = sample_grain_sizes(n_particles, particle_diameter, grain_sorting)
+    densities = grain_density(diameters, rho_pumice=sigma)
+
+    # Reynolds sayısı ve terminal hız hesaplaması (partikül başına, vent yüksekliğindeki hava ile)
+    air = air_properties(site_elevation + vent_height, site_latitude)
+    Re = reynolds_number(w0, diameters, air['density'], air['viscosity'])
+    vt = terminal_velocity(Re, diameters, densities, air['viscosity'], air['density'])
 
-    velocities[:, 0] = np.random.uniform(-terminal_velocity, terminal_velocity, n_particles)
-    velocities[:, 1] = np.random.uniform(-terminal_velocity, terminal_velocity, n_particles)
+    velocities[:, 0] = np.random.uniform(-vt, vt)
+    velocities[:, 1] = np.random.uniform(-vt, vt)
     velocities[:, 2] = np.random.uniform(30, 50, n_particles)
 
 # Yanardağ yüzeyi fonksiyonu
 def volcano_surface(x, y, height_factor=0.4, radius=vent_radius):
-    r = np.sqrt(x**2 + y**2)
-    return height_factor * (1 - np.sqrt(r / radius)) * radius
+    return concave_cone_surface(x, y, radius, height_factor)
+
+# Yüzey bir kez örneklenir, çarpışmalar bu harita üzerinden bilinear okunur
+terrain = build_heightmap(volcano_surface, heightmap_extent, heightmap_resolution)
 
 # Magma patlama fonksiyonu
+@profiled()
 def simulate_volcano_eruption(intensity, base_size, height, spread, time, eruption_time):
-    x = np.linspace(-base_size, base_size, 200)
-    y = np.linspace(-base_size, base_size, 200)
-    x, y = np.meshgrid(x, y)
-    z_base = height - np.sqrt(x**2 + y**2)
-    eruption = np.zeros_like(z_base)
-    if time >= eruption_time:
-        eruption = intensity * np.exp(-np.sqrt((x**2 + y**2) + (time-eruption_time)**2) / spread)
-    z = np.clip(z_base + eruption, 0, height + 30)
-    return x, y, z
+    return eruption_surface(intensity, base_size, height, spread, time, eruption_time)
 
 # Rüzgar oluşturma fonksiyonu
 def generate_random_wind():
@@ -88,35 +108,75 @@ def get_particle_colors():
     return colors
 
 # Partikülleri güncelle
+@profiled()
 def update_particles():
-    global particles, velocities, current_wind
+    global particles, velocities, current_wind, sim_time
     velocities[:, 2] -= g * 0.1  # Yerçekimi etkisi
     particles += velocities * 0.1  # Hareket
 
-    # Hava direnci ve rüzgar etkisi
-    velocities[:, 0:2] *= 0.98  # Hava direnci
-    velocities[:, 0] += current_wind[0]  # Rüzgar x bileşeni
-    velocities[:, 1] += current_wind[1]  # Rüzgar y bileşeni
+    # Hava direnci (Reynolds rejimine göre, her adımda güncel hızla ve partikülün yüksekliğindeki hava ile) ve rüzgar etkisi
+    air_props = air_properties(site_elevation + particles[:, 2], site_latitude)
+    rho_a, mu = air_props['density'], air_props['viscosity']
+    if wind_field is None:
+        apply_drag(velocities, diameters, densities, 0.1, rho_a=rho_a, mu=mu)
+        velocities[:, 0] += current_wind[0]  # Rüzgar x bileşeni
+        velocities[:, 1] += current_wind[1]  # Rüzgar y bileşeni
+    else:
+        # Partiküller rüzgar alanının kendi konumlarındaki hava hızına göre sürüklenir
+        air = sample_air_velocity(wind_field, sim_time, particles)
+        apply_drag(velocities, diameters, densities, 0.1, air, rho_a=rho_a, mu=mu)
+    sim_time += 0.1
+
+    # Partiküller yere çarptığında yanardağın eğiminde kayma (yavaşlama, Z hareketini durdurma)
+    resolve_ground_collision(particles, velocities, terrain, friction=0.9, g=g, dt=0.1)
+
+    # Partikül-partikül çarpışmaları (momentum korunur)
+    if particle_collisions:
+        collide_particles(particles, velocities, densities * diameters**3, collision_radius, restitution)
+
+# Kontrol noktası durumu
+def simulation_state():
+    """Devam ettirmek için gereken tüm simülasyon durumu."""
+    return {
+        'step_count': step_count,
+        'particles': particles,
+        'velocities': velocities,
+        'diameters': diameters,
+        'densities': densities,
+        'current_wind': current_wind,
+        'sim_time': sim_time,
+        'start_time': start_time,
+        'current_model': current_model
+    }
 
-    # Partiküller yere çarptığında yanardağın eğiminde kayma
-    for i in range(len(particles)):
-        if particles[i, 2] <= volcano_surface(particles[i, 0], particles[i, 1]):
-            particles[i, 2] = volcano_surface(particles[i, 0], particles[i, 1])
-            velocities[i, 0] *= 0.9  # Yavaşlama
-            velocities[i, 1] *= 0.9
-            velocities[i, 2] = 0  # Z ekseni hareketini durdur
+def restore_state(state):
+    """Kontrol noktasından okunan durumu global değişkenlere yükler."""
+    global diameters, densities, current_wind, sim_time, start_time, current_model, step_count
+    step_count = state['step_count']
+    particles[:] = state['particles']
+    velocities[:] = state['velocities']
+    diameters = state['diameters']
+    densities = state['densities']
+    current_wind = state['current_wind']
+    sim_time = state['sim_time']
+    start_time = state['start_time']
+    current_model = str(state['current_model'])
 
 # Simülasyonu güncelle ve çiz
+@profiled()
 def update_plot(frame):
-    global start_time
+    global start_time, step_count
     ax.cla()  # Eksenleri temizle
     update_particles()
+    step_count += 1
+    if checkpoint_due(step_count, checkpoint_every):
+        save_checkpoint(checkpoint_path, simulation_state())
 
     # Yanardağ yüzeyini çiz
     x = np.linspace(-vent_radius, vent_radius, 100)
     y = np.linspace(-vent_radius, vent_radius, 100)
     X, Y = np.meshgrid(x, y)
-    Z = volcano_surface(X, Y)
+    Z = sample_heightmap(terrain, X, Y)
     ax.plot_surface(X, Y, Z, cmap='copper', alpha=0.6)
 
     # Partikülleri renklendir
@@ -155,6 +215,34 @@ def start_simulation(event):
     start_time = 0  # Simülasyon başlangıç zamanını sıfırla
     initialize_particles()
 
+# Komut satırı: --resume ile kontrol noktasından devam
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Yanardağ partikül animasyonu")
+    parser.add_argument("--resume", help="Devam edilecek kontrol noktası dosyası (.npz)")
+    parser.add_argument("--checkpoint", nargs="?", const=checkpoint_path,
+                        help="Kontrol noktalarını aç (isteğe bağlı dosya adı, varsayılan %(const)s)")
+    parser.add_argument("--checkpoint-every", type=int, default=50,
+                        help="--checkpoint ile kaç adımda bir kontrol noktası yazılır")
+    parser.add_argument("--volcano", help="Katalogdaki yanardağ adı (processed_volcanoes.csv)")
+    parser.add_argument("--dem", help="DEM döşemeleri klasörü (.npy / .hgt / GeoTIFF)")
+    args = parser.parse_args()
+    resume_path = args.resume
+    if args.checkpoint:
+        checkpoint_path = args.checkpoint
+        checkpoint_every = args.checkpoint_every
+    volcano_name = args.volcano or volcano_name
+    dem_directory = args.dem or dem_directory
+
+# Katalogdaki yanardağ: vent zirvede, taban yüksekliği zirveden vent_height kadar aşağıda
+if volcano_name:
+    site_latitude, site_longitude, summit_elevation = catalog_site(volcano_name)
+    site_elevation = summit_elevation - vent_height
+if dem_directory:
+    terrain = volcano_heightmap(TerrainSource(dem_directory), site_latitude, site_longitude, heightmap_extent,
+                                heightmap_resolution, relative_to=site_elevation)
+if resume_path:
+    restore_state(load_checkpoint(resume_path))
+
 # Grafik ayarları
 fig = plt.figure(figsize=(10, 8))
 ax = fig.add_subplot(111, projection='3d')
@@ -166,7 +254,7 @@ button_start.on_clicked(start_simulation)
 
 # Model seçici radyo düğmeleri
 ax_radio = plt.axes([0.02, 0.7, 0.2, 0.2])
-radio = RadioButtons(ax_radio, ('Volcano', 'Magma'))
+radio = RadioButtons(ax_radio, ('Volcano', 'Magma'), active=('Volcano', 'Magma').index(current_model))
 radio.on_clicked(set_model)
 
 # Animasyon
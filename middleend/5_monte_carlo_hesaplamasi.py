@@ -1,7 +1,12 @@
+import argparse
+import time
 import numpy as np
-import pandas as pd
 import tkinter as tk
 from tkinter import scrolledtext
+from engine.trial_engine import iter_trials, trial_chunks, summarize
+from engine.result_export import ResultWriter
+from engine.sample_bank import distribution_summary
+from engine.ballistics import quadratic_drag_coefficient
 
 # #########################
 # # Monte Carlo Parametreleri
@@ -10,69 +15,24 @@ g = 9.81  # Yerçekimi ivmesi (m/s²)
 air_resistance = 0.98
 wind = np.array([0.0, 0.0])  # Rüzgar hızı (m/s)
 
-initial_mixture_density_mu = 5.74
-initial_mixture_density_sigma = 0.5
-mass_discharge_rate_mu = 1.5e6
-mass_discharge_rate_sigma = 1e5
-magma_temperature_mu = 1273.15
-magma_temperature_sigma = 50
-volatile_content_a = 3
-volatile_content_b = 2
-gas_constant_mu = 462
-gas_constant_sigma = 50
-Cva_min = 680
-Cva_max = 740
-Cvg_alpha = 2
-Cvg_beta = 0.5
-Cvs_mu = 1100
-Cvs_sigma = 100
+# Parametre örnekleri ortak örnek bankasından okunur (bkz. engine/sample_bank.py); rapor etiketleri
+parameter_labels = {
+    'initial_mixture_density': 'Initial Mixture Density (kg/m³)',
+    'mass_discharge_rate': 'Mass Discharge Rate (kg/s)',
+    'magma_temperature': 'Magma Temperature (K)',
+    'volatile_content': 'Volatile Content (%)',
+    'gas_constant': 'Gas Constant',
+    'Cva': 'Cva',
+    'Cvg': 'Cvg',
+    'Cvs': 'Cvs'
+}
 
 def simulate_distribution(n=1000):
     """
-    Monte Carlo simülasyonu ile parametrelerin ortalama ve standart sapmalarını hesaplar.
+    Ortak örnek bankasının ilk n satırından parametrelerin ortalama ve standart sapmalarını hesaplar.
     """
-    initial_mixture_density = np.random.normal(initial_mixture_density_mu, initial_mixture_density_sigma, n)
-    mass_discharge_rate = np.random.normal(mass_discharge_rate_mu, mass_discharge_rate_sigma, n)
-    magma_temperature = np.random.normal(magma_temperature_mu, magma_temperature_sigma, n)
-    volatile_content = np.random.beta(volatile_content_a, volatile_content_b, n) * 100
-    gas_constant = np.random.normal(gas_constant_mu, gas_constant_sigma, n)
-    Cva = np.random.triangular(Cva_min, (Cva_min + Cva_max) / 2, Cva_max, n)
-    Cvg = np.random.gamma(Cvg_alpha, Cvg_beta, n)
-    Cvs = np.random.normal(Cvs_mu, Cvs_sigma, n)
-    return {
-        'Initial Mixture Density (kg/m³)': {
-            'Mean': np.mean(initial_mixture_density),
-            'Std Dev': np.std(initial_mixture_density)
-        },
-        'Mass Discharge Rate (kg/s)': {
-            'Mean': np.mean(mass_discharge_rate),
-            'Std Dev': np.std(mass_discharge_rate)
-        },
-        'Magma Temperature (K)': {
-            'Mean': np.mean(magma_temperature),
-            'Std Dev': np.std(magma_temperature)
-        },
-        'Volatile Content (%)': {
-            'Mean': np.mean(volatile_content),
-            'Std Dev': np.std(volatile_content)
-        },
-        'Gas Constant': {
-            'Mean': np.mean(gas_constant),
-            'Std Dev': np.std(gas_constant)
-        },
-        'Cva': {
-            'Mean': np.mean(Cva),
-            'Std Dev': np.std(Cva)
-        },
-        'Cvg': {
-            'Mean': np.mean(Cvg),
-            'Std Dev': np.std(Cvg)
-        },
-        'Cvs': {
-            'Mean': np.mean(Cvs),
-            'Std Dev': np.std(Cvs)
-        }
-    }
+    summary = distribution_summary(n)
+    return {parameter_labels[name]: stats for name, stats in summary.items()}
 
 # #########################
 # # Simülasyon Parametreleri
@@ -92,206 +52,121 @@ n_rocks = 20            # Kayaç sayısı
 
 w0 = 800  # Çıkış hızı (m/s)
 
+# Balistik model: 'vacuum' (hava direnci yok), 'linear' (doğrusal sürüklenme) ya da 'quadratic' (tablo düzeltmeli)
+drag_model = 'vacuum'
+drag_tau = 20.0  # Doğrusal model için relaxation süresi (s); terminal hız g * tau
+clast_diameter = 0.5  # Karesel model için temsili kayaç çapı (m)
+clast_density = 2600  # Karesel model için kayaç yoğunluğu (kg/m³)
+
+# Deneme motoru: denemeler bellek bütçesine göre parçalanır, parçalar isteğe bağlı olarak paralel hesaplanır
+trial_memory_budget = 64 * 2**20  # Bir parçanın yaklaşık bellek sınırı (bayt)
+trial_workers = 1  # Paralel process sayısı (None: tüm çekirdekler)
+results_path = None  # Deneme başına sonuçlar (.parquet / .feather / .csv, komut satırından --results); None ise yazılmaz
+
 # #########################
 # # Fonksiyonlar
 # #########################
-def initialize_simulation():
-    """
-    Parçacıkların ve kayaçların başlangıç konum ve hızlarını belirler.
-    """
-    # Küller (Ash) - Bu sefer dahil etmeyeceğiz çünkü simülasyon döngüsünü kaldırıyoruz.
-    
-    # Partiküller
-    particles_pos = np.zeros((n_particles, 3))
-    particles_vel = np.zeros((n_particles, 3))
-    colors = np.zeros((n_particles, 3))
-    
-    theta_p = np.random.uniform(0, 2 * np.pi, n_particles)
-    phi_p = np.random.uniform(0, np.pi / 2, n_particles)  # Çıkış açısı (0 ile 90 derece arasında)
-    v_p = np.random.uniform(w0 / 2, w0, n_particles)  # Çıkış hızı
-    
-    particles_vel[:, 0] = v_p * np.cos(phi_p) * np.cos(theta_p)
-    particles_vel[:, 1] = v_p * np.cos(phi_p) * np.sin(theta_p)
-    particles_vel[:, 2] = v_p * np.sin(phi_p)
-    
-    particles_pos[:, 0] = 0
-    particles_pos[:, 1] = 0
-    particles_pos[:, 2] = vent_height
-    
-    # Renk ataması: 25 sarı, 25 turuncu, 25 kırmızı, 25 siyah
-    colors[:n_yellow] = [1, 1, 0]             # Sarı
-    colors[n_yellow:n_yellow + n_orange] = [1, 0.5, 0]  # Turuncu
-    colors[n_yellow + n_orange:n_yellow + n_orange + n_red] = [1, 0, 0]  # Kırmızı
-    colors[n_yellow + n_orange + n_red:] = [0, 0, 0]  # Siyah
-    
-    # Kayaçlar
-    rocks_pos = np.zeros((n_rocks, 3))
-    rocks_vel = np.zeros((n_rocks, 3))
-    rocks_color = np.zeros((n_rocks, 3))
-    rocks_color[:] = [0, 0, 0]  # Siyah renk
-    
-    theta_r = np.random.uniform(0, 2 * np.pi, n_rocks)
-    phi_r = np.random.uniform(0, np.pi / 2, n_rocks)  # Çıkış açısı
-    v_r = np.random.uniform(w0 / 2, w0, n_rocks)  # Çıkış hızı
-    
-    rocks_vel[:, 0] = v_r * np.cos(phi_r) * np.cos(theta_r)
-    rocks_vel[:, 1] = v_r * np.cos(phi_r) * np.sin(theta_r)
-    rocks_vel[:, 2] = v_r * np.sin(phi_r)
-    
-    rocks_pos[:, 0] = 0
-    rocks_pos[:, 1] = 0
-    rocks_pos[:, 2] = vent_height
-    
-    return particles_pos, particles_vel, colors, rocks_pos, rocks_vel, rocks_color
+def trajectory_options():
+    """drag_model'e karşılık gelen deneme motoru seçenekleri."""
+    if drag_model == 'linear':
+        return {'tau': drag_tau}
+    if drag_model == 'quadratic':
+        return {'k': quadratic_drag_coefficient(clast_diameter, clast_density)}
+    return {}
 
-def calculate_trajectory(v0, theta, phi):
-    """
-    Hava direnci ve rüzgar etkisini ihmal ederek mermi hareketi denklemlerini kullanarak
-    maksimum mesafe ve uçuş süresini hesaplar.
-    """
-    # Uçuş süresi
-    t_flight = (2 * v0 * np.sin(phi)) / g
-    
-    # Maksimum yatay mesafe
-    range_x = v0 * np.cos(phi) * t_flight
-    
-    return t_flight, range_x
+# #########################
+# # Deneme ve Raporlama
+# #########################
+def trial_rows(count, start, stop, particles, rocks):
+    """Bir parçadaki denemelerin sonuç dosyası satırları (deneme başına bir satır, parametre ve sonuç sütunları)."""
+    n = stop - start
+    columns = {
+        'trial_count': np.full(n, count),
+        'trial': np.arange(start, stop),
+        'w0': np.full(n, float(w0)),
+        'vent_height': np.full(n, float(vent_height)),
+        'drag_model': np.full(n, drag_model),
+        'n_particles': np.full(n, n_particles),
+        'n_rocks': np.full(n, n_rocks)
+    }
+    for prefix, trials in (('particle', particles), ('rock', rocks)):
+        for key, values in trials.items():
+            columns[f'{prefix}_{key}'] = values
+    return columns
 
-def calculate_results():
+def run_trial_set(count, seed=None, workers=None, writer=None, keep=True):
     """
-    Simülasyon olmadan parçacık ve kayaçların maksimum mesafe ve çarpma hızlarını hesaplar.
+    count adet gerçek deneme: her denemede tüm partiküller ve kayaçlar yeniden fırlatılır.
+
+    Deneme başına en uzak partikül/kayaç mesafesi, kimliği, konumu ve çarpma hızını içeren sözlük döner.
+    writer (ResultWriter) verilirse her parça hesaplandıkça dosyaya eklenir; keep=False ile
+    sonuçlar bellekte biriktirilmez (çok büyük koşular için) ve None döner.
     """
-    particles_pos, particles_vel, colors, rocks_pos, rocks_vel, rocks_color = initialize_simulation()
-    
-    # Parçacıklar için hesaplamalar
-    particle_ranges = []
-    particle_flight_times = []
-    particle_final_speeds = []
-    for i in range(n_particles):
-        v0 = np.linalg.norm(particles_vel[i])
-        theta = np.arctan2(particles_vel[i, 1], particles_vel[i, 0])
-        phi = np.arcsin(particles_vel[i, 2] / v0)
-        
-        t_flight, range_p = calculate_trajectory(v0, theta, phi)
-        particle_ranges.append(range_p)
-        particle_flight_times.append(t_flight)
-        
-        # Çarpma anındaki hız (sadece yerçekimi etkisi)
-        v_final = np.sqrt(particles_vel[i, 0]**2 + particles_vel[i, 1]**2 + (particles_vel[i, 2] - g * t_flight)**2)
-        particle_final_speeds.append(v_final)
-    
-    max_particle_distance = np.max(particle_ranges)
-    max_particle_id = np.argmax(particle_ranges)
-    max_particle_pos = particles_pos[max_particle_id] + particles_vel[max_particle_id] * particle_flight_times[max_particle_id]
-    
-    # Kayaçlar için hesaplamalar
-    rock_ranges = []
-    rock_flight_times = []
-    rock_final_speeds = []
-    for i in range(n_rocks):
-        v0 = np.linalg.norm(rocks_vel[i])
-        theta = np.arctan2(rocks_vel[i, 1], rocks_vel[i, 0])
-        phi = np.arcsin(rocks_vel[i, 2] / v0)
-        
-        t_flight, range_r = calculate_trajectory(v0, theta, phi)
-        rock_ranges.append(range_r)
-        rock_flight_times.append(t_flight)
-        
-        # Çarpma anındaki hız
-        v_final = np.sqrt(rocks_vel[i, 0]**2 + rocks_vel[i, 1]**2 + (rocks_vel[i, 2] - g * t_flight)**2)
-        rock_final_speeds.append(v_final)
-    
-    max_rock_distance = np.max(rock_ranges)
-    max_rock_id = np.argmax(rock_ranges)
-    max_rock_pos = rocks_pos[max_rock_id] + rocks_vel[max_rock_id] * rock_flight_times[max_rock_id]
-    max_rock_speed = rock_final_speeds[max_rock_id]
-    
-    return {
-        'max_particle_distance': max_particle_distance,
-        'max_particle_id': max_particle_id,
-        'max_particle_pos': max_particle_pos,
-        'max_particle_speed': particle_final_speeds[max_particle_id],
-        'max_rock_distance': max_rock_distance,
-        'max_rock_id': max_rock_id,
-        'max_rock_pos': max_rock_pos,
-        'max_rock_speed': max_rock_speed
-    }
+    workers = trial_workers if workers is None else workers
+    seeds = np.random.SeedSequence(seed).spawn(2)
+    options = dict(vent_height=vent_height, **trajectory_options())
+    # Partikül ve kayaç denemeleri aynı parça planıyla yürür, böylece her satır tek bir denemedir
+    chunks = trial_chunks(count, n_particles + n_rocks, trial_memory_budget)
+    particle_chunks = iter_trials(count, n_particles, w0, g, seeds[0].generate_state(4), workers=workers, chunks=chunks, **options)
+    rock_chunks = iter_trials(count, n_rocks, w0, g, seeds[1].generate_state(4), workers=workers, chunks=chunks, **options)
+    
+    parts = []
+    for (start, stop, particles), (_, _, rocks) in zip(particle_chunks, rock_chunks):
+        if writer is not None:
+            writer.write(trial_rows(count, start, stop, particles, rocks))
+        if keep:
+            parts.append((particles, rocks))
+    if not keep:
+        return None
+    return {name: {key: np.concatenate([part[i][key] for part in parts]) for key in parts[0][i]}
+            for i, name in enumerate(('particles', 'rocks'))}
 
-# #########################
-# # Deneme ve Raporlama
-# #########################
-def perform_trials(trial_counts):
+def perform_trials(trial_counts, seed=None, workers=None, path=None):
     """
     Belirtilen deneme sayılarına göre hesaplamaları yapar ve sonuçları raporlar.
+
+    Her deneme sayısı için o kadar deneme gerçekten hesaplanır; rapor deneme başına
+    en uzak mesafe ve çarpma hızı dağılımını (ortalama, standart sapma, P5/P50/P95) verir.
+    Deneme başına satırlar path (varsayılan results_path) dosyasına yazılır; ikisi de None ise yazılmaz.
     """
+    path = results_path if path is None else path
+    writer = ResultWriter(path) if path else None
     results = []
     report_lines = []
-    for count in trial_counts:
-        report_lines.append(f"\n{count} Deneme Başlatılıyor...")
-        print(f"\n{count} Deneme Başlatılıyor...")
-        trial_result = calculate_results()
-        results.append(trial_result)
-        report_lines.append(f"{count} Deneme Tamamlandı.")
-        print(f"{count} Deneme Tamamlandı.")
     
-    # Raporlama
-    for idx, count in enumerate(trial_counts):
-        report_lines.append(f"\n===== {count} Deneme Sonuçları =====")
-        print(f"\n===== {count} Deneme Sonuçları =====")
-        trial = results[idx]
-        report_lines.append(f"En Uzağa Giden Partikül ID: {trial['max_particle_id']}, Mesafe: {trial['max_particle_distance']:.2f} m")
-        print(f"En Uzağa Giden Partikül ID: {trial['max_particle_id']}, Mesafe: {trial['max_particle_distance']:.2f} m")
-        report_lines.append(f"Partikül Konumu: X={trial['max_particle_pos'][0]:.2f}, Y={trial['max_particle_pos'][1]:.2f}, Z={trial['max_particle_pos'][2]:.2f}")
-        print(f"Partikül Konumu: X={trial['max_particle_pos'][0]:.2f}, Y={trial['max_particle_pos'][1]:.2f}, Z={trial['max_particle_pos'][2]:.2f}")
-        report_lines.append(f"Partikül Çarpma Hızı: {trial['max_particle_speed']:.2f} m/s")
-        print(f"Partikül Çarpma Hızı: {trial['max_particle_speed']:.2f} m/s")
-        
-        report_lines.append(f"En Uzağa Giden Kayaç ID: {trial['max_rock_id']}, Mesafe: {trial['max_rock_distance']:.2f} m")
-        print(f"En Uzağa Giden Kayaç ID: {trial['max_rock_id']}, Mesafe: {trial['max_rock_distance']:.2f} m")
-        report_lines.append(f"Kayaç Konumu: X={trial['max_rock_pos'][0]:.2f}, Y={trial['max_rock_pos'][1]:.2f}, Z={trial['max_rock_pos'][2]:.2f}")
-        print(f"Kayaç Konumu: X={trial['max_rock_pos'][0]:.2f}, Y={trial['max_rock_pos'][1]:.2f}, Z={trial['max_rock_pos'][2]:.2f}")
-        report_lines.append(f"Kayaç Çarpma Hızı: {trial['max_rock_speed']:.2f} m/s")
-        print(f"Kayaç Çarpma Hızı: {trial['max_rock_speed']:.2f} m/s")
+    def report(line):
+        report_lines.append(line)
+        print(line)
     
-    # İstatistiklerin Hesaplanması
-    max_particle_distances = [res['max_particle_distance'] for res in results]
-    max_rock_distances = [res['max_rock_distance'] for res in results]
-    rock_speeds = [res['max_rock_speed'] for res in results]
-    
-    # Genel İstatistikler
-    report_lines.append("\n===== Genel İstatistikler =====")
-    print("\n===== Genel İstatistikler =====")
+    for count in trial_counts:
+        report(f"\n{count} Deneme Başlatılıyor...")
+        start = time.perf_counter()
+        results.append(run_trial_set(count, seed, workers, writer))
+        report(f"{count} Deneme Tamamlandı ({time.perf_counter() - start:.2f} s).")
+    if writer is not None:
+        writer.close()
+        report(f"\nDeneme sonuçları kaydedildi: {writer.path} ({writer.rows} satır)")
+    
+    # Raporlama: en uç deneme
     for count, res in zip(trial_counts, results):
-        report_lines.append(f"\n{count} Deneme için:")
-        print(f"\n{count} Deneme için:")
-        report_lines.append(f"  En Uzağa Giden Partikül Mesafesi: {res['max_particle_distance']:.2f} m")
-        print(f"  En Uzağa Giden Partikül Mesafesi: {res['max_particle_distance']:.2f} m")
-        report_lines.append(f"  En Uzağa Giden Kayaç Mesafesi: {res['max_rock_distance']:.2f} m")
-        print(f"  En Uzağa Giden Kayaç Mesafesi: {res['max_rock_distance']:.2f} m")
-        report_lines.append(f"  En Uzağa Giden Kayaç Çarpma Hızı: {res['max_rock_speed']:.2f} m/s")
-        print(f"  En Uzağa Giden Kayaç Çarpma Hızı: {res['max_rock_speed']:.2f} m/s")
-    
-    # Ortalama ve Standart Sapma
-    avg_particle_distance = np.mean(max_particle_distances)
-    std_particle_distance = np.std(max_particle_distances)
-    avg_rock_distance = np.mean(max_rock_distances)
-    std_rock_distance = np.std(max_rock_distances)
-    avg_rock_speed = np.mean(rock_speeds)
-    std_rock_speed = np.std(rock_speeds)
-    
-    report_lines.append(f"\nTüm Denemeler İçin Ortalama Partikül Mesafesi: {avg_particle_distance:.2f} m")
-    report_lines.append(f"Tüm Denemeler İçin Partikül Mesafesi Standart Sapması: {std_particle_distance:.2f} m")
-    report_lines.append(f"Tüm Denemeler İçin Ortalama Kayaç Mesafesi: {avg_rock_distance:.2f} m")
-    report_lines.append(f"Tüm Denemeler İçin Kayaç Mesafesi Standart Sapması: {std_rock_distance:.2f} m")
-    report_lines.append(f"Tüm Denemeler İçin Ortalama Kayaç Çarpma Hızı: {avg_rock_speed:.2f} m/s")
-    report_lines.append(f"Tüm Denemeler İçin Kayaç Çarpma Hızı Standart Sapması: {std_rock_speed:.2f} m/s")
-    
-    print(f"\nTüm Denemeler İçin Ortalama Partikül Mesafesi: {avg_particle_distance:.2f} m")
-    print(f"Tüm Denemeler İçin Partikül Mesafesi Standart Sapması: {std_particle_distance:.2f} m")
-    print(f"Tüm Denemeler İçin Ortalama Kayaç Mesafesi: {avg_rock_distance:.2f} m")
-    print(f"Tüm Denemeler İçin Kayaç Mesafesi Standart Sapması: {std_rock_distance:.2f} m")
-    print(f"Tüm Denemeler İçin Ortalama Kayaç Çarpma Hızı: {avg_rock_speed:.2f} m/s")
-    print(f"Tüm Denemeler İçin Kayaç Çarpma Hızı Standart Sapması: {std_rock_speed:.2f} m/s")
+        report(f"\n===== {count} Deneme Sonuçları =====")
+        for label, key in (('Partikül', 'particles'), ('Kayaç', 'rocks')):
+            trials = res[key]
+            worst = np.argmax(trials['max_distance'])
+            report(f"En Uzağa Giden {label}: Deneme {worst}, ID: {trials['max_id'][worst]}, Mesafe: {trials['max_distance'][worst]:.2f} m")
+            report(f"{label} Konumu: X={trials['landing_x'][worst]:.2f}, Y={trials['landing_y'][worst]:.2f}, Z=0.00, Uçuş Süresi: {trials['flight_time'][worst]:.2f} s")
+            report(f"{label} Çarpma Hızı: {trials['impact_speed'][worst]:.2f} m/s")
+    
+    # Deneme başına dağılım istatistikleri
+    report("\n===== Genel İstatistikler (deneme başına dağılım) =====")
+    for count, res in zip(trial_counts, results):
+        report(f"\n{count} Deneme için:")
+        for label, values in (('En Uzak Partikül Mesafesi (m)', res['particles']['max_distance']),
+                              ('En Uzak Kayaç Mesafesi (m)', res['rocks']['max_distance']),
+                              ('En Uzak Kayaç Çarpma Hızı (m/s)', res['rocks']['impact_speed'])):
+            stats = summarize(values)
+            report(f"  {label}: Ortalama {stats['Mean']:.2f}, Std {stats['Std Dev']:.2f}, "
+                   f"P5 {stats['P5']:.2f}, P50 {stats['P50']:.2f}, P95 {stats['P95']:.2f}")
     
     # Tkinter Penceresinde Raporu Gösterme
     root = tk.Tk()
@@ -316,6 +191,11 @@ def perform_trials(trial_counts):
 # # Çalıştırma
 # #########################
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo balistik deneme raporu")
+    parser.add_argument("--results", help="Deneme başına sonuç dosyası (.parquet / .feather / .csv)")
+    args = parser.parse_args()
+    results_path = args.results
+
     # Deneme sayıları listesi
     trial_counts = [10, 100, 1000]
     perform_trials(trial_counts)
@@ -0,0 +1,28 @@
+import importlib
+
+# Simülasyon fiziği paketi.
+#
+# Modüller import anında simülasyon çalıştırmaz, pencere ya da figür açmaz; matplotlib
+# ve tkinter sadece çizim yapan fonksiyonların içinde yüklenir. Alt modüller de ilk
+# erişimde yüklenir (PEP 562), böylece "import engine" sadece bu dosyayı okur:
+#   import engine
+#   engine.trial_engine.run_trials(...)   # trial_engine ve ballistics burada yüklenir
+# API işçileri ve toplu (batch) işler sadece kullandıkları modülleri belleğe alır.
+
+_submodules = {
+    'aerosol', 'atmosphere', 'ballistics', 'checkpoint', 'deposition', 'ejecta_2d', 'ejecta_3d', 'frame_stream',
+    'full_simulation', 'grain_size', 'heat_field', 'heightmap', 'interpolation', 'lava_flow',
+    'particle_interactions', 'particle_pool', 'profiling', 'result_export', 'sample_bank', 'sensitivity',
+    'settlement_timeline', 'spatial_hash', 'surrogate', 'sweep', 'terrain', 'trajectory', 'trial_engine',
+    'wind_field'
+}
+
+__all__ = sorted(_submodules)
+
+def __getattr__(name):
+    if name in _submodules:
+        return importlib.import_module(f'{__name__}.{name}')
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | _submodules)
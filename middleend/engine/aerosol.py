@@ -0,0 +1,220 @@
+import argparse
+
+import numpy as np
+
+from .profiling import profiled
+
+# Küresel stratosferik sülfat aerosolü yayılımı (enlem x boylam) ve yüzey soğuması.
+#
+# Patlamada stratosfere atılan SO2, e-katlanma süresiyle (~35 gün) sülfat aerosolüne
+# dönüşür; aerosol e-katlanma süresiyle (~1 yıl) stratosferden çekilir. İki tür de
+#   - boylam yönünde stratosferik zonal rüzgarla taşınır ve karışır: her enlem satırı
+#     FFT ile tam (spektral) kaydırılır ve sönümlenir, kutuplara yakın dar satırlarda da kararlıdır,
+#   - enlem yönünde Brewer-Dobson dolaşımıyla kutuplara taşınır ve eddy difüzyonuyla yayılır:
+#     hücre yüzlerinden akı biçiminde (kütle korunur) vektörel sonlu fark, upwind adveksiyon.
+# Zaman adımı meridyonel difüzyon / adveksiyon kararlılık sınırından seçilir.
+#
+# Aerosol optik derinliği (550 nm) sütun yükü ile kütle sönüm katsayısının çarpımıdır;
+# radyatif zorlama AOD ile doğrusal alınır ve tek kutulu enerji dengesi modeli
+# (C dT/dt = F - λ T) her enlem bandında çözülerek kaba bir yüzey soğuması tahmini verilir.
+#
+#   python -m engine.aerosol --tambora --years 3 --resolution 1 --output tambora.parquet
+
+earth_radius = 6.371e6  # m
+seconds_per_day = 86400.0
+so2_to_aerosol = (98.0 / 64.0) / 0.75  # SO2 -> %75 H2SO4 çözeltisi damlacık kütlesi
+extinction_coefficient = 3.4  # Kütle sönüm katsayısı (m²/g); küresel AOD ~ yük (Tg) / 150
+forcing_efficiency = -25.0  # Radyatif zorlama / AOD (W/m²)
+feedback = 1.25  # İklim geri besleme parametresi λ (W/m²/K)
+heat_capacity = 8.0  # Karışım tabakası ısı kapasitesi (W yıl / m² / K)
+
+# 1815 Tambora: konum ve magma hacmi (yoğun kaya eşdeğeri); SO2 ~60 Tg buz karotu tahminine denk gelir
+tambora_1815 = {'latitude': -8.25, 'longitude': 118.0, 'dre_volume_km3': 33.0}
+
+def so2_injection(dre_volume_km3, magma_density=2600.0, so2_fraction=7e-4):
+    """Patlayan magma hacminden (km³, yoğun kaya eşdeğeri) stratosfere atılan SO2 (Tg)."""
+    return dre_volume_km3 * 1e9 * magma_density * so2_fraction / 1e9
+
+def zonal_wind(latitude):
+    """Stratosferik zonal rüzgar (m/s): tropiklerde doğulu (QBO doğu fazı), orta enlemlerde batılı."""
+    return -10 * np.exp(-(latitude / 15)**2) + 20 * np.exp(-((np.abs(latitude) - 60) / 15)**2)
+
+def meridional_wind(latitude, speed=0.15):
+    """Brewer-Dobson dolaşımının kutuplara doğru hızı (m/s); ekvatorda ve kutuplarda sıfır."""
+    return speed * np.sin(np.radians(2 * latitude))
+
+def build_grid(resolution=1.0):
+    """Hücre merkezleri, enlem yüzeyleri ve hücre alanları (m²) içeren ızgara sözlüğü."""
+    n_lat = int(round(180 / resolution))
+    n_lon = int(round(360 / resolution))
+    lat_faces = np.linspace(-90, 90, n_lat + 1)
+    lat = 0.5 * (lat_faces[1:] + lat_faces[:-1])
+    lon = (np.arange(n_lon) + 0.5) * 360 / n_lon
+    d_lon = np.radians(360 / n_lon)
+    area = earth_radius**2 * d_lon * np.diff(np.sin(np.radians(lat_faces)))  # (n_lat,)
+    return {'lat': lat, 'lon': lon, 'lat_faces': lat_faces, 'd_lat': np.radians(180 / n_lat), 'd_lon': d_lon,
+            'area': area}
+
+def plume(grid, latitude, longitude, mass, width=5.0):
+    """mass kütlesini (kg) merkezi (enlem, boylam) olan width derecelik Gauss bulutu olarak dağıtır."""
+    d_lon = (grid['lon'][None, :] - longitude + 180) % 360 - 180
+    d_lat = grid['lat'][:, None] - latitude
+    weights = np.exp(-0.5 * ((d_lat**2 + (d_lon * np.cos(np.radians(latitude)))**2) / width**2))
+    weights = weights * grid['area'][:, None]
+    return mass * weights / weights.sum()
+
+def stable_time_step(grid, diffusivity, meridional_speed, safety=0.9):
+    """Meridyonel difüzyon ve upwind adveksiyonun açık şemada kararlı olduğu en büyük adım (s)."""
+    dy = earth_radius * grid['d_lat']
+    return safety / (2 * diffusivity / dy**2 + abs(meridional_speed) / dy)
+
+def _zonal_step(mass, factors):
+    """Her enlem satırını spektral olarak kaydırır ve sönümler (kütle korunur)."""
+    return np.fft.irfft(np.fft.rfft(mass, axis=-1) * factors, n=mass.shape[-1], axis=-1)
+
+def meridional_coefficients(grid, diffusivity, meridional_speed, dt):
+    """
+    Enlem yüzeylerinden bir adımda geçen kütle = alt * m[j] + üst * m[j + 1] katsayıları.
+
+    Akı, yüz uzunluğu ile (upwind adveksiyon - K dq/dy) çarpımıdır (q = m / alan); yön
+    kuzeye pozitif, kutup yüzlerinde akı yoktur.
+    """
+    face_lat = grid['lat_faces'][1:-1]
+    face_length = earth_radius * np.cos(np.radians(face_lat)) * grid['d_lon']
+    speed = meridional_wind(face_lat, meridional_speed)
+    diffusion = diffusivity / (earth_radius * grid['d_lat'])
+    lower = dt * face_length * (np.maximum(speed, 0) + diffusion) / grid['area'][:-1]
+    upper = dt * face_length * (np.minimum(speed, 0) - diffusion) / grid['area'][1:]
+    return lower[:, None], upper[:, None]
+
+def _meridional_step(mass, lower, upper):
+    """Enlem yüzeylerinden difüzyon + upwind adveksiyon akılarıyla kütleyi yerinde günceller."""
+    flux = lower * mass[..., :-1, :] + upper * mass[..., 1:, :]
+    mass[..., :-1, :] -= flux
+    mass[..., 1:, :] += flux
+    return mass
+
+@profiled(run=True)
+def run_aerosol(so2_tg, latitude, longitude, years=3.0, resolution=1.0, plume_width=5.0, so2_lifetime_days=35.0,
+                aerosol_lifetime_days=365.0, diffusivity=7e5, zonal_diffusivity=2e6, meridional_speed=0.15,
+                output_every_days=10.0):
+    """
+    so2_tg SO2'nin (enlem, boylam) üzerinde ani enjeksiyonundan sonra years yıllık yayılım.
+
+    Dönen sözlük: 'time_days', küresel 'aod', 'so2_tg', 'aerosol_tg', 'forcing' (W/m²),
+    'cooling' (K, negatif soğuma), enlem bantlarında 'zonal_aod' ve 'zonal_cooling'
+    (zaman x enlem), son andaki 'aod_map' (enlem x boylam), 'lat', 'lon' ve 'dt' (s).
+    """
+    grid = build_grid(resolution)
+    lat, area = grid['lat'], grid['area']
+    dt = min(stable_time_step(grid, diffusivity, meridional_speed), output_every_days * seconds_per_day)
+    steps_per_output = int(np.ceil(output_every_days * seconds_per_day / dt))
+    dt = output_every_days * seconds_per_day / steps_per_output
+    n_outputs = int(round(years * 365 / output_every_days))
+
+    # Zonal taşıma: satır başına boylam kayması (radyan) ve difüzyon sönümü, spektral çarpan olarak bir kez hesaplanır
+    circle = earth_radius * np.cos(np.radians(lat))[:, None]
+    k = np.arange(len(grid['lon']) // 2 + 1)[None, :]
+    shift = zonal_wind(lat)[:, None] * dt / circle
+    factors = np.exp(-1j * k * shift - zonal_diffusivity * k**2 * dt / circle**2)
+
+    lower, upper = meridional_coefficients(grid, diffusivity, meridional_speed, dt)
+
+    # Türler: 0 SO2, 1 sülfat aerosolü (kg/hücre); dönüşüm ve çekilme adım başına çarpan
+    mass = np.zeros((2, len(lat), len(grid['lon'])))
+    mass[0] = plume(grid, latitude, longitude, so2_tg * 1e9, plume_width)
+    converted = 1 - np.exp(-dt / (so2_lifetime_days * seconds_per_day))
+    removed = np.exp(-dt / (aerosol_lifetime_days * seconds_per_day))
+
+    zonal_temperature = np.zeros(len(lat))
+    relaxation = dt / (heat_capacity * 365 * seconds_per_day)
+    records = {name: np.zeros(n_outputs + 1) for name in ('time_days', 'aod', 'so2_tg', 'aerosol_tg', 'forcing',
+                                                          'cooling')}
+    zonal_aod = np.zeros((n_outputs + 1, len(lat)))
+    zonal_cooling = np.zeros((n_outputs + 1, len(lat)))
+    band_weights = area / area.sum()
+    band_scale = extinction_coefficient * 1e3 / (area * len(grid['lon']))  # Bant kütlesi (kg) -> ortalama AOD
+
+    def record(i, forcing):
+        aod_bands = band_scale * mass[1].sum(axis=1)
+        records['time_days'][i] = i * output_every_days
+        records['aod'][i] = aod_bands @ band_weights
+        records['so2_tg'][i] = mass[0].sum() / 1e9
+        records['aerosol_tg'][i] = mass[1].sum() / 1e9
+        records['forcing'][i] = forcing
+        records['cooling'][i] = zonal_temperature @ band_weights
+        zonal_aod[i] = aod_bands
+        zonal_cooling[i] = zonal_temperature
+
+    record(0, 0.0)
+    for i in range(1, n_outputs + 1):
+        for _ in range(steps_per_output):
+            mass = _zonal_step(mass, factors)
+            mass = _meridional_step(mass, lower, upper)
+            np.maximum(mass, 0, out=mass)  # Spektral kaydırmanın küçük negatif salınımları
+
+            # SO2 -> sülfat dönüşümü ve aerosolün stratosferden çekilmesi
+            produced = mass[0] * converted
+            mass[0] -= produced
+            mass[1] = (mass[1] + produced * so2_to_aerosol) * removed
+
+            # Enlem bantlarında enerji dengesi: C dT/dt = F - λ T
+            band_forcing = forcing_efficiency * band_scale * mass[1].sum(axis=1)
+            zonal_temperature += (band_forcing - feedback * zonal_temperature) * relaxation
+        record(i, band_forcing @ band_weights)
+
+    return {**records, 'zonal_aod': zonal_aod, 'zonal_cooling': zonal_cooling, 'aod_map': extinction_coefficient * 1e3 * mass[1] / area[:, None],
+            'lat': lat, 'lon': grid['lon'], 'dt': dt}
+
+def plot_aerosol(result, title="Stratosferik sülfat aerosolü"):
+    """Küresel AOD / soğuma zaman serileri ve enlem-zaman AOD haritası."""
+    import matplotlib.pyplot as plt
+
+    fig, (ax_series, ax_zonal) = plt.subplots(2, 1, figsize=(10, 8))
+    years = result['time_days'] / 365
+    ax_series.plot(years, result['aod'], color='tab:orange', label='AOD (550 nm)')
+    ax_series.set_ylabel('Küresel AOD')
+    ax_cooling = ax_series.twinx()
+    ax_cooling.plot(years, result['cooling'], color='tab:blue', label='Soğuma')
+    ax_cooling.set_ylabel('Yüzey sıcaklık değişimi (K)')
+    ax_series.set_title(title)
+    mesh = ax_zonal.pcolormesh(years, result['lat'], result['zonal_aod'].T, cmap='magma_r', shading='auto')
+    ax_zonal.set_xlabel('Yıl')
+    ax_zonal.set_ylabel('Enlem')
+    fig.colorbar(mesh, ax=ax_zonal, label='AOD')
+    fig.tight_layout()
+    plt.show()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Küresel sülfat aerosolü yayılımı ve yüzey soğuması")
+    parser.add_argument("--tambora", action="store_true", help="1815 Tambora senaryosu")
+    parser.add_argument("--latitude", type=float, default=tambora_1815['latitude'])
+    parser.add_argument("--longitude", type=float, default=tambora_1815['longitude'])
+    parser.add_argument("--dre-volume", type=float, default=tambora_1815['dre_volume_km3'],
+                        help="Patlayan magma hacmi (km³, yoğun kaya eşdeğeri)")
+    parser.add_argument("--so2", type=float, help="SO2 enjeksiyonu (Tg); verilmezse magma hacminden hesaplanır")
+    parser.add_argument("--years", type=float, default=3.0)
+    parser.add_argument("--resolution", type=float, default=1.0, help="Izgara aralığı (derece)")
+    parser.add_argument("--output", help="Zaman serisi dosyası (.parquet, .feather, .csv)")
+    parser.add_argument("--plot", action="store_true")
+    args = parser.parse_args()
+
+    if args.tambora:
+        args.latitude, args.longitude = tambora_1815['latitude'], tambora_1815['longitude']
+        args.dre_volume = tambora_1815['dre_volume_km3']
+    so2 = args.so2 if args.so2 is not None else so2_injection(args.dre_volume)
+    result = run_aerosol(so2, args.latitude, args.longitude, args.years, args.resolution)
+
+    peak = int(np.argmax(result['aod']))
+    print(f"SO2 enjeksiyonu: {so2:.1f} Tg, zaman adımı: {result['dt'] / 3600:.2f} saat")
+    print(f"En yüksek küresel AOD: {result['aod'][peak]:.3f} ({result['time_days'][peak]:.0f}. gün)")
+    print(f"En büyük küresel soğuma: {result['cooling'].min():.2f} K "
+          f"({result['time_days'][np.argmin(result['cooling'])]:.0f}. gün)")
+    if args.output:
+        from .result_export import ResultWriter
+        with ResultWriter(args.output) as writer:
+            writer.write({name: result[name] for name in ('time_days', 'aod', 'so2_tg', 'aerosol_tg', 'forcing',
+                                                          'cooling')})
+        print(f"Zaman serisi kaydedildi: {writer.path}")
+    if args.plot:
+        plot_aerosol(result, "1815 Tambora" if args.tambora else "Stratosferik sülfat aerosolü")
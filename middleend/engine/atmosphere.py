@@ -0,0 +1,132 @@
+from functools import lru_cache
+
+import numpy as np
+
+from .interpolation import regular_grid_interpolate, axis_spacing
+
+# Enleme bağlı standart atmosfer profili ve önceden hesaplanmış arama tabloları.
+#
+# Sıcaklık troposferde sabit lapse rate ile düşer, tropopozdan 20 km'ye kadar sabit kalır,
+# üstünde ISA stratosfer gradyanlarıyla artar. Tropopoz yüksekliği ve yer sıcaklığı enleme
+# bağlıdır. Basınç hidrostatik dengeden (dp/dz = -p g / (R T)) integre edilir; yoğunluk ideal
+# gazdan, dinamik viskozite Sutherland bağıntısından, ortalama yatay rüzgar troposfer
+# jetinin basit bir profilinden hesaplanır.
+#
+# Tablolar (enlem x yükseklik x alan) ilk kullanımda bir kez kurulur; sorgular tek bir
+# vektörel bilinear interpolasyonla tüm alanları birlikte döner, yani partikül başına
+# hava özellikleri tablo okuma maliyetindedir. Tek bir enlemdeki sorgular (simülasyon
+# adımlarında olduğu gibi) o enlemin önbelleğe alınmış yükseklik sütunundan okunur.
+
+g = 9.81
+R_air = 287.05  # Kuru havanın gaz sabiti (J/(kg K))
+sea_level_pressure = 101325.0  # Pa
+lapse_rate = 6.5e-3  # Troposfer sıcaklık düşüşü (K/m)
+sutherland_mu_ref = 1.716e-5  # Pa s, T_ref sıcaklığında
+sutherland_T_ref = 273.15  # K
+sutherland_S = 110.4  # K
+surface_wind = 5.0  # Yer seviyesinde ortalama rüzgar (m/s)
+
+# Tablo eksenleri: yükseklik (m) ve enlem (derece); alan sırası fields listesindedir
+table_axes = {
+    'latitude': np.linspace(-90, 90, 73),
+    'altitude': np.linspace(0, 40000, 161)
+}
+fields = ['temperature', 'pressure', 'density', 'viscosity', 'wind_speed']
+_tables = None
+column_cache_size = 64  # Varsayılan tablolar için önbellekte tutulan en fazla enlem sütunu
+
+def surface_temperature(latitude):
+    """Deniz seviyesi sıcaklığı (K): ekvatorda ~30 °C, kutuplarda ~-15 °C."""
+    return 273.15 - 15 + 45 * (1 - np.abs(latitude) / 90)
+
+def tropopause_height(latitude):
+    """Tropopoz yüksekliği (m): ekvatorda ~17 km, kutuplarda ~8 km."""
+    return 8000 + 9000 * np.cos(np.radians(latitude))**2
+
+def temperature_profile(altitude, latitude):
+    """Yükseklik ve enleme göre sıcaklık (K): troposfer, izotermal tropopoz, ısınan stratosfer."""
+    altitude = np.asarray(altitude, dtype=float)
+    tropopause = tropopause_height(latitude)
+    T = surface_temperature(latitude) - lapse_rate * np.minimum(altitude, tropopause)
+    base = np.maximum(tropopause, 20000.0)  # Stratosfer ısınması 20 km'den (ya da tropopozdan) başlar
+    T = T + 1.0e-3 * np.clip(altitude - base, 0, None)
+    return T + 1.8e-3 * np.clip(altitude - np.maximum(base, 32000.0), 0, None)
+
+def sutherland_viscosity(T):
+    """Havanın dinamik viskozitesi (Pa s), Sutherland bağıntısı."""
+    return sutherland_mu_ref * (T / sutherland_T_ref)**1.5 * (sutherland_T_ref + sutherland_S) / (T + sutherland_S)
+
+def wind_profile(altitude, latitude):
+    """Ortalama yatay rüzgar hızı (m/s): yerden tropopozdaki jete doğru artar, üstünde söner."""
+    altitude = np.asarray(altitude, dtype=float)
+    jet = 10 + 25 * np.exp(-((np.abs(latitude) - 35) / 20)**2)  # Orta enlemlerde en güçlü
+    tropopause = tropopause_height(latitude)
+    rising = surface_wind + (jet - surface_wind) * np.clip(altitude / tropopause, 0, 1)
+    decay = np.exp(-(np.clip(altitude - tropopause, 0, None) / 6000)**2)
+    return surface_wind + (rising - surface_wind) * decay
+
+def build_tables(latitudes=None, altitudes=None):
+    """
+    Atmosfer tablolarını kurar.
+
+    Dönen sözlük: 'latitude', 'altitude' eksenleri ve (enlem, yükseklik, alan) boyutlu
+    'values' dizisi; alan sırası fields listesindedir.
+    """
+    latitudes = table_axes['latitude'] if latitudes is None else np.asarray(latitudes, dtype=float)
+    altitudes = table_axes['altitude'] if altitudes is None else np.asarray(altitudes, dtype=float)
+    lat, z = np.meshgrid(latitudes, altitudes, indexing='ij')
+    T = temperature_profile(z, lat)
+
+    # Hidrostatik denge: ln p(z) = ln p0 - g / R ∫ dz / T (yamuk kuralı)
+    inverse_T = 1 / T
+    integral = np.concatenate((np.zeros((len(latitudes), 1)),
+                               np.cumsum(0.5 * (inverse_T[:, 1:] + inverse_T[:, :-1]) * np.diff(altitudes), axis=1)),
+                              axis=1)
+    pressure = sea_level_pressure * np.exp(-g / R_air * integral)
+
+    values = np.stack([T, pressure, pressure / (R_air * T), sutherland_viscosity(T), wind_profile(z, lat)], axis=-1)
+    return {'latitude': latitudes, 'altitude': altitudes, 'values': values}
+
+def get_tables():
+    """Varsayılan eksenlerle tabloları (ilk çağrıda kurulur) döner."""
+    global _tables
+    if _tables is None:
+        _tables = build_tables()
+    return _tables
+
+@lru_cache(maxsize=column_cache_size)
+def _default_column(latitude):
+    """Varsayılan tablolardan tek enlem sütunu (en son kullanılan column_cache_size enlem önbellekte kalır)."""
+    return _interpolate_column(get_tables(), latitude)
+
+def _interpolate_column(source, latitude):
+    lat_origin, lat_step = axis_spacing(source['latitude'])
+    return regular_grid_interpolate(source['values'], (lat_origin,), (lat_step,), (latitude,))
+
+def altitude_column(latitude, tables=None):
+    """Tek bir enlemdeki (yükseklik, alan) tablosu; varsayılan tablolar için sınırlı LRU önbelleğinden okunur."""
+    if tables is None:
+        return _default_column(float(latitude))
+    return _interpolate_column(tables, latitude)
+
+def air_properties(altitude, latitude=45.0, tables=None):
+    """
+    Verilen yükseklik (m) ve enlemdeki (derece) hava özellikleri (dizi girişleri desteklenir).
+
+    Dönen sözlük: 'temperature' (K), 'pressure' (Pa), 'density' (kg/m³), 'viscosity' (Pa s),
+    'wind_speed' (m/s). Tablo dışındaki yükseklikler en yakın kenar değerini alır.
+    """
+    source = get_tables() if tables is None else tables
+    z_origin, z_step = axis_spacing(source['altitude'])
+    if np.ndim(latitude) == 0:
+        # Tek enlem: sütunda doğrusal interpolasyon, indeks ve ağırlık tüm alanlar için bir kez hesaplanır
+        column = altitude_column(float(latitude), tables)
+        f = np.clip((np.asarray(altitude, dtype=float) - z_origin) / z_step, 0, len(column) - 1)
+        i = np.minimum(f.astype(np.intp), len(column) - 2)
+        w = (f - i)[..., None]
+        values = column[i] * (1 - w) + column[i + 1] * w
+        return {name: values[..., k] for k, name in enumerate(fields)}
+    lat_origin, lat_step = axis_spacing(source['latitude'])
+    values = regular_grid_interpolate(source['values'], (lat_origin, z_origin), (lat_step, z_step),
+                                      (latitude, altitude))
+    return {name: values[..., k] for k, name in enumerate(fields)}
@@ -0,0 +1,345 @@
+import numpy as np
+
+from .interpolation import regular_grid_interpolate
+
+# Vektörel, zaman adımsız balistik çözücü.
+#
+# Fırlatma hızı, yükseliş açısı (yataydan, radyan), azimut ve vent yüksekliği dizileri
+# için menzil, uçuş süresi, tepe noktası ve çarpma hızı kapalı formla hesaplanır:
+#   - vakum: ikinci derece denklemin pozitif kökü (vent yüksekliği dahil)
+#   - doğrusal sürüklenme (relaxation süresi tau, isteğe bağlı rüzgar): iniş anı
+#     Lambert W fonksiyonunun ana dalıyla (W0) bulunur
+#   - karesel sürüklenme: vakum çözümü, boyutsuz (açı, β, h*) tablosundan okunan
+#     düzeltme oranlarıyla ölçeklenir; tablo bir kez sayısal integrasyonla üretilir
+#
+# Dönen sözlükler: 'flight_time', 'range', 'x', 'y', 'apex_time', 'apex_height',
+# 'impact_velocity' (n, 3) ve 'impact_speed'.
+
+g = 9.81
+
+def launch_angles(vx, vy, vz):
+    """Hız bileşenlerinden hız büyüklüğü, yükseliş açısı ve azimut."""
+    vh = np.hypot(vx, vy)
+    return np.hypot(vh, vz), np.arctan2(vz, vh), np.arctan2(vy, vx)
+
+def _components(speed, elevation, azimuth):
+    speed, elevation, azimuth = np.broadcast_arrays(np.asarray(speed, dtype=float),
+                                                    np.asarray(elevation, dtype=float),
+                                                    np.asarray(azimuth, dtype=float))
+    vh = speed * np.cos(elevation)
+    return vh, speed * np.sin(elevation), np.cos(azimuth), np.sin(azimuth)
+
+def _result(t, vh_range, cos_a, sin_a, apex_time, apex_height, vx, vy, vz):
+    return {
+        'flight_time': t,
+        'range': vh_range,
+        'x': vh_range * cos_a,
+        'y': vh_range * sin_a,
+        'apex_time': apex_time,
+        'apex_height': apex_height,
+        'impact_velocity': np.stack((vx, vy, vz), axis=-1),
+        'impact_speed': np.sqrt(vx**2 + vy**2 + vz**2)
+    }
+
+def vacuum_trajectory(speed, elevation, azimuth=0.0, vent_height=0.0, g=g):
+    """Hava direnci olmadan, vent_height yüksekliğinden fırlatılan cisimlerin yörüngesi."""
+    vh, vz, cos_a, sin_a = _components(speed, elevation, azimuth)
+    h = np.asarray(vent_height, dtype=float)
+    t = (vz + np.sqrt(vz**2 + 2 * g * h)) / g
+    apex_time = np.maximum(vz, 0) / g
+    return _result(t, vh * t, cos_a, sin_a, apex_time, h + vz * apex_time - 0.5 * g * apex_time**2,
+                   vh * cos_a, vh * sin_a, vz - g * t)
+
+def lambert_w0(x, iterations=6):
+    """Lambert W fonksiyonunun ana dalı (x >= -1/e), Halley iterasyonu ile."""
+    x = np.asarray(x, dtype=float)
+    # Başlangıç: dal noktası (-1/e) yakınında seri, diğer yerlerde log(1 + x)
+    p = np.sqrt(np.maximum(2 * (np.e * x + 1), 0))
+    w = np.where(x < -0.25, -1 + p - p**2 / 3 + 11 / 72 * p**3, np.log1p(np.maximum(x, -0.25)))
+    for _ in range(iterations):
+        ew = np.exp(w)
+        f = w * ew - x
+        wp1 = w + 1
+        denominator = ew * wp1 - (w + 2) * f / (2 * np.where(wp1 == 0, 1e-300, wp1))
+        w = w - f / np.where(denominator == 0, 1e-300, denominator)
+    return np.where(x <= -1 / np.e, -1.0, w)
+
+def linear_drag_trajectory(speed, elevation, azimuth=0.0, vent_height=0.0, tau=10.0, g=g, wind=(0.0, 0.0)):
+    """
+    Doğrusal sürüklenmeli (dv/dt = -g ẑ - (v - rüzgar) / tau) yörünge.
+
+    tau: relaxation süresi (s), terminal hız g·tau; skaler ya da cisim başına dizi.
+    wind: yatay hava hızı (x, y); cisimler yatayda rüzgar hızına doğru sürüklenir.
+    """
+    vh, vz, cos_a, sin_a = _components(speed, elevation, azimuth)
+    h = np.asarray(vent_height, dtype=float)
+    tau = np.asarray(tau, dtype=float)
+    vx0, vy0 = vh * cos_a, vh * sin_a
+    vt = g * tau
+
+    # z(t) = h + tau (vz + vt)(1 - e^{-t/tau}) - vt t = 0  =>  t = tau (c + W0(-a e^{-c}))
+    a = (vz + vt) / vt
+    c = (h + tau * (vz + vt)) / (vt * tau)
+    t = tau * (c + lambert_w0(-a * np.exp(-c)))
+    # Sürüklenme zayıfken (büyük tau) W0 dal noktasına yaklaşır; iki Newton adımıyla hassasiyet korunur
+    for _ in range(2):
+        decay = np.exp(-t / tau)
+        z = h - tau * (vz + vt) * np.expm1(-t / tau) - vt * t
+        dz = (vz + vt) * decay - vt
+        t = t - z / np.where(dz == 0, -1e-300, dz)
+
+    decay = np.exp(-t / tau)
+    grow = -np.expm1(-t / tau)
+    wx, wy = wind
+    x = wx * t + tau * (vx0 - wx) * grow
+    y = wy * t + tau * (vy0 - wy) * grow
+
+    # Tepe noktası: vz(t) = 0  =>  t = tau ln(1 + vz / vt); yükselme = vt tau (q - ln(1 + q)), q = vz / vt
+    q = np.maximum(vz, 0) / vt
+    apex_time = tau * np.log1p(q)
+    rise = vt * tau * np.where(q < 1e-4, q**2 / 2 - q**3 / 3 + q**4 / 4, q - np.log1p(q))
+
+    result = _result(t, np.hypot(x, y), 1.0, 0.0, apex_time, h + rise,
+                     wx + (vx0 - wx) * decay, wy + (vy0 - wy) * decay, (vz + vt) * decay - vt)
+    result['x'], result['y'] = x, y
+    return result
+
+def stokes_relaxation_time(diameter, density, mu=1.81e-5):
+    """Stokes rejiminde relaxation süresi tau = ρ d² / (18 μ) (s)."""
+    return density * np.asarray(diameter, dtype=float)**2 / (18 * mu)
+
+def quadratic_drag_coefficient(diameter, density, rho_a=1.225, cd=1.0):
+    """Karesel sürüklenme katsayısı k (1/m): dv/dt = -g ẑ - k |v| v."""
+    return 3 * rho_a * cd / (4 * density * np.asarray(diameter, dtype=float))
+
+# #########################
+# # Karesel sürüklenme düzeltme tablosu
+# #########################
+# Boyutsuz yörünge (hız v0, zaman v0/g, uzunluk v0²/g ile ölçeklenir) sadece açıya,
+# β = k v0² / g sürüklenme parametresine ve h* = h g / v0² vent yüksekliğine bağlıdır.
+# Tablo her (açı, log10 β, log10(h* + 1e-4)) noktası için vakum çözümüne oranları tutar:
+# menzil, uçuş süresi, tepe yükselmesi, çarpmadaki yatay ve dikey hız, tepe zamanı.
+# Güçlü sürüklenmede oranlar h* ~ 1 / β ölçeğinde değişir; logaritmik yükseklik ekseni bu
+# ölçeği her β için aynı sıklıkta örnekler (h* = 0 ilk düğümdür).
+#
+# Geçerli aralık: açı -90° - 90° (aşağı doğru fırlatma dahil), h* <= 10**1.25 (~17.8) ve
+# β <= 1e2. Bu aralığın dışındaki cisimler tablo yerine doğrudan sayısal integrasyonla
+# çözülür. β < 1e-3 için sürüklenme ihmal edilebilir, kenar değeri (oran ~1) kullanılır.
+# Çok ince taneler (β >> 100) için doğrusal sürüklenme modeli daha uygundur; integrasyon
+# orada yavaştır. Aralık içinde menzil, uçuş süresi ve çarpma hızının integrasyona göre
+# bağıl hatası P99'da %5'in altındadır (validate_drag_table); yerden (h* ~ 0) yataya yakın
+# (|açı| < 5°) fırlatılan ve güçlü sürüklenen (β > 10) cisimlerde hata daha büyüktür.
+#
+#   python -m engine.ballistics --check   (tablo doğruluğu ve 5_monte_carlo senaryosunda tablo dışı oranı)
+
+drag_table_axes = {
+    'elevation_deg': np.linspace(-90, 90, 37),
+    'log10_beta': np.linspace(-3, 2, 41),
+    'log10_height': np.linspace(-4, 1.25, 22)  # log10(h* + height_offset)
+}
+height_offset = 1e-4
+_drag_table = None
+
+def _integrate_quadratic(elevation, beta, h, steps_per_flight=400, max_steps=20000):
+    """Boyutsuz karesel sürüklenme denklemini (RK4, cisim başına uyarlanır adım) inişe kadar çözer."""
+    n = len(elevation)
+    state = np.zeros((n, 4))  # x, z, vx, vz
+    state[:, 1] = h
+    state[:, 2] = np.cos(elevation)
+    state[:, 3] = np.sin(elevation)
+    out = np.zeros((n, 6))  # menzil, süre, tepe yüksekliği, çarpmada vx, vz, tepe zamanı
+    out[:, 2] = h
+    t = np.zeros(n)
+    vacuum_time = state[:, 3] + np.sqrt(state[:, 3]**2 + 2 * h)
+    t_estimate = vacuum_time + h * np.sqrt(beta) + 1e-3
+    active = np.arange(n)
+
+    def derivative(s, b):
+        speed = np.hypot(s[:, 2], s[:, 3])
+        return np.column_stack((s[:, 2], s[:, 3], -b * speed * s[:, 2], -1 - b * speed * s[:, 3]))
+
+    for _ in range(max_steps):
+        if len(active) == 0:
+            break
+        s = state[active]
+        b = beta[active]
+        speed = np.hypot(s[:, 2], s[:, 3])
+        dt = np.minimum(t_estimate[active] / steps_per_flight, 0.5 / (b * speed + 1e-12))[:, None]
+        k1 = derivative(s, b)
+        k2 = derivative(s + 0.5 * dt * k1, b)
+        k3 = derivative(s + 0.5 * dt * k2, b)
+        k4 = derivative(s + dt * k3, b)
+        new = s + dt / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+
+        rising = new[:, 1] > out[active, 2]
+        out[active[rising], 2] = new[rising, 1]
+        out[active[rising], 5] = t[active[rising]] + dt[rising, 0]
+        landed = new[:, 1] <= 0
+        if landed.any():
+            old = s[landed]
+            fraction = old[:, 1] / np.maximum(old[:, 1] - new[landed, 1], 1e-300)
+            hit = old + fraction[:, None] * (new[landed] - old)
+            idx = active[landed]
+            out[idx, 0] = hit[:, 0]
+            out[idx, 1] = t[idx] + fraction * dt[landed, 0]
+            out[idx, 3] = hit[:, 2]
+            out[idx, 4] = hit[:, 3]
+        state[active] = new
+        t[active] += dt[:, 0]
+        active = active[~landed]
+    return out
+
+def _drag_ratios(elevation, beta, h):
+    """Boyutsuz (açı, β, h*) noktalarında integrasyonla vakum çözümüne oranlar (nokta, 6)."""
+    drag = _integrate_quadratic(elevation, beta, h)
+    vacuum = vacuum_trajectory(1.0, elevation, 0.0, h, g=1.0)
+    reference = np.column_stack((vacuum['range'], vacuum['flight_time'], vacuum['apex_height'] - h,
+                                 vacuum['impact_velocity'][:, 0], vacuum['impact_velocity'][:, 2],
+                                 vacuum['apex_time']))
+    measured = drag.copy()
+    measured[:, 2] -= h
+    safe = np.abs(reference) > 1e-9
+    return np.where(safe, measured / np.where(safe, reference, 1.0), 1.0)
+
+def build_drag_table(path=None):
+    """Karesel sürüklenme düzeltme tablosunu üretir (birkaç saniye); path verilirse .npz olarak kaydeder."""
+    el, lb, lh = np.meshgrid(np.radians(drag_table_axes['elevation_deg']), drag_table_axes['log10_beta'],
+                             drag_table_axes['log10_height'], indexing='ij')
+    # Tam dikeyde vakum menzili sıfırdır; oranın limit değeri dikeye çok yakın açıda alınır
+    el = np.clip(el, -np.pi / 2 + 1e-4, np.pi / 2 - 1e-4)
+    ratio = _drag_ratios(el.ravel(), 10.0**lb.ravel(), np.maximum(10.0**lh.ravel() - height_offset, 0.0))
+    table = ratio.reshape(tuple(len(a) for a in drag_table_axes.values()) + (ratio.shape[1],))
+    if path:
+        np.savez(path, table=table, **drag_table_axes)
+    return table
+
+def load_drag_table(path=None):
+    """Düzeltme tablosunu path'ten yükler ya da (ilk kullanımda bir kez) üretir."""
+    global _drag_table
+    if path:
+        with np.load(path) as data:
+            if any(not np.array_equal(data[name], axis) for name, axis in drag_table_axes.items()):
+                raise ValueError(f"{path} farklı tablo eksenleriyle üretilmiş, tabloyu yeniden üretin.")
+            _drag_table = data['table']
+    elif _drag_table is None:
+        _drag_table = build_drag_table()
+    return _drag_table
+
+def _table_coordinates(elevation, beta, h_star):
+    return np.degrees(elevation), np.log10(np.maximum(beta, 1e-12)), np.log10(h_star + height_offset)
+
+def _outside_table(coords):
+    """Tablonun geçerli aralığı dışındaki (β > 1e2 ya da h* > ~17.8) noktaların maskesi."""
+    axes = list(drag_table_axes.values())
+    return (coords[1] > axes[1][-1]) | (coords[2] > axes[2][-1])
+
+def _table_ratios(table, elevation, beta, h_star):
+    """Boyutsuz noktalarda tablodan okunan oranlar; tablonun geçerli aralığı dışındakiler integrasyonla."""
+    axes = list(drag_table_axes.values())
+    coords = _table_coordinates(elevation, beta, h_star)
+    ratio = regular_grid_interpolate(table, [a[0] for a in axes], [a[1] - a[0] for a in axes],
+                                     np.broadcast_arrays(*coords))
+    ratio = ratio.reshape(np.shape(elevation) + (table.shape[-1],))
+    outside = _outside_table(coords)
+    if outside.any():
+        ratio[outside] = _drag_ratios(elevation[outside], beta[outside], h_star[outside])
+    return ratio
+
+def _dimensionless(shape, speed, elevation, vent_height, k, g):
+    """shape boyutuna genişletilmiş hız ve açı ile boyutsuz β ve h*."""
+    speed, elevation, h, k = (np.broadcast_to(np.asarray(a, dtype=float), shape)
+                              for a in (speed, elevation, vent_height, k))
+    return speed, elevation, k * speed**2 / g, h * g / np.maximum(speed, 1e-12)**2
+
+def integration_fraction(speed, elevation, vent_height=0.0, k=1e-3, g=g):
+    """Tablonun geçerli aralığı dışında kalıp integrasyonla çözülecek cisimlerin oranı."""
+    shape = np.broadcast_shapes(*(np.shape(a) for a in (speed, elevation, vent_height, k)))
+    _, elevation, beta, h_star = _dimensionless(shape, speed, elevation, vent_height, k, g)
+    return float(np.mean(_outside_table(_table_coordinates(elevation, beta, h_star))))
+
+def quadratic_drag_trajectory(speed, elevation, azimuth=0.0, vent_height=0.0, k=1e-3, g=g, table=None):
+    """
+    Karesel sürüklenmeli (dv/dt = -g ẑ - k |v| v) yörünge, tablo düzeltmesiyle.
+
+    k: quadratic_drag_coefficient ile hesaplanan katsayı (1/m). Rüzgar bu modelde yoktur.
+    Tablonun geçerli aralığı dışındaki cisimler (yukarıdaki açıklama) integrasyonla çözülür.
+    """
+    table = load_drag_table() if table is None else table
+    vacuum = vacuum_trajectory(speed, elevation, azimuth, vent_height, g)
+    shape = np.broadcast_shapes(np.shape(vacuum['range']), np.shape(k))
+    speed, elevation, beta, h_star = _dimensionless(shape, speed, elevation, vent_height, k, g)
+    h = np.broadcast_to(np.asarray(vent_height, dtype=float), shape)
+    ratio = _table_ratios(table, elevation, beta, h_star)
+
+    vh_range = vacuum['range'] * ratio[..., 0]
+    vh_impact = np.hypot(vacuum['impact_velocity'][..., 0], vacuum['impact_velocity'][..., 1]) * ratio[..., 3]
+    _, _, cos_a, sin_a = _components(speed, elevation, azimuth)
+    apex_rise = vacuum['apex_height'] - h
+    return _result(vacuum['flight_time'] * ratio[..., 1], vh_range, cos_a, sin_a,
+                   vacuum['apex_time'] * ratio[..., 5], h + apex_rise * ratio[..., 2],
+                   vh_impact * cos_a, vh_impact * sin_a, vacuum['impact_velocity'][..., 2] * ratio[..., 4])
+
+def _scaled_outputs(elevation, h_star, ratio):
+    """Boyutsuz oranlardan (v0 = g = 1) menzil, uçuş süresi ve çarpma hızı (nokta, 3)."""
+    vacuum = vacuum_trajectory(1.0, elevation, 0.0, h_star, g=1.0)
+    impact = vacuum['impact_velocity']
+    return np.column_stack((vacuum['range'] * ratio[:, 0], vacuum['flight_time'] * ratio[:, 1],
+                            np.hypot(impact[:, 0] * ratio[:, 3], impact[:, 2] * ratio[:, 4])))
+
+def validate_drag_table(n_points=2000, seed=0, table=None, elevation=None, beta=None, h_star=None):
+    """
+    Tablo düzeltmesini doğrudan integrasyonla karşılaştırır.
+
+    Noktalar verilmezse tablonun geçerli aralığından rastgele n_points nokta seçilir. Dönen
+    sözlük: menzil, uçuş süresi ve çarpma hızı için bağıl hataların (payda en az 0.01, boyutsuz
+    birimlerde) 'median', 'p99' ve 'max' değerleri.
+    """
+    table = load_drag_table() if table is None else table
+    if elevation is None:
+        rng = np.random.default_rng(seed)
+        axes = list(drag_table_axes.values())
+        elevation = np.radians(rng.uniform(axes[0][0], axes[0][-1], n_points))
+        beta = 10.0**rng.uniform(axes[1][0], axes[1][-1], n_points)
+        h_star = np.maximum(10.0**rng.uniform(axes[2][0], axes[2][-1], n_points) - height_offset, 0.0)
+    exact = _scaled_outputs(elevation, h_star, _drag_ratios(elevation, beta, h_star))
+    approx = _scaled_outputs(elevation, h_star, _table_ratios(table, elevation, beta, h_star))
+    error = np.abs(approx - exact) / np.maximum(np.abs(exact), 1e-2)
+    return {name: {'median': float(np.median(e)), 'p99': float(np.percentile(e, 99)), 'max': float(e.max())}
+            for name, e in zip(('range', 'flight_time', 'impact_speed'), error.T)}
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    from .trial_engine import launch_velocities
+
+    parser = argparse.ArgumentParser(description="Karesel sürüklenme tablosunun doğruluk ve kapsam kontrolü")
+    parser.add_argument("--check", action="store_true", help="Eşikler aşılırsa çıkış kodu 1")
+    parser.add_argument("--points", type=int, default=2000, help="Geçerli aralıktan rastgele nokta sayısı")
+    parser.add_argument("--tolerance", type=float, default=0.05, help="İzin verilen P99 bağıl hata")
+    parser.add_argument("--max-integration", type=float, default=0.01,
+                        help="Senaryoda izin verilen en büyük tablo dışı (integrasyon) oranı")
+    # Senaryo: 5_monte_carlo_hesaplamasi varsayılanları
+    parser.add_argument("--w0", type=float, default=800.0, help="Çıkış hızı (m/s)")
+    parser.add_argument("--vent-height", type=float, default=1421.0, help="Vent yüksekliği (m)")
+    parser.add_argument("--clast-diameter", type=float, default=0.5, help="Kayaç çapı (m)")
+    parser.add_argument("--clast-density", type=float, default=2600.0, help="Kayaç yoğunluğu (kg/m³)")
+    args = parser.parse_args()
+
+    k = quadratic_drag_coefficient(args.clast_diameter, args.clast_density)
+    speed, elevation, _ = launch_angles(*launch_velocities(np.random.default_rng(0), 1, args.points, args.w0))
+    speed, elevation = speed[0], elevation[0]
+    _, _, beta, h_star = _dimensionless(speed.shape, speed, elevation, args.vent_height, k, g)
+    fraction = integration_fraction(speed, elevation, args.vent_height, k)
+    reports = {'geçerli aralık': validate_drag_table(args.points),
+               'senaryo': validate_drag_table(elevation=elevation, beta=beta, h_star=h_star)}
+    failed = fraction > args.max_integration
+    for label, report in reports.items():
+        print(f"{label}:")
+        for name, e in report.items():
+            print(f"  {name}: medyan {e['median']:.4f}, P99 {e['p99']:.4f}, en büyük {e['max']:.4f}")
+            failed |= e['p99'] > args.tolerance
+    print(f"Senaryoda tablo dışı (integrasyon) oranı: {fraction:.4f}")
+    if args.check and failed:
+        print("Eşik aşıldı.")
+        sys.exit(1)
@@ -0,0 +1,82 @@
+import json
+import os
+
+import numpy as np
+
+# Partikül simülasyonları için kontrol noktası (checkpoint) kaydetme / devam ettirme.
+#
+# Simülasyon durumu (diziler, skaler takip değişkenleri, iç içe sözlükler) ve
+# rastgele sayı üretecinin durumu tek bir sıkıştırmasız .npz dosyasına yazılır.
+# Yazma önce geçici dosyaya yapılıp sonra yerine taşındığı için kesinti anında
+# eski kontrol noktası bozulmaz.
+
+_SEPARATOR = '/'
+_RNG_KEY = '__rng__'
+_GENERATOR_KEY = '__generator__'
+
+def _flatten(state, prefix=''):
+    flat = {}
+    for key, value in state.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name + _SEPARATOR))
+        else:
+            flat[name] = np.asarray(value)
+    return flat
+
+def _unflatten(flat):
+    state = {}
+    for name, value in flat.items():
+        parts = name.split(_SEPARATOR)
+        node = state
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = value.item() if value.ndim == 0 else value
+    return state
+
+def save_checkpoint(path, state, rng=None):
+    """
+    Simülasyon durumunu ve RNG durumunu path dosyasına kaydeder.
+
+    state: isim -> dizi / skaler / iç içe sözlük. rng verilmezse np.random'ın global
+    üreteci (MT19937) kaydedilir; np.random.Generator verilirse onun durumu kaydedilir.
+    """
+    flat = _flatten(state)
+    if rng is None:
+        _, keys, pos, has_gauss, cached_gaussian = np.random.get_state()
+        flat[_RNG_KEY] = np.array(keys, dtype=np.uint32)
+        flat[_RNG_KEY + _SEPARATOR + 'meta'] = np.array([pos, has_gauss], dtype=np.int64)
+        flat[_RNG_KEY + _SEPARATOR + 'gauss'] = np.array(cached_gaussian, dtype=float)
+    else:
+        flat[_GENERATOR_KEY] = np.array(json.dumps(rng.bit_generator.state))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **flat)
+    os.replace(tmp_path, path)
+
+def load_checkpoint(path, rng=None, restore_rng=True):
+    """
+    Kontrol noktasını okur ve durumu (iç içe sözlük olarak) döner.
+
+    restore_rng=True ise kaydedilen RNG durumu np.random'a ya da verilen rng üretecine yüklenir.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        flat = {name: data[name] for name in data.files}
+
+    keys = flat.pop(_RNG_KEY, None)
+    meta = flat.pop(_RNG_KEY + _SEPARATOR + 'meta', None)
+    gauss = flat.pop(_RNG_KEY + _SEPARATOR + 'gauss', None)
+    generator_state = flat.pop(_GENERATOR_KEY, None)
+    if restore_rng:
+        if rng is not None and generator_state is not None:
+            rng.bit_generator.state = json.loads(generator_state.item())
+        elif rng is None and keys is not None:
+            np.random.set_state(('MT19937', keys, int(meta[0]), int(meta[1]), float(gauss)))
+    return _unflatten(flat)
+
+def checkpoint_due(step, every):
+    """every > 0 ise her every adımda bir True döner."""
+    return every > 0 and step > 0 and step % every == 0
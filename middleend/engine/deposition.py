@@ -0,0 +1,94 @@
+import numpy as np
+
+# Akışkan (streaming) tefra çökelme ızgarası.
+#
+# Yere inen her partikülün kütlesi 2B bir rastere vektörel scatter-add ile eklenir.
+# Yörüngeler saklanmadığı için bellek kullanımı partikül sayısından bağımsızdır;
+# kül kalınlığı ve izopak haritaları bu rasterden üretilir.
+
+def create_deposition_grid(extent, resolution=512, center=(0.0, 0.0)):
+    """
+    Merkez etrafında [-extent, extent] karesini kaplayan boş çökelme ızgarası oluşturur.
+
+    Dönen sözlük: 'mass' (nx, ny) hücre başına kütle (kg), 'x0', 'y0', 'dx', 'dy',
+    'deposited_mass' (toplam) ve 'outside_mass' (ızgara dışına düşen kütle).
+    """
+    cell = 2.0 * extent / resolution
+    return {
+        'mass': np.zeros((resolution, resolution)),
+        'x0': center[0] - extent,
+        'y0': center[1] - extent,
+        'dx': cell,
+        'dy': cell,
+        'deposited_mass': 0.0,
+        'outside_mass': 0.0
+    }
+
+def particle_mass(diameter, density):
+    """Küresel partikül kütlesi (kg)."""
+    return density * np.pi / 6 * np.asarray(diameter, dtype=float)**3
+
+def deposit(grid, x, y, mass):
+    """
+    (x, y) noktalarına inen kütleleri ızgaraya ekler (yerinde).
+
+    y ve mass skaler ya da her partikül için bir değer olabilir. Büyük gruplar np.bincount,
+    küçük gruplar (ızgarayı baştan sona dolaşmamak için) np.add.at ile eklenir.
+    """
+    x, y, mass = np.broadcast_arrays(np.atleast_1d(np.asarray(x, dtype=float)),
+                                     np.asarray(y, dtype=float),
+                                     np.asarray(mass, dtype=float))
+    if len(x) == 0:
+        return
+
+    nx, ny = grid['mass'].shape
+    ix = np.floor((x - grid['x0']) / grid['dx']).astype(np.int64)
+    iy = np.floor((y - grid['y0']) / grid['dy']).astype(np.int64)
+    inside = (ix >= 0) & (ix < nx) & (iy >= 0) & (iy < ny)
+
+    flat_index = ix[inside] * ny + iy[inside]
+    inside_mass = mass[inside]
+    flat = grid['mass'].reshape(-1)
+    if len(flat_index) > flat.size // 8:
+        flat += np.bincount(flat_index, inside_mass, minlength=flat.size)
+    else:
+        np.add.at(flat, flat_index, inside_mass)
+
+    grid['deposited_mass'] += float(inside_mass.sum())
+    grid['outside_mass'] += float(mass[~inside].sum())
+
+def thickness(grid, bulk_density=1000.0):
+    """Hücre başına çökel kalınlığı (m); bulk_density çökelin yığın yoğunluğudur (kg/m^3)."""
+    return grid['mass'] / (grid['dx'] * grid['dy'] * bulk_density)
+
+def cell_centers(grid):
+    """Izgara hücre merkezlerinin x ve y koordinatları."""
+    nx, ny = grid['mass'].shape
+    x = grid['x0'] + (np.arange(nx) + 0.5) * grid['dx']
+    y = grid['y0'] + (np.arange(ny) + 0.5) * grid['dy']
+    return x, y
+
+def isopach_areas(grid, levels, bulk_density=1000.0):
+    """Her kalınlık seviyesi (m) için bu kalınlığı aşan alan (m^2)."""
+    t = thickness(grid, bulk_density)
+    levels = np.asarray(levels, dtype=float)
+    cells = np.sort(t, axis=None)
+    exceeding = len(cells) - np.searchsorted(cells, levels, side='right')
+    return exceeding * grid['dx'] * grid['dy']
+
+def plot_isopach(grid, levels, bulk_density=1000.0, ax=None):
+    """Kalınlık haritasını izopak eğrileriyle çizer (matplotlib sadece burada yüklenir)."""
+    import matplotlib.pyplot as plt
+
+    if ax is None:
+        _, ax = plt.subplots(figsize=(8, 8))
+    x, y = cell_centers(grid)
+    t = thickness(grid, bulk_density)
+    mesh = ax.pcolormesh(x, y, t.T, cmap='Greys', shading='auto')
+    contours = ax.contour(x, y, t.T, levels=sorted(levels), colors='red', linewidths=0.8)
+    ax.clabel(contours, fmt='%g m')
+    ax.set_aspect('equal')
+    ax.set_xlabel('X (m)')
+    ax.set_ylabel('Y (m)')
+    ax.figure.colorbar(mesh, ax=ax, label='Kalınlık (m)')
+    return ax
@@ -0,0 +1,119 @@
+import numpy as np
+
+from .deposition import create_deposition_grid, deposit
+from .profiling import profiled
+from .wind_field import sample_wind
+
+# 1_eziliyormuyuz.py'deki 2B partikül ve kayaç fırlatma fiziği (pencere ve rapor olmadan).
+#
+# Partiküller ve kayaçlar (x, y) düzleminde ventten rastgele yönlere fırlar; yerçekimi
+# (kayaçlarda rock_gravity katı), yatay hava direnci ve rüzgarla ilerler. En uzağa giden
+# partikül / kayaç, kayaçların ilk çarpma hızları ve yere ilk kez inenlerin çökelme ızgarası
+# izlenir. Tüm durum tek bir sözlükte tutulur (anahtarlar kontrol noktası dosyasındakilerle
+# aynıdır); rastgelelik global np.random ile çekilir, böylece kontrol noktası RNG durumuyla
+# kaldığı yerden devam eder.
+
+def init_ejecta(n_particles=100, n_rocks=20, w0=100, vent_height=1421, deposition_extent=200000,
+                deposition_resolution=1000):
+    """
+    Rastgele rüzgar (10-30 m/s) ve fırlatma hızlarıyla (w0 / 2 - w0) başlangıç durumu.
+
+    Dönen sözlük step_ejecta ile ilerletilir.
+    """
+    # Rüzgarın rastgele hızı ve yönü (10-30 m/s)
+    wind_magnitude = np.random.uniform(10, 30)
+    wind_direction = np.random.uniform(0, 2 * np.pi)
+    current_wind = np.array([wind_magnitude * np.cos(wind_direction), wind_magnitude * np.sin(wind_direction)])
+
+    # Partiküller ve kayaçlar vent noktasından rastgele yönlere fırlar
+    theta_p = np.random.uniform(0, 2 * np.pi, n_particles)
+    speed_p = np.random.uniform(w0 / 2, w0, n_particles)
+    theta_r = np.random.uniform(0, 2 * np.pi, n_rocks)
+    speed_r = np.random.uniform(w0 / 2, w0, n_rocks)
+
+    return {
+        'particles': np.column_stack([np.zeros(n_particles), np.full(n_particles, float(vent_height))]),
+        'velocities': np.column_stack([speed_p * np.cos(theta_p), speed_p * np.sin(theta_p)]),
+        'rocks': np.column_stack([np.zeros(n_rocks), np.full(n_rocks, float(vent_height))]),
+        'rock_velocities': np.column_stack([speed_r * np.cos(theta_r), speed_r * np.sin(theta_r)]),
+        'current_wind': current_wind,
+        'max_particle_distance': 0.0,
+        'max_particle_id': -1,
+        'max_particle_pos': np.array([0.0, 0.0]),
+        'max_rock_distance': 0.0,
+        'max_rock_id': -1,
+        'max_rock_pos': np.array([0.0, 0.0]),
+        'rock_impact_speeds': np.full(n_rocks, np.nan),  # NaN: kayaç henüz yere çarpmadı
+        'deposition_grid': create_deposition_grid(deposition_extent, deposition_resolution),
+        'particle_landed': np.zeros(n_particles, dtype=bool),
+        'rock_landed': np.zeros(n_rocks, dtype=bool)
+    }
+
+@profiled()
+def wind_at(state, positions, t, wind_field=None):
+    """Konumlardaki rüzgar: [..., 0] yatay, [..., 1] dikey bileşen (rüzgar alanı yoksa sabit current_wind)."""
+    if wind_field is None:
+        return state['current_wind']
+    wind = sample_wind(wind_field, t, positions[:, 1], positions[:, 0], 0.0)
+    result = np.zeros((len(positions), 2))
+    result[:, 0] = wind[:, 0]
+    if wind.shape[-1] > 2:
+        result[:, 1] = wind[:, 2]
+    return result
+
+def _track_farthest(state, positions, prefix):
+    """Merkeze en uzak noktayı izler (state[prefix + '_distance' / '_id' / '_pos'])."""
+    distances = np.sqrt(positions[:, 0]**2 + positions[:, 1]**2)
+    i = np.argmax(distances)
+    if distances[i] > state[prefix + '_distance']:
+        state[prefix + '_distance'] = distances[i]
+        state[prefix + '_id'] = i
+        state[prefix + '_pos'] = positions[i].copy()
+
+@profiled()
+def step_ejecta(state, t, dt=0.05, g=9.81, air_resistance=0.98, rock_gravity=5.0, particle_mass=0.01,
+                rock_mass=50.0, wind_field=None):
+    """
+    Durumu t anından dt kadar ilerletir (yerinde).
+
+    particle_mass / rock_mass: yere ilk kez inenlerin çökelme ızgarasına eklenen temsili kütle (kg).
+    wind_field verilirse rüzgar alanı y = 0 düzleminde örneklenir: u yatay, (varsa) w dikey hıza eklenir.
+    """
+    particles, velocities = state['particles'], state['velocities']
+    rocks, rock_velocities = state['rocks'], state['rock_velocities']
+
+    # Partiküllerin hız ve konum güncellenmesi
+    particle_wind = wind_at(state, particles, t, wind_field)
+    velocities[:, 1] -= g * dt  # Yerçekimi
+    velocities[:, 0] *= air_resistance  # Hava direnci
+    velocities[:, 0] += particle_wind[..., 0] * dt  # Rüzgar etkisi x
+    velocities[:, 1] += particle_wind[..., 1] * dt  # Rüzgar etkisi y
+    particles += velocities * dt
+
+    # Kayaçların hız ve konum güncellenmesi
+    rock_wind = wind_at(state, rocks, t, wind_field)
+    rock_velocities[:, 1] -= g * dt * rock_gravity  # Kayaçlar için daha güçlü yerçekimi
+    rock_velocities[:, 0] *= air_resistance
+    rock_velocities[:, 0] += rock_wind[..., 0] * dt
+    rock_velocities[:, 1] += rock_wind[..., 1] * dt
+    rocks += rock_velocities * dt
+
+    # En uzağa giden partikül ve kayaç
+    _track_farthest(state, particles, 'max_particle')
+    _track_farthest(state, rocks, 'max_rock')
+
+    # Kayaçların ilk çarpma hızı
+    impact_speeds = state['rock_impact_speeds']
+    first_impact = (rocks[:, 1] <= 0) & np.isnan(impact_speeds)
+    impact_speeds[first_impact] = np.linalg.norm(rock_velocities[first_impact], axis=1)
+
+    # Yere ilk kez inenlerin kütlesi çökelme ızgarasına eklenir (2B simülasyon: iniş noktası y = 0 hattı)
+    new_particles = (particles[:, 1] <= 0) & ~state['particle_landed']
+    if new_particles.any():
+        deposit(state['deposition_grid'], particles[new_particles, 0], 0.0, particle_mass)
+        state['particle_landed'][new_particles] = True
+    new_rocks = (rocks[:, 1] <= 0) & ~state['rock_landed']
+    if new_rocks.any():
+        deposit(state['deposition_grid'], rocks[new_rocks, 0], 0.0, rock_mass)
+        state['rock_landed'][new_rocks] = True
+    return state
@@ -0,0 +1,314 @@
+import numpy as np
+
+from .atmosphere import air_properties
+from .deposition import create_deposition_grid, particle_mass, deposit
+from .grain_size import sample_grain_sizes, grain_density, apply_drag
+from .heightmap import sample_heightmap
+from .particle_interactions import aggregate_particles
+from .particle_pool import ParticlePool
+from .profiling import profiled
+from .wind_field import sample_air_velocity
+
+# 6_whatever.py'deki 3B kül, partikül ve kayaç fiziği (pencere açmadan).
+#
+# Kül ve partiküller ParticlePool havuzlarında tutulur ve her adımda sadece canlı yuvalar
+# güncellenir; yere çarpan partiküller max_split_stage aşamaya kadar fragments_per_split
+# parçaya bölünür, kayaçlar sabit boyutlu dizilerdir. Hava direnci yüksekliğe bağlı hava
+# özellikleriyle ve rüzgarla (rüzgar alanı yoksa her adım rastgele) hesaplanır; yere
+# inenlerin kütlesi çökelme ızgarasına eklenir. Ayarlar ve durum tek bir sözlükte tutulur;
+# rastgelelik global np.random ile çekilir (kontrol noktası RNG durumuyla devam eder).
+
+def create_ejecta(n_particles=300, n_ash=300, n_rocks=50, n_red=50, n_yellow=50, vent_height=1421, w0=800,
+                  gravity=9.81, ash_diameter=0.001, particle_diameter=0.02, rock_diameter=0.1, grain_sorting=1.0,
+                  rock_density=2600, max_split_stage=2, fragments_per_split=3, max_height=4000, ash_ceiling=8000,
+                  deposition_extent=20000, deposition_resolution=400, site_latitude=45.0, terrain=None,
+                  wind_field=None, ash_aggregation=False, ash_capture_radius=2.0, dt=0.05):
+    """
+    Havuzları ayırır ve ayarları tutan durum sözlüğünü döner; reset_ejecta ile başlatılır.
+
+    terrain: yerel yükseklik haritası (deniz seviyesinden m, bkz. terrain.py); None ise zemin z = 0.
+    wind_field: ızgaralı rüzgar alanı (bkz. wind_field.py); None ise her adımda rastgele rüzgar.
+    """
+    state = {name: value for name, value in locals().items()}
+    state['ash_pool'] = ParticlePool(n_ash, {
+        'pos': ((3,), float),
+        'vel': ((3,), float),
+        'color': ((3,), float),
+        'diameter': ((), float),
+        'density': ((), float)
+    })
+    state['particle_pool'] = ParticlePool(n_particles * fragments_per_split**max_split_stage, {
+        'pos': ((3,), float),
+        'vel': ((3,), float),
+        'color': ((3,), float),
+        'split': ((), int),
+        'landed': ((), bool),
+        'diameter': ((), float),
+        'density': ((), float)
+    })
+    state['rocks'] = np.zeros((n_rocks, 3))
+    state['rock_velocities'] = np.zeros((n_rocks, 3))
+    state['rock_landed'] = np.zeros(n_rocks, dtype=bool)
+    state['current_wind'] = np.array([0.0, 0.0])
+    reset_ejecta(state)
+    return state
+
+def cone_velocities(speeds):
+    """Verilen hız büyüklüklerini dikeyden 30 derecelik koni içinde rastgele yönlere dağıtır."""
+    n = len(speeds)
+    phi = np.random.uniform(0, 2 * np.pi, n)
+    theta_cone = np.random.uniform(0, np.radians(30), n)
+    return np.column_stack((
+        speeds * np.sin(theta_cone) * np.cos(phi),
+        speeds * np.sin(theta_cone) * np.sin(phi),
+        speeds * np.cos(theta_cone)
+    ))
+
+def random_wind():
+    """Rastgele yönde 50-200 m/s yatay rüzgar."""
+    speed = np.random.uniform(50, 200)
+    angle = np.random.uniform(0, 2 * np.pi)
+    return np.array([speed * np.cos(angle), speed * np.sin(angle)])
+
+def ground_height(state, x, y):
+    """Zemin yüksekliği: arazi varsa ondan, yoksa 0."""
+    if state['terrain'] is None:
+        return np.zeros(np.shape(x))
+    return sample_heightmap(state['terrain'], x, y)
+
+@profiled()
+def reset_ejecta(state):
+    """Havuzları boşaltıp tüm partikülleri ventten yeniden fırlatır (rüzgar korunur)."""
+    ash_pool, particle_pool = state['ash_pool'], state['particle_pool']
+    n_ash, n_particles, n_rocks = state['n_ash'], state['n_particles'], state['n_rocks']
+    w0, vent_height = state['w0'], state['vent_height']
+    ash_pool.clear()
+    particle_pool.clear()
+
+    # Kül partikülleri (başlangıç konumu vent noktası, hızlar koni dağılımıyla)
+    ash_velocities = np.zeros((n_ash, 3))
+    ash_velocities[:,0] = np.random.normal(0, w0/10, n_ash)
+    ash_velocities[:,1] = np.random.normal(0, w0/10, n_ash)
+    ash_velocities[:,2] = np.random.uniform(w0 / 4, w0 / 2, n_ash)
+    ash_diameters = sample_grain_sizes(n_ash, state['ash_diameter'], state['grain_sorting'])
+    ash_pool.spawn(n_ash,
+                   pos=[0, 0, vent_height],
+                   vel=cone_velocities(np.linalg.norm(ash_velocities, axis=1)),
+                   color=0.5,
+                   diameter=ash_diameters,
+                   density=grain_density(ash_diameters))
+
+    # Partiküller (kırmızı, sarı, kalanlar siyah)
+    velocities = np.zeros((n_particles, 3))
+    velocities[:, 0] = np.random.normal(0, w0 / 5, n_particles)
+    velocities[:, 1] = np.random.normal(0, w0 / 5, n_particles)
+    velocities[:, 2] = np.random.uniform(w0 / 2, w0, n_particles)
+    n_red, n_yellow = state['n_red'], state['n_yellow']
+    colors = np.zeros((n_particles, 3))
+    colors[:n_red] = [1, 0, 0]
+    colors[n_red:n_red+n_yellow] = [1, 1, 0]
+
+    particle_diameters = sample_grain_sizes(n_particles, state['particle_diameter'], state['grain_sorting'])
+    particle_pool.spawn(n_particles,
+                        pos=[0, 0, vent_height],
+                        vel=cone_velocities(np.linalg.norm(velocities, axis=1)),
+                        color=colors,
+                        split=0,
+                        diameter=particle_diameters,
+                        density=grain_density(particle_diameters))
+
+    # Kayaçlar
+    rock_velocities = state['rock_velocities']
+    rock_velocities[:, 0] = np.random.normal(0, w0 / 5, n_rocks)
+    rock_velocities[:, 1] = np.random.normal(0, w0 / 5, n_rocks)
+    rock_velocities[:, 2] = np.random.uniform(w0 / 2, w0, n_rocks)
+    rock_velocities[:] = cone_velocities(np.linalg.norm(rock_velocities, axis=1))
+    state['rocks'][:] = [0, 0, vent_height]
+    state['rock_diameters'] = sample_grain_sizes(n_rocks, state['rock_diameter'], state['grain_sorting'])
+    state['rock_densities'] = np.full(n_rocks, float(state['rock_density']))
+    state['rock_landed'][:] = False
+
+    state['tephra_grid'] = create_deposition_grid(state['deposition_extent'], state['deposition_resolution'])
+    state['sim_time'] = 0.0
+    state['step_count'] = 0
+    state['max_x'], state['max_y'] = 0, 0
+    state['max_black_distance'] = 0
+    return state
+
+@profiled()
+def split_particles(state, indices):
+    """
+    Yere çarpan partikülleri fragments_per_split parçaya böler (vektörel).
+
+    Parçalar çarpma noktasında, ana partikülün rengi ve yoğunluğuyla, hacmi koruyan
+    çaplarla oluşur ve bir sonraki dağılma aşamasına geçer. Ana partiküller havuzdan
+    çıkarılır; boşalan yuvalar parçalar için yeniden kullanılır.
+    """
+    indices = np.asarray(indices, dtype=np.intp)
+    if len(indices) == 0:
+        return
+    pool = state['particle_pool']
+    count = state['fragments_per_split']
+    parents = np.repeat(indices, count)
+    pos = pool.pos[parents].copy()
+    pos[:, 2] = ground_height(state, pos[:, 0], pos[:, 1])  # Yeni partiküller yere çarptıkları noktada oluşur
+    color = pool.color[parents]
+    split = pool.split[parents] + 1
+    diameter = pool.diameter[parents] / np.cbrt(count)  # Parçalar hacmi korur
+    density = pool.density[parents]
+
+    # max_height'e kadar yükselebilecek şekilde hız ata (koni dağılımıyla)
+    v0 = np.sqrt(2 * state['gravity'] * state['max_height'])  # 4000 m için ~282 m/s
+    vel = cone_velocities(np.random.uniform(100, v0, len(parents)))
+
+    pool.retire(indices)
+    pool.spawn(len(parents), pos=pos, vel=vel, color=color, split=split, diameter=diameter, density=density)
+
+@profiled()
+def step_ejecta(state):
+    """Durumu state['dt'] kadar ilerletir (yerinde)."""
+    dt = state['dt']
+    gravity = state['gravity']
+    ash_pool, particle_pool = state['ash_pool'], state['particle_pool']
+    rocks, rock_velocities = state['rocks'], state['rock_velocities']
+    tephra_grid = state['tephra_grid']
+    max_height = state['max_height']
+
+    # Sadece canlı yuvalar güncellenir: havuzlar en çok bölünme için ayrılmıştır, boş yuvalar hesaplanmaz
+    ash_live = ash_pool.indices()
+    ash = ash_pool.pos[ash_live]
+    ash_velocities = ash_pool.vel[ash_live]
+    live = particle_pool.indices()
+    particles = particle_pool.pos[live]
+    velocities = particle_pool.vel[live]
+
+    # Hava direnci: partiküller rüzgarla hareket eden havaya göre tane boyu ve Reynolds rejimine bağlı sürüklenir
+    wind_field = state['wind_field']
+    if wind_field is None:
+        # Yeni bir rüzgar oluştur (tüm partiküller için aynı)
+        state['current_wind'] = random_wind()
+        ash_air = particle_air = rock_air = np.array([state['current_wind'][0], state['current_wind'][1], 0.0])
+    else:
+        # Her partikül rüzgar alanını kendi konumunda ve simülasyon zamanında örnekler
+        ash_air = sample_air_velocity(wind_field, state['sim_time'], ash)
+        particle_air = sample_air_velocity(wind_field, state['sim_time'], particles)
+        rock_air = sample_air_velocity(wind_field, state['sim_time'], rocks)
+    state['sim_time'] += dt
+
+    # Kül partiküllerinin hızlarını yerçekimi, hava direnci ve rüzgar ile güncelle
+    ash_velocities[:, 2] -= gravity * dt
+    ash_props = air_properties(ash[:, 2], state['site_latitude'])
+    apply_drag(ash_velocities, ash_pool.diameter[ash_live], ash_pool.density[ash_live], dt, ash_air,
+               ash_props['density'], ash_props['viscosity'])
+    ash += ash_velocities * dt
+    ash_pool.pos[ash_live] = ash
+    ash_pool.vel[ash_live] = ash_velocities
+
+    # Yere düşen küller çökelme ızgarasına eklenir
+    ash_ground = ground_height(state, ash[:,0], ash[:,1])
+    ash_landed = ash_live[ash[:,2] <= ash_ground]
+    deposit(tephra_grid, ash_pool.pos[ash_landed,0], ash_pool.pos[ash_landed,1],
+            particle_mass(ash_pool.diameter[ash_landed], ash_pool.density[ash_landed]))
+
+    # Küller ash_ceiling'e ulaştığında ya da yere düştüğünde yok olur (yuvaları boşaltılır)
+    ash_gone = (ash[:,2] >= state['ash_ceiling']) | (ash[:,2] <= ash_ground)
+    if ash_gone.any():
+        ash_pool.retire(ash_live[ash_gone])
+
+    # Kül kümelenmesi: yakın partiküller kütle ve momentumu koruyarak birleşir, kümeye katılanlar havuzdan çıkar
+    if state['ash_aggregation']:
+        absorbed = aggregate_particles(ash_pool.pos, ash_pool.vel, ash_pool.diameter, ash_pool.density,
+                                       state['ash_capture_radius'], ash_pool.indices())
+        ash_pool.retire(absorbed)
+
+    # Partikül hızlarını yerçekimi ve hava direnci ile güncelle
+    velocities[:, 2] -= gravity * 0.5  # gravity * 0.25
+    particle_props = air_properties(particles[:, 2], state['site_latitude'])
+    apply_drag(velocities, particle_pool.diameter[live], particle_pool.density[live], dt, particle_air,
+               particle_props['density'], particle_props['viscosity'])
+    particles += velocities * dt
+
+    # Kayaç hızlarını yerçekimi ve hava direnci ile güncelle
+    rock_velocities[:, 2] -= gravity * 3.0  # gravity * 5.0
+    rock_props = air_properties(rocks[:, 2], state['site_latitude'])
+    apply_drag(rock_velocities, state['rock_diameters'], state['rock_densities'], dt, rock_air,
+               rock_props['density'], rock_props['viscosity'])
+    rocks += rock_velocities * dt
+
+    # Maksimum yükseklik sınırı: sınıra ulaşanlar düşmeye başlar
+    over_max = particles[:,2] >= max_height
+    particles[over_max,2] = max_height
+    velocities[over_max,2] = -np.abs(velocities[over_max,2])
+    over_max_rocks = rocks[:,2] >= max_height
+    rocks[over_max_rocks,2] = max_height
+    rock_velocities[over_max_rocks,2] = -np.abs(rock_velocities[over_max_rocks,2])
+
+    # Plotlama sınırları için maksimum x ve y değerleri (sadece canlı partiküller)
+    ash = ash_pool.pos[ash_pool.indices()]
+    state['max_x'] = max(state['max_x'], np.max(np.abs(particles[:,0]), initial=0),
+                         np.max(np.abs(ash[:,0]), initial=0), np.max(np.abs(rocks[:,0])))
+    state['max_y'] = max(state['max_y'], np.max(np.abs(particles[:,1]), initial=0),
+                         np.max(np.abs(ash[:,1]), initial=0), np.max(np.abs(rocks[:,1])))
+
+    # Siyah partiküllerin maksimum uzaklığı
+    black = ~particle_pool.color[live].any(axis=1)
+    current_max_black = np.max(np.hypot(particles[:,0], particles[:,1]), where=black, initial=0)
+    if current_max_black > state['max_black_distance']:
+        state['max_black_distance'] = current_max_black
+
+    # Yere ulaşan partiküller: son aşamadakiler zeminde kalır, diğerleri bölünür
+    particle_ground = ground_height(state, particles[:,0], particles[:,1])
+    ground_hits = particles[:,2] <= particle_ground
+    can_split = particle_pool.split[live] < state['max_split_stage']
+    resting = ground_hits & ~can_split
+    particles[resting, 2] = particle_ground[resting]
+    particle_pool.pos[live] = particles
+    particle_pool.vel[live] = velocities
+    # İlk kez yere inen son aşama partiküllerin kütlesi çökelir (bölünenlerin kütlesi parçalarına geçer)
+    first_landing = live[resting & ~particle_pool.landed[live]]
+    deposit(tephra_grid, particle_pool.pos[first_landing,0], particle_pool.pos[first_landing,1],
+            particle_mass(particle_pool.diameter[first_landing], particle_pool.density[first_landing]))
+    particle_pool.landed[first_landing] = True
+    split_particles(state, live[ground_hits & can_split])
+
+    # Kayaçların yere ulaşması
+    rock_ground = ground_height(state, rocks[:,0], rocks[:,1])
+    rock_hits = rocks[:,2] <= rock_ground
+    rocks[rock_hits, 2] = rock_ground[rock_hits]
+    new_rock_landing = rock_hits & ~state['rock_landed']
+    deposit(tephra_grid, rocks[new_rock_landing,0], rocks[new_rock_landing,1],
+            particle_mass(state['rock_diameters'][new_rock_landing], state['rock_densities'][new_rock_landing]))
+    state['rock_landed'][new_rock_landing] = True
+    state['step_count'] += 1
+    return state
+
+def ejecta_checkpoint(state):
+    """Devam ettirmek için gereken dinamik durum (ayarlar hariç; kontrol noktası dosyası için)."""
+    return {
+        'step_count': state['step_count'],
+        'sim_time': state['sim_time'],
+        'current_wind': state['current_wind'],
+        'ash_pool': state['ash_pool'].state(),
+        'particle_pool': state['particle_pool'].state(),
+        'rocks': state['rocks'],
+        'rock_velocities': state['rock_velocities'],
+        'rock_diameters': state['rock_diameters'],
+        'rock_densities': state['rock_densities'],
+        'rock_landed': state['rock_landed'],
+        'tephra_grid': state['tephra_grid'],
+        'max_x': state['max_x'],
+        'max_y': state['max_y'],
+        'max_black_distance': state['max_black_distance']
+    }
+
+def restore_ejecta(state, saved):
+    """ejecta_checkpoint ile kaydedilmiş durumu yükler (yerinde)."""
+    state['ash_pool'].load_state(saved['ash_pool'])
+    state['particle_pool'].load_state(saved['particle_pool'])
+    state['rocks'][:] = saved['rocks']
+    state['rock_velocities'][:] = saved['rock_velocities']
+    state['rock_landed'][:] = saved['rock_landed']
+    for name in ('step_count', 'sim_time', 'current_wind', 'rock_diameters', 'rock_densities', 'tephra_grid',
+                 'max_x', 'max_y', 'max_black_distance'):
+        state[name] = saved[name]
+    return state
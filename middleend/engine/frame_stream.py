@@ -0,0 +1,148 @@
+import math
+import struct
+
+import numpy as np
+
+from .atmosphere import air_properties
+from .grain_size import sample_grain_sizes, grain_density, reynolds_number, terminal_velocity, apply_drag
+from .heightmap import build_heightmap, resolve_ground_collision, concave_cone_surface
+from .profiling import profiled
+
+# Sunucu tarafı partikül simülasyonu ve ikili (binary) kare kodlaması.
+#
+# 4_volcanos19.py'deki partikül fiziği (tane boyu dağılımı, yüksekliğe bağlı hava direnci,
+# rüzgar, koni yüzeyinde kayma) burada pencere açmadan çalışır; durum tek bir sözlükte
+# tutulur. Her kare JSON yerine küçük bir başlık ve paketlenmiş konum dizisi olarak kodlanır:
+#
+#   başlık (little-endian, 44 bayt): magic 'VOLC', sürüm (u8), veri tipi (u8: 0 float32,
+#   1 uint16), seyreltme adımı (u16), kare no (u32), simülasyon zamanı (f32), nokta sayısı
+#   (u32), kutu minimumu x, y, z (3 x f32), kutu maksimumu x, y, z (3 x f32)
+#   veri: nokta sayısı x 3 değer (x, y, z sırasıyla)
+#
+# uint16 nicemlemede her eksen kutu içinde 0..65535 aralığına ölçeklenir (float32'nin
+# yarısı kadar bayt). Bant genişliği sınırını aşan karelerde partiküllerin her stride'ıncısı
+# gönderilir; aynı stride tüm karelerde aynı partikülleri seçer.
+
+frame_magic = b'VOLC'
+frame_version = 1
+frame_header = struct.Struct('<4sBBHIfI6f')
+dtype_codes = {0: np.dtype('<f4'), 1: np.dtype('<u2')}
+quantize_levels = 65535
+
+# #########################
+# # Simülasyon
+# #########################
+def init_eruption(n_particles=500, vent_radius=50, vent_height=20, w0=134.0, particle_diameter=0.1,
+                  grain_sorting=1.0, sigma=1000.0, site_elevation=0.0, site_latitude=45.0, wind=(0.0, 0.0),
+                  heightmap_resolution=1024, seed=None):
+    """
+    4_volcanos19.py'deki patlamanın başlangıç durumu.
+
+    Partiküller vent ağzından dikey hızla fırlar; yatay hızları tane boyuna göre terminal
+    hız aralığından çekilir. Dönen sözlük step_eruption ile ilerletilir.
+    """
+    rng = np.random.default_rng(seed)
+    theta = rng.uniform(0, 2 * np.pi, n_particles)
+    r = rng.uniform(0, vent_radius / 3, n_particles)
+    particles = np.column_stack([r * np.cos(theta), r * np.sin(theta), np.full(n_particles, float(vent_height))])
+
+    # Tane boyu dağılımından çap ve yoğunluk, vent yüksekliğindeki hava ile terminal hız
+    diameters = sample_grain_sizes(n_particles, particle_diameter, grain_sorting)
+    densities = grain_density(diameters, rho_pumice=sigma)
+    air = air_properties(site_elevation + vent_height, site_latitude)
+    Re = reynolds_number(w0, diameters, air['density'], air['viscosity'])
+    vt = terminal_velocity(Re, diameters, densities, air['viscosity'], air['density'])
+
+    velocities = np.column_stack([rng.uniform(-vt, vt), rng.uniform(-vt, vt), rng.uniform(30, 50, n_particles)])
+    terrain = build_heightmap(lambda x, y: concave_cone_surface(x, y, vent_radius), 20 * vent_radius,
+                              heightmap_resolution)
+    return {
+        'particles': particles,
+        'velocities': velocities,
+        'diameters': diameters,
+        'densities': densities,
+        'terrain': terrain,
+        'wind': np.asarray(wind, dtype=float),
+        'site_elevation': site_elevation,
+        'site_latitude': site_latitude,
+        'sim_time': 0.0,
+        'step_count': 0
+    }
+
+@profiled()
+def step_eruption(state, dt=0.1, g=9.81):
+    """
+    Durumu dt kadar ilerletir (yerinde): yerçekimi, hava direnci ve zemin çarpışması.
+
+    Hava direnci partikülleri sabit rüzgar hızına (state['wind'], m/s) doğru sürükler.
+    """
+    particles, velocities = state['particles'], state['velocities']
+    velocities[:, 2] -= g * dt
+    particles += velocities * dt
+
+    air = air_properties(state['site_elevation'] + particles[:, 2], state['site_latitude'])
+    wind = np.array([state['wind'][0], state['wind'][1], 0.0])  # Yatay hava hızı (m/s)
+    apply_drag(velocities, state['diameters'], state['densities'], dt, wind, rho_a=air['density'],
+               mu=air['viscosity'])
+
+    resolve_ground_collision(particles, velocities, state['terrain'], friction=0.9, g=g, dt=dt)
+    state['sim_time'] += dt
+    state['step_count'] += 1
+    return state
+
+# #########################
+# # Kare kodlaması
+# #########################
+def frame_point_budget(max_bytes_per_second, fps, quantize=True):
+    """Bant genişliği sınırında kare başına gönderilebilecek en fazla nokta sayısı (en az 1)."""
+    point_bytes = 3 * (2 if quantize else 4)
+    return max(1, int((max_bytes_per_second / fps - frame_header.size) // point_bytes))
+
+def decimation_stride(n, max_points=None):
+    """n partiküllü karede en fazla max_points nokta bırakan seyreltme adımı."""
+    return 1 if max_points is None or n <= max_points else math.ceil(n / max_points)
+
+def encode_frame(positions, frame_index, sim_time, max_points=None, quantize=False, bounds=None):
+    """
+    (n, 3) konumları başlık + paketlenmiş veri olarak kodlar.
+
+    max_points verilirse partiküller eşit adımla seyreltilir. bounds ((3,) min, (3,) max)
+    verilmezse seyreltilmiş noktaların kutusu kullanılır; nicemlemede kutu dışı değerler kırpılır.
+    """
+    stride = decimation_stride(len(positions), max_points)
+    points = positions[::stride]
+    if bounds is None:
+        lower = points.min(axis=0) if len(points) else np.zeros(3)
+        upper = points.max(axis=0) if len(points) else np.zeros(3)
+    else:
+        lower, upper = (np.asarray(b, dtype=float) for b in bounds)
+
+    if quantize:
+        extent = np.where(upper > lower, upper - lower, 1.0)
+        scaled = np.clip((points - lower) / extent, 0, 1) * quantize_levels
+        payload = np.rint(scaled).astype(dtype_codes[1])
+    else:
+        payload = points.astype(dtype_codes[0])
+
+    header = frame_header.pack(frame_magic, frame_version, int(quantize), min(stride, 0xFFFF), frame_index,
+                               sim_time, len(points), *lower, *upper)
+    return header + payload.tobytes()
+
+def decode_frame(data):
+    """encode_frame çıktısını çözer: başlık alanları ve (n, 3) float32 'positions' içeren sözlük."""
+    magic, version, dtype_code, stride, frame_index, sim_time, count, *box = frame_header.unpack_from(data)
+    if magic != frame_magic or version != frame_version:
+        raise ValueError(f"Geçersiz kare başlığı: {magic!r} sürüm {version}")
+    values = np.frombuffer(data, dtype=dtype_codes[dtype_code], count=3 * count, offset=frame_header.size)
+    positions = values.reshape(count, 3).astype(np.float32)
+    lower, upper = np.array(box[:3], dtype=np.float32), np.array(box[3:], dtype=np.float32)
+    if dtype_code == 1:
+        positions = lower + positions / quantize_levels * (upper - lower)
+    return {
+        'frame': frame_index,
+        'sim_time': sim_time,
+        'stride': stride,
+        'quantized': dtype_code == 1,
+        'bounds': (lower, upper),
+        'positions': positions
+    }
@@ -0,0 +1,163 @@
+import os
+
+import numpy as np
+
+from .atmosphere import air_properties
+from .ballistics import linear_drag_trajectory, quadratic_drag_coefficient
+from .sample_bank import get_bank, bank_columns, data_dir
+from .profiling import profiled
+
+# API'nin tam simülasyonu (backend/main.py ve benchmark'lar tarafından kullanılır).
+
+# --- Fiziksel Sabitler ---
+g = 9.81
+clast_diameter = 1.0  # Temsili kayaç çapı (m); hava direnci bu boyuttaki bir kayaç için hesaplanır
+
+# Monte Carlo Parametre Dağılımları (ortak örnek bankası biçiminde: dağılım, argümanlar)
+params = {
+    'initial_mixture_density': ('normal', (2500, 200)),
+    'magma_temperature': ('normal', (1273.15, 50)),
+    'pressure': ('normal', (20e6, 5e6))
+}
+bank_path = os.path.join(data_dir, 'monte_carlo_bank.npy')
+
+@profiled()
+def get_monte_carlo_params(n=1000):
+    """
+    Monte Carlo ile başlangıç koşullarını belirler.
+
+    Örnekler bir kez üretilen memmap bankasından okunur; her çağrı rastgele bir n satırlık dilim kullanır.
+    """
+    bank = get_bank(bank_path, parameters=params)
+    start = np.random.randint(0, len(bank) - n + 1)
+    columns = bank_columns(bank, start, start + n)
+    density = np.mean(columns['initial_mixture_density'])
+    temperature = np.mean(columns['magma_temperature'])
+    pressure = np.mean(columns['pressure'])
+    return density, temperature, pressure
+
+@profiled()
+def calculate_particle_spread(vent_height, intensity_factor, wind_speed, wind_angle_rad, density=2500.0, n_particles=200):
+    """
+    3D Partikül Dağılım Simülasyonu (Koordinat Hesabı).
+
+    Tüm partiküller ortak balistik çözücüyle (doğrusal sürüklenme, rüzgar dahil) tek seferde
+    hesaplanır. Sürüklenmenin relaxation süresi, clast_diameter çaplı ve density yoğunluklu
+    kayacın vent yüksekliğindeki hava yoğunluğuyla (standart atmosfer) terminal hızından alınır.
+    """
+    v0_base = 150 * intensity_factor 
+    
+    theta = np.random.uniform(0, 2 * np.pi, n_particles) 
+    phi = np.random.uniform(0, np.pi / 3, n_particles)   # Dikeyden sapma açısı
+    v0 = np.random.normal(v0_base, 20, n_particles)      
+    
+    # Terminal hız v_t = sqrt(g / k) (karesel sürüklenme), doğrusal modelde tau = v_t / g
+    rho_air = air_properties(vent_height)['density']
+    k = quadratic_drag_coefficient(clast_diameter, density, rho_air)
+    tau = np.sqrt(g / k) / g
+    wind = (wind_speed * np.cos(wind_angle_rad), wind_speed * np.sin(wind_angle_rad))
+    trajectory = linear_drag_trajectory(v0, np.pi / 2 - phi, theta, vent_height, tau, g, wind)
+    
+    max_x = np.max(np.abs(trajectory['x']))
+    max_y = np.max(np.abs(trajectory['y']))
+    max_z = max(vent_height, np.max(trajectory['apex_height']))
+        
+    return max_x, max_y, max_z
+
+@profiled()
+def calculate_impact_points(max_distance, temperature, intensity):
+    """
+    Mesafeyi 5 eşit parçaya bölerek (Başlangıç, %25, %50, %75, Son) 
+    her noktadaki enerji ve sıcaklık etkisini hesaplar.
+    """
+    points = []
+    # 5 nokta: 0.0, 0.25, 0.5, 0.75, 1.0 çarpanları
+    ratios = [0.0, 0.25, 0.5, 0.75, 1.0]
+    
+    for r in ratios:
+        d_meter = max_distance * r
+        d_km = d_meter / 1000
+        
+        # Enerji Sönümlemesi (Joule)
+        # Merkezde çok yüksek, uzaklaştıkça hızla düşer
+        E = (intensity * 1e5) / (1 + 0.1 * (d_meter**1.5))
+        
+        # Sıcaklık Sönümlemesi (Kelvin -> Derece)
+        # Lav sıcaklığından ortam sıcaklığına (25C) düşüş
+        T_kelvin = temperature * np.exp(-d_meter / (max_distance * 0.4)) + 298.15 
+        T_celsius = T_kelvin - 273.15
+        
+        points.append({
+            "distance_km": round(d_km, 2),
+            "energy_j": int(E),
+            "temp_c": int(T_celsius),
+            "label": f"%{int(r*100)} Mesafe"
+        })
+        
+    return points
+
+@profiled(run=True)
+def run_full_simulation(elevation, name, intensity_factor=None, wind_speed=None, wind_angle=None):
+    """
+    Tüm simülasyonları çalıştırır.
+
+    intensity_factor, wind_speed (m/s) ve wind_angle (derece) verilirse rastgele / türetilmiş
+    değerler yerine bunlar kullanılır (senaryo taramaları için, bkz. sweep.py).
+    """
+    
+    # 1. PARAMETRELER
+    density, temp, pressure = get_monte_carlo_params()
+    
+    # 2. ŞİDDET VE FİZİK
+    if intensity_factor is None:
+        intensity_factor = (elevation / 3000) + (pressure / 20e6)
+    explosion_intensity = 50 * intensity_factor 
+    
+    # 3. ATMOSFERİK ETKİ (BU KISIM EKSİK OLABİLİR, DİKKAT!)
+    if wind_speed is None:
+        wind_speed = np.random.uniform(10, 60) 
+    if wind_angle is None:
+        wind_angle = np.random.uniform(0, 360)
+    wind_rad = np.radians(wind_angle)
+    
+    # Sürüklenme Faktörü Hesabı
+    drag_factor = wind_speed / (explosion_intensity * 1.5)
+    if drag_factor > 1.0: drag_factor = 1.0 
+    
+    # Durum Belirleme (Metin Olarak)
+    plume_behavior = "Dikey Yükselim"
+    if drag_factor > 0.4: plume_behavior = "Eğimli Yükselim"
+    if drag_factor > 0.7: plume_behavior = "Yatay Sürüklenme (Tehlikeli)"
+    
+    # Diğer Hesaplamalar...
+    cloud_x, cloud_y, cloud_z = calculate_particle_spread(elevation, intensity_factor, wind_speed, wind_rad, density)
+    max_cloud_reach = max(cloud_x, cloud_y) 
+    rock_max_distance = max_cloud_reach * 1.5 * (density / 2500)
+    impact_speed = np.sqrt(2 * g * elevation + (100 * intensity_factor)**2)
+    safe_zone = rock_max_distance * 1.2 
+    impact_data_points = calculate_impact_points(rock_max_distance, temp, explosion_intensity)
+    
+    # Risk
+    risk_level = "DÜŞÜK"
+    if rock_max_distance < 2000: risk_level = "ÇOK DÜŞÜK"
+    elif rock_max_distance < 5000: risk_level = "DÜŞÜK"
+    elif rock_max_distance < 15000: risk_level = "ORTA"
+    elif rock_max_distance < 30000: risk_level = "YÜKSEK"
+    else: risk_level = "KRİTİK - TAHLİYE"
+    
+    return {
+        "monte_carlo": { "density": density, "temp": temp, "pressure": pressure },
+        "crush_distance": rock_max_distance,
+        "impact_points": impact_data_points,
+        "particle_spread": { "x": cloud_x, "y": cloud_y, "z": cloud_z },
+        "intensity": explosion_intensity,
+        "safe_zone": safe_zone,
+        # BURADAKİ KEY İSİMLERİ ÇOK ÖNEMLİ:
+        "atmosphere": {
+            "wind_speed": wind_speed,
+            "drag_factor": round(drag_factor, 2), # Frontend bunu bekliyor
+            "plume_behavior": plume_behavior      # Frontend bunu bekliyor
+        },
+        "impact_speed": impact_speed,
+        "final_decision": risk_level
+    }
\ No newline at end of file
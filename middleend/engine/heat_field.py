@@ -0,0 +1,50 @@
+import numpy as np
+
+# Patlama çevresindeki ısı / enerji alanları ve patlama yüzeyi (ızgara üzerinde).
+#
+# 2_SONmagmalos_v2_random.py ve magmalos_v2_02.py'deki sıcaklık dağılımı ile
+# 4_volcanos19.py'deki patlama yüzeyi burada hesaplanır; scriptler sadece çizer.
+
+def temperature_field(intensity, size, spread, time, vent_radius, vent_height, max_height, resolution=800):
+    """
+    [-size, size]² ızgarasında patlama sıcaklık dağılımı.
+
+    Merkezden üstel sönümlenen sıcaklık, zamanla yayılan şok dalgası ve vent yüksekliğine
+    bağlı vent etkisinin toplamıdır. (x, y, z, merkeze uzaklık) ızgaralarını döner.
+    """
+    # Izgara noktaları
+    x = np.linspace(-size, size, resolution)
+    y = np.linspace(-size, size, resolution)
+    x, y = np.meshgrid(x, y)
+
+    # Merkeze uzaklık
+    d = np.sqrt(x**2 + y**2)
+
+    # Şiddet, yayılım ve zamana bağlı sıcaklık dağılımı
+    z = intensity * np.exp(-d / spread) * np.exp(-time / 10)
+
+    # Dinamik şok dalgası etkisi
+    shockwave = np.sin(d - time) * (np.exp(-d / spread) * 0.5)
+    z += shockwave * np.clip(intensity / (time + 1), 0, 1)
+
+    # Vent etkisi (vent yüksekliğine göre)
+    vent_effect = (vent_radius / (vent_radius + d)) * np.exp(-vent_height / max_height)
+    z += vent_effect
+
+    return x, y, z, d
+
+def eruption_surface(intensity, base_size, height, spread, time, eruption_time, resolution=200):
+    """
+    Koni biçimli dağın üzerinde eruption_time anından sonra yükselen patlama yüzeyi.
+
+    Yükseklik [0, height + 30] aralığına kırpılır; (x, y, z) ızgaralarını döner.
+    """
+    x = np.linspace(-base_size, base_size, resolution)
+    y = np.linspace(-base_size, base_size, resolution)
+    x, y = np.meshgrid(x, y)
+    z_base = height - np.sqrt(x**2 + y**2)
+    eruption = np.zeros_like(z_base)
+    if time >= eruption_time:
+        eruption = intensity * np.exp(-np.sqrt((x**2 + y**2) + (time - eruption_time)**2) / spread)
+    z = np.clip(z_base + eruption, 0, height + 30)
+    return x, y, z
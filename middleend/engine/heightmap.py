@@ -0,0 +1,94 @@
+import numpy as np
+
+# Önceden hesaplanmış arazi yükseklik haritası ve vektörel zemin çarpışması.
+#
+# Partikül başına volcano_surface çağırmak yerine yüzey bir kez düzenli bir ızgarada
+# örneklenir; çarpışma testi ve yüzeye oturtma tüm partikül dizisi üzerinde
+# bilinear örnekleme ve maskeli dizi işlemleriyle yapılır.
+
+def concave_cone_surface(x, y, radius, height_factor=0.4):
+    """İçbükey yanlı koni: yükseklik height_factor * (1 - sqrt(r / radius)) * radius."""
+    r = np.sqrt(x**2 + y**2)
+    return height_factor * (1 - np.sqrt(r / radius)) * radius
+
+def linear_cone_surface(x, y, radius, height):
+    """Düz yanlı koni: tepede height, r >= radius'ta sıfır."""
+    r = np.sqrt(x**2 + y**2)
+    return np.maximum(height * (1 - r / radius), 0)
+
+def build_heightmap(surface, extent, resolution=1024):
+    """
+    surface(x, y) fonksiyonunu [-extent, extent] karesi üzerinde örnekleyerek yükseklik haritası oluşturur.
+
+    Dönen sözlük: 'z' (nx, ny) yükseklikler, 'x0', 'y0' ızgara başlangıcı, 'dx', 'dy' hücre boyutu.
+    """
+    x = np.linspace(-extent, extent, resolution)
+    y = np.linspace(-extent, extent, resolution)
+    X, Y = np.meshgrid(x, y, indexing='ij')
+    return heightmap_from_array(surface(X, Y), x[0], y[0], x[1] - x[0], y[1] - y[0])
+
+def heightmap_from_array(z, x0, y0, dx, dy):
+    """Hazır bir yükseklik dizisinden (z[ix, iy]) yükseklik haritası sözlüğü oluşturur."""
+    return {
+        'z': np.asarray(z, dtype=float),
+        'x0': float(x0),
+        'y0': float(y0),
+        'dx': float(dx),
+        'dy': float(dy)
+    }
+
+def sample_heightmap(heightmap, x, y, gradient=False):
+    """
+    Yükseklik haritasını (x, y) noktalarında bilinear olarak örnekler.
+
+    Izgara dışındaki noktalar en yakın kenar değerini alır. gradient=True ise
+    (z, dz/dx, dz/dy) döner.
+    """
+    z = heightmap['z']
+    nx, ny = z.shape
+    fx = np.clip((np.asarray(x, dtype=float) - heightmap['x0']) / heightmap['dx'], 0, nx - 1)
+    fy = np.clip((np.asarray(y, dtype=float) - heightmap['y0']) / heightmap['dy'], 0, ny - 1)
+    ix = np.minimum(fx.astype(np.intp), nx - 2)
+    iy = np.minimum(fy.astype(np.intp), ny - 2)
+    tx = fx - ix
+    ty = fy - iy
+
+    z00 = z[ix, iy]
+    z10 = z[ix + 1, iy]
+    z01 = z[ix, iy + 1]
+    z11 = z[ix + 1, iy + 1]
+
+    z0 = z00 + (z10 - z00) * tx
+    z1 = z01 + (z11 - z01) * tx
+    height = z0 + (z1 - z0) * ty
+    if not gradient:
+        return height
+
+    dzdx = ((z10 - z00) * (1 - ty) + (z11 - z01) * ty) / heightmap['dx']
+    dzdy = (z1 - z0) / heightmap['dy']
+    return height, dzdx, dzdy
+
+def resolve_ground_collision(positions, velocities, heightmap, friction=0.9, g=9.81, dt=0.0):
+    """
+    Yüzeyin altına inen partikülleri yüzeye oturtur (yerinde günceller).
+
+    Çarpan partiküllerde yatay hız friction ile yavaşlatılır, dikey hız sıfırlanır ve
+    dt > 0 ise yerçekiminin eğim boyunca bileşeniyle kayma ivmesi uygulanır.
+    Çarpan partiküllerin maskesini döner.
+    """
+    height, dzdx, dzdy = sample_heightmap(heightmap, positions[:, 0], positions[:, 1], gradient=True)
+    hit = positions[:, 2] <= height
+    if not hit.any():
+        return hit
+
+    positions[hit, 2] = height[hit]
+    velocities[hit, 0:2] *= friction
+    velocities[hit, 2] = 0
+    if dt > 0:
+        # Eğim boyunca kayma: a = -g * grad(z) / (1 + |grad(z)|^2)
+        gx = dzdx[hit]
+        gy = dzdy[hit]
+        scale = g * dt / (1 + gx**2 + gy**2)
+        velocities[hit, 0] -= gx * scale
+        velocities[hit, 1] -= gy * scale
+    return hit
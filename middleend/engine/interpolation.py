@@ -0,0 +1,58 @@
+import itertools
+
+import numpy as np
+
+# Düzenli ızgaralarda vektörel çok-doğrusal (bilinear, trilinear, ...) interpolasyon.
+#
+# Değerler bellek eşlemeli (memmap) bir dizi de olabilir: sadece sorgulanan
+# noktaların köşe hücreleri okunur, dizinin tamamı belleğe yüklenmez.
+
+def regular_grid_interpolate(values, origin, spacing, coords):
+    """
+    values dizisini düzenli bir ızgarada coords noktalarında çok-doğrusal olarak örnekler.
+
+    values: ilk k ekseni ızgara olan dizi (kalan eksenler, ör. vektör bileşenleri, aynen döner).
+    origin, spacing: her ızgara ekseninin başlangıcı ve adımı (k elemanlı).
+    coords: k adet koordinat dizisi (aynı boyutta ya da yayınlanabilir).
+    Izgara dışındaki noktalar en yakın kenar değerini alır.
+    """
+    coords = np.broadcast_arrays(*[np.asarray(c, dtype=float) for c in coords])
+    k = len(coords)
+    shape = values.shape[:k]
+    trailing = values.ndim - k
+
+    base = []
+    frac = []
+    for axis, c in enumerate(coords):
+        n = shape[axis]
+        if n == 1:
+            base.append(np.zeros(c.shape, dtype=np.intp))
+            frac.append(None)
+            continue
+        f = np.clip((c - origin[axis]) / spacing[axis], 0, n - 1)
+        i = np.minimum(f.astype(np.intp), n - 2)
+        base.append(i)
+        frac.append(f - i)
+
+    result = 0.0
+    for corner in itertools.product((0, 1), repeat=k):
+        if any(c and frac[axis] is None for axis, c in enumerate(corner)):
+            continue  # Tek noktalı eksenlerde ikinci köşe yok
+        weight = 1.0
+        for axis, c in enumerate(corner):
+            if frac[axis] is not None:
+                weight = weight * (frac[axis] if c else 1 - frac[axis])
+        index = tuple(base[axis] + c for axis, c in enumerate(corner))
+        corner_values = np.asarray(values[index], dtype=float)
+        result = result + corner_values * np.reshape(weight, np.shape(weight) + (1,) * trailing)
+    return result
+
+def axis_spacing(axis_values):
+    """Düzenli bir eksenin başlangıç ve adımını döner; eksen düzenli değilse ValueError."""
+    axis_values = np.asarray(axis_values, dtype=float)
+    if len(axis_values) == 1:
+        return float(axis_values[0]), 1.0
+    steps = np.diff(axis_values)
+    if not np.allclose(steps, steps[0], rtol=1e-6):
+        raise ValueError("Eksen düzenli aralıklı değil.")
+    return float(axis_values[0]), float(steps[0])
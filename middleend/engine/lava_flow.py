@@ -0,0 +1,260 @@
+import argparse
+
+import numpy as np
+
+from .heightmap import build_heightmap, linear_cone_surface
+from .profiling import profiled
+
+# Yükseklik ızgarası üzerinde lav akışı hücresel otomatı (MAGFLOW tipi).
+#
+# Her hücrede lav kalınlığı h ve sıcaklığı T tutulur. Lav Bingham akışkanıdır: akma
+# dayanımı S_y ve viskozite η sıcaklığa bağlıdır (log10 S_y = a + b T, log10 η = c + d T).
+# Bir hücreden 8 komşusundan birine, toplam yükseklik (zemin + lav) farkı Δz > 0 iken ve
+# kalınlık kritik kalınlığı h_cr = S_y sqrt(Δx² + Δz²) / (ρ g Δz) aştığında
+#   q = S_y h_cr² w / (3 η) (a³ - 3/2 a² + 1/2),  a = h / h_cr
+# debisi (m³/s) akar. Zaman adımı hiçbir hücrenin bir adımda hacminin courant katından
+# fazlasını kaybetmeyeceği şekilde her adım yeniden seçilir. Isı akan lavla taşınır ve
+# karışır; yüzey ışınımla soğur (T⁴ yasasının tam çözümü); katılaşma sıcaklığının altındaki
+# lav zemine eklenir (topoğrafya değişir).
+#
+# Tüm kurallar, lav bulunan hücrelerin sınır kutusunun bir hücre genişletilmiş penceresi
+# üzerinde bütün dizi NumPy işlemleridir; ızgaranın geri kalanına dokunulmaz.
+#
+#   python -m engine.lava_flow --effusion-rate 50 --hours 24 --output lava.npz
+
+g = 9.81
+stefan_boltzmann = 5.67e-8
+lava_density = 2600.0  # kg/m³
+specific_heat = 1150.0  # J/(kg K)
+emissivity = 0.9
+eruption_temperature = 1360.0  # K
+solidus_temperature = 1173.0  # K, bu sıcaklığın altındaki lav katılaşır
+ambient_temperature = 288.0  # K
+yield_strength_coefficients = (13.00997, -0.0089)  # log10 S_y (Pa) = a + b T
+viscosity_coefficients = (23.0, -0.0132)  # log10 η (Pa s) = c + d T
+neighbours = [(di, dj) for di in (-1, 0, 1) for dj in (-1, 0, 1) if (di, dj) != (0, 0)]
+
+def lava_rheology(T):
+    """Sıcaklığa (K) bağlı akma dayanımı (Pa) ve viskozite (Pa s)."""
+    a, b = yield_strength_coefficients
+    c, d = viscosity_coefficients
+    return 10.0**(a + b * T), 10.0**(c + d * T)
+
+def bingham_flux(h, dz, distance, width, S_y, eta):
+    """Kalınlık h ve yükseklik farkı dz (> 0) için hücreler arası debi (m³/s); h <= h_cr ise 0."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        h_cr = S_y * np.sqrt(distance**2 + dz**2) / (lava_density * g * dz)
+        a = h / h_cr
+        q = S_y * h_cr**2 * width / (3 * eta) * (a**3 - 1.5 * a**2 + 0.5)
+    return np.where((dz > 0) & (a > 1), q, 0.0)
+
+def radiative_cooling(T, h, dt):
+    """Yüzeyden ışınımla soğuyan h kalınlığındaki lavın dt sonraki sıcaklığı (K)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        factor = 3 * emissivity * stefan_boltzmann * T**3 * dt / (lava_density * specific_heat * h)
+        return np.where(h > 0, T / np.cbrt(1 + factor), T)
+
+def active_window(h, vents, window=None):
+    """
+    Lavlı hücreleri ve ventleri kapsayan, bir hücre genişletilmiş (satır, sütun) dilimleri.
+
+    Lav bir adımda en fazla bir hücre ilerlediğinden önceki adımın penceresi verilirse
+    sadece onun içi taranır (ızgaranın tamamı değil).
+    """
+    shape = h.shape
+    window = window or (slice(0, shape[0]), slice(0, shape[1]))
+    block = h[window]
+    rows = window[0].start + np.flatnonzero(block.any(axis=1))
+    cols = window[1].start + np.flatnonzero(block.any(axis=0))
+    i0 = min(rows[0] if len(rows) else shape[0], vents[:, 0].min())
+    i1 = max(rows[-1] if len(rows) else 0, vents[:, 0].max())
+    j0 = min(cols[0] if len(cols) else shape[1], vents[:, 1].min())
+    j1 = max(cols[-1] if len(cols) else 0, vents[:, 1].max())
+    return slice(max(i0 - 1, 0), min(i1 + 2, shape[0])), slice(max(j0 - 1, 0), min(j1 + 2, shape[1]))
+
+def _pair_slices(di, dj, shape):
+    """Penceredeki (kaynak, hedef) dilimleri: hedef = kaynak + (di, dj)."""
+    def axis(d, n):
+        return slice(max(0, -d), n - max(0, d)), slice(max(0, d), n - max(0, -d))
+    rows_src, rows_dst = axis(di, shape[0])
+    cols_src, cols_dst = axis(dj, shape[1])
+    return (rows_src, cols_src), (rows_dst, cols_dst)
+
+@profiled()
+def lava_step(ground, h, T, window, dx, dy, courant=0.2, max_dt=60.0):
+    """
+    Penceredeki hücreleri bir adım ilerletir (yerinde); seçilen dt'yi (s) döner.
+
+    ground: zemin yüksekliği (m), h: lav kalınlığı (m), T: lav sıcaklığı (K).
+    """
+    z, thickness, temperature = ground[window], h[window], T[window]
+    head = z + thickness
+    S_y, eta = lava_rheology(temperature)
+    area = dx * dy
+    width = np.sqrt(area)
+
+    # Komşulara giden debiler ve hücre başına toplam çıkış
+    fluxes = []
+    outflow = np.zeros_like(thickness)
+    for di, dj in neighbours:
+        src, dst = _pair_slices(di, dj, thickness.shape)
+        distance = np.hypot(di * dx, dj * dy)
+        q = bingham_flux(thickness[src], head[src] - head[dst], distance, width, S_y[src], eta[src])
+        fluxes.append((src, dst, q))
+        outflow[src] += q
+
+    # Uyarlanır zaman adımı: hiçbir hücre hacminin courant katından fazlasını kaybetmez
+    flowing = outflow > 0
+    dt = max_dt
+    if flowing.any():
+        dt = min(max_dt, courant * np.min(thickness[flowing] * area / outflow[flowing]))
+
+    # Hacim ve ısı (hacim x sıcaklık) akışı; kalan lav ile gelen lav karışır
+    volume = thickness * area - outflow * dt
+    heat = volume * temperature
+    for src, dst, q in fluxes:
+        moved = q * dt
+        volume[dst] += moved
+        heat[dst] += moved * temperature[src]
+    thickness[:] = np.maximum(volume, 0) / area
+    with np.errstate(divide='ignore', invalid='ignore'):
+        temperature[:] = np.where(thickness > 0, heat / (thickness * area), 0.0)
+
+    # Işınımla soğuma ve katılaşma (katılaşan lav zemine eklenir)
+    temperature[:] = radiative_cooling(temperature, thickness, dt)
+    solid = (thickness > 0) & (temperature < solidus_temperature)
+    z[solid] += thickness[solid]
+    thickness[solid] = 0
+    temperature[solid] = 0
+    return dt
+
+@profiled(run=True)
+def run_lava_flow(heightmap, vents, effusion_rate, duration, courant=0.2, max_dt=60.0,
+                  temperature=eruption_temperature, snapshot_every=None):
+    """
+    heightmap (heightmap.py sözlüğü) üzerinde vents noktalarından (x, y metre) lav akışı.
+
+    effusion_rate: toplam debi (m³/s) ya da t -> debi fonksiyonu; ventler arasında eşit
+    bölünür. Dönen sözlük: 'thickness', 'temperature', 'ground' (katılaşan lav dahil),
+    'solidified' (m), 'time', 'steps', 'erupted_volume', 'lava_volume', 'solid_volume' (m³)
+    ve snapshot_every (s) verilirse kalınlık anlık görüntüleri ('snapshots': [(t, h)]).
+    """
+    ground = np.array(heightmap['z'], dtype=float)
+    initial_ground = ground.copy()
+    dx, dy = heightmap['dx'], heightmap['dy']
+    vents = np.atleast_2d(np.asarray(vents, dtype=float))
+    cells = np.column_stack([np.rint((vents[:, 0] - heightmap['x0']) / dx),
+                             np.rint((vents[:, 1] - heightmap['y0']) / dy)]).astype(np.intp)
+    cells = np.clip(cells, 0, np.array(ground.shape) - 1)
+    h = np.zeros_like(ground)
+    T = np.zeros_like(ground)
+    rate = effusion_rate if callable(effusion_rate) else (lambda t: effusion_rate)
+
+    t = 0.0
+    steps = 0
+    erupted = 0.0
+    snapshots = []
+    next_snapshot = 0.0 if snapshot_every else None
+    window = None
+    while t < duration:
+        window = active_window(h, cells, window)
+        dt = lava_step(ground, h, T, window, dx, dy, courant, min(max_dt, duration - t))
+
+        # Ventlerden dt boyunca çıkan lav (püskürme sıcaklığında karışır)
+        added = rate(t) * dt / len(cells)
+        for i, j in cells:
+            volume = h[i, j] * dx * dy
+            T[i, j] = (volume * T[i, j] + added * temperature) / (volume + added) if volume + added > 0 else 0.0
+            h[i, j] += added / (dx * dy)
+        erupted += added * len(cells)
+        t += dt
+        steps += 1
+        if next_snapshot is not None and t >= next_snapshot:
+            snapshots.append((t, h.copy()))
+            next_snapshot += snapshot_every
+
+    solidified = ground - initial_ground
+    result = {
+        'thickness': h,
+        'temperature': T,
+        'ground': ground,
+        'solidified': solidified,
+        'time': t,
+        'steps': steps,
+        'erupted_volume': erupted,
+        'lava_volume': float(h.sum() * dx * dy),
+        'solid_volume': float(solidified.sum() * dx * dy),
+        'x0': heightmap['x0'], 'y0': heightmap['y0'], 'dx': dx, 'dy': dy
+    }
+    if snapshot_every:
+        result['snapshots'] = snapshots
+    return result
+
+def flow_summary(result, vent=(0.0, 0.0)):
+    """Kaplanan alan (m²), lavın venten en uzak mesafesi (m) ve en kalın nokta (m)."""
+    covered = (result['thickness'] > 0) | (result['solidified'] > 0)
+    ix, iy = np.nonzero(covered)
+    x = result['x0'] + ix * result['dx'] - vent[0]
+    y = result['y0'] + iy * result['dy'] - vent[1]
+    return {
+        'area': float(covered.sum() * result['dx'] * result['dy']),
+        'runout': float(np.hypot(x, y).max()) if len(ix) else 0.0,
+        'max_thickness': float((result['thickness'] + result['solidified']).max())
+    }
+
+def plot_lava_flow(heightmap, result):
+    """Zemin kontur çizgileri üzerinde lav kalınlığı (akan + katılaşan)."""
+    import matplotlib.pyplot as plt
+
+    nx, ny = heightmap['z'].shape
+    x = heightmap['x0'] + np.arange(nx) * heightmap['dx']
+    y = heightmap['y0'] + np.arange(ny) * heightmap['dy']
+    total = np.ma.masked_equal(result['thickness'] + result['solidified'], 0)
+    fig, ax = plt.subplots(figsize=(9, 8))
+    ax.contour(x, y, heightmap['z'].T, levels=20, colors='gray', linewidths=0.5)
+    mesh = ax.pcolormesh(x, y, total.T, cmap='hot_r', shading='auto')
+    fig.colorbar(mesh, ax=ax, label='Lav kalınlığı (m)')
+    ax.set_aspect('equal')
+    ax.set_title(f"Lav akışı: {result['time'] / 3600:.1f} saat, {result['steps']} adım")
+    plt.show()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lav akışı hücresel otomatı (MAGFLOW tipi)")
+    parser.add_argument("--effusion-rate", type=float, default=50.0, help="Püskürme debisi (m³/s)")
+    parser.add_argument("--hours", type=float, default=24.0, help="Simülasyon süresi (saat)")
+    parser.add_argument("--volcano", help="Katalogdaki yanardağ adı (--dem ile)")
+    parser.add_argument("--lat", type=float, help="Vent enlemi (derece; --dem ile, --volcano yerine)")
+    parser.add_argument("--lon", type=float, help="Vent boylamı (derece; --dem ile, --volcano yerine)")
+    parser.add_argument("--dem", help="DEM döşemeleri klasörü; verilmezse analitik koni kullanılır")
+    parser.add_argument("--extent", type=float, default=10000.0, help="Izgaranın merkezden kenara uzaklığı (m)")
+    parser.add_argument("--resolution", type=int, default=500, help="Izgara çözünürlüğü (hücre sayısı)")
+    parser.add_argument("--vent", type=float, nargs=2, default=(0.0, 0.0), metavar=("X", "Y"),
+                        help="Vent konumu (m, ızgara merkezine göre)")
+    parser.add_argument("--output", help="Sonuç dosyası (.npz)")
+    parser.add_argument("--plot", action="store_true")
+    args = parser.parse_args()
+    if args.dem and not args.volcano and (args.lat is None or args.lon is None):
+        parser.error("--dem için --volcano ya da --lat ve --lon gerekli")
+
+    if args.dem:
+        from .terrain import TerrainSource, volcano_heightmap, catalog_site
+        if args.volcano:
+            latitude, longitude, _ = catalog_site(args.volcano)
+        else:
+            latitude, longitude = args.lat, args.lon
+        terrain = volcano_heightmap(TerrainSource(args.dem), latitude, longitude, args.extent, args.resolution)
+    else:
+        terrain = build_heightmap(lambda x, y: linear_cone_surface(x, y, args.extent, 1500.0), args.extent,
+                                  args.resolution)
+
+    result = run_lava_flow(terrain, [args.vent], args.effusion_rate, args.hours * 3600)
+    summary = flow_summary(result, args.vent)
+    print(f"{result['steps']} adım, {result['time'] / 3600:.1f} saat; püsküren hacim {result['erupted_volume']:.3g} m³ "
+          f"(akan {result['lava_volume']:.3g}, katılaşan {result['solid_volume']:.3g})")
+    print(f"Kaplanan alan: {summary['area'] / 1e6:.2f} km², en uzak mesafe: {summary['runout']:.0f} m, "
+          f"en büyük kalınlık: {summary['max_thickness']:.1f} m")
+    if args.output:
+        np.savez(args.output, **{name: value for name, value in result.items() if name != 'snapshots'})
+        print(f"Sonuçlar kaydedildi: {args.output}")
+    if args.plot:
+        plot_lava_flow(terrain, result)
@@ -0,0 +1,76 @@
+import numpy as np
+
+from .spatial_hash import neighbor_pairs
+
+# Partikül-partikül etkileşimleri: kül kümelenmesi (aggregation) ve esnek olmayan
+# çarpışmalar. Komşu çiftleri spatial_hash ile bulunur, güncellemeler np.add.at /
+# np.bincount ile tüm çiftler üzerinde bir seferde yapılır.
+
+def connected_groups(n, i, j):
+    """(i, j) çiftleriyle birbirine bağlanan partikül gruplarının etiketleri (her grubun en küçük indeksi)."""
+    labels = np.arange(n)
+    if len(i) == 0:
+        return labels
+    while True:
+        new = labels.copy()
+        np.minimum.at(new, i, labels[j])
+        np.minimum.at(new, j, labels[i])
+        new = new[new]  # İşaretçi atlama: etiketler gruba hızlı yayılır
+        if np.array_equal(new, labels):
+            return labels
+        labels = new
+
+def aggregate_particles(positions, velocities, diameters, densities, capture_radius, indices=None):
+    """
+    Birbirine capture_radius mesafesinden yakın partikülleri tek bir kümeye birleştirir (yerinde).
+
+    Küme, kütle ağırlıklı konum ve momentumu korur; çapı toplam hacimden, yoğunluğu
+    toplam kütle / toplam hacimden hesaplanır. indices verilirse sadece o partiküller
+    (ör. havuzdaki canlı partiküller) dikkate alınır. Kümeye katılıp yok olması gereken
+    partiküllerin indekslerini döner.
+    """
+    if indices is None:
+        indices = np.arange(len(positions))
+    indices = np.asarray(indices, dtype=np.intp)
+    pos = positions[indices]
+    i, j, _ = neighbor_pairs(pos, capture_radius)
+    if len(i) == 0:
+        return np.zeros(0, dtype=np.intp)
+
+    labels = connected_groups(len(indices), i, j)
+    volume = diameters[indices]**3
+    mass = volume * densities[indices]
+    n = len(indices)
+    total_mass = np.bincount(labels, mass, minlength=n)
+    total_volume = np.bincount(labels, volume, minlength=n)
+
+    roots = np.flatnonzero(np.bincount(labels, minlength=n) > 1)
+    target = indices[roots]
+    for axis in range(positions.shape[1]):
+        positions[target, axis] = np.bincount(labels, mass * pos[:, axis], minlength=n)[roots] / total_mass[roots]
+        velocities[target, axis] = np.bincount(labels, mass * velocities[indices, axis], minlength=n)[roots] / total_mass[roots]
+    diameters[target] = np.cbrt(total_volume[roots])
+    densities[target] = total_mass[roots] / total_volume[roots]
+
+    return indices[labels != np.arange(n)]
+
+def collide_particles(positions, velocities, masses, radius, restitution=0.5):
+    """
+    radius mesafesinden yakın ve birbirine yaklaşan partikül çiftleri arasında esnek olmayan çarpışma uygular (yerinde).
+
+    Darbe çiftlerin birleşim doğrultusunda uygulanır ve momentumu korur. Çarpışan çift sayısını döner.
+    """
+    i, j, distance = neighbor_pairs(positions, radius)
+    nonzero = distance > 0
+    i, j, distance = i[nonzero], j[nonzero], distance[nonzero]
+    normal = (positions[j] - positions[i]) / distance[:, None]
+    approach = np.sum((velocities[j] - velocities[i]) * normal, axis=1)
+    hit = approach < 0
+    if not hit.any():
+        return 0
+
+    i, j, normal, approach = i[hit], j[hit], normal[hit], approach[hit]
+    impulse = -(1 + restitution) * approach / (1 / masses[i] + 1 / masses[j])
+    np.add.at(velocities, i, -(impulse / masses[i])[:, None] * normal)
+    np.add.at(velocities, j, (impulse / masses[j])[:, None] * normal)
+    return len(i)
@@ -0,0 +1,108 @@
+import numpy as np
+
+# Sabit kapasiteli partikül havuzu.
+#
+# Partikül dizileri bir kez ayrılır; canlı partiküller 'active' maskesiyle, boş
+# yuvalar ise bir yığın (free list) ile izlenir. Böylece doğma, bölünme ve yok olma
+# işlemleri dizileri kopyalamadan O(1) (amortize) maliyetle yapılır. Kapasite
+# dolarsa diziler iki katına çıkarılır.
+
+class ParticlePool:
+    """
+    Alan adlarıyla tanımlanan partikül dizilerini tutan havuz.
+
+    fields: {'pos': ((3,), float), 'split': ((), int), ...} biçiminde alan tanımları.
+    Her alan havuz üzerinde aynı isimli bir dizi olarak erişilir (ör. pool.pos).
+    """
+
+    def __init__(self, capacity, fields):
+        self.capacity = int(capacity)
+        self.fields = {name: (tuple(shape), np.dtype(dtype)) for name, (shape, dtype) in fields.items()}
+        for name, (shape, dtype) in self.fields.items():
+            setattr(self, name, np.zeros((self.capacity,) + shape, dtype=dtype))
+        self.active = np.zeros(self.capacity, dtype=bool)
+        # Yığının tepesi free[n_free - 1]; küçük indeksler önce kullanılır
+        self.free = np.arange(self.capacity - 1, -1, -1)
+        self.n_free = self.capacity
+
+    def __len__(self):
+        return self.capacity - self.n_free
+
+    def indices(self):
+        """Canlı partiküllerin indeksleri."""
+        return np.flatnonzero(self.active)
+
+    def clear(self):
+        """Tüm partikülleri yok eder (diziler yeniden ayrılmaz)."""
+        self.active[:] = False
+        self.free[:] = np.arange(self.capacity - 1, -1, -1)
+        self.n_free = self.capacity
+
+    def spawn(self, count, **values):
+        """
+        count adet yeni partikül için yuva ayırır ve verilen alan değerlerini yazar.
+
+        Ayrılan indeksleri döner. values: alan adı -> (count, ...) dizisi ya da yayınlanabilir değer;
+        verilmeyen alanlar sıfırlanır (yuvadan önceki partikülün değerleri kalmaz).
+        """
+        count = int(count)
+        if count > self.n_free:
+            self.grow(len(self) + count)
+        indices = self.free[self.n_free - count:self.n_free][::-1].copy()
+        self.n_free -= count
+        self.active[indices] = True
+        for name in self.fields:
+            getattr(self, name)[indices] = values.get(name, 0)
+        return indices
+
+    def retire(self, indices):
+        """Verilen partikülleri yok eder ve yuvalarını boş listeye geri koyar."""
+        indices = np.unique(np.asarray(indices, dtype=np.intp))
+        indices = indices[self.active[indices]]
+        self.active[indices] = False
+        self.free[self.n_free:self.n_free + len(indices)] = indices[::-1]
+        self.n_free += len(indices)
+        return indices
+
+    def grow(self, min_capacity):
+        """Kapasiteyi en az min_capacity olacak şekilde iki katına çıkarır."""
+        new_capacity = max(self.capacity * 2, int(min_capacity))
+        extra = new_capacity - self.capacity
+        for name, (shape, dtype) in self.fields.items():
+            old = getattr(self, name)
+            new = np.zeros((new_capacity,) + shape, dtype=dtype)
+            new[:self.capacity] = old
+            setattr(self, name, new)
+        active = np.zeros(new_capacity, dtype=bool)
+        active[:self.capacity] = self.active
+        self.active = active
+        # Yeni yuvalar yığının altına eklenir, mevcut boş yuvalar önce kullanılmaya devam eder
+        free = np.empty(new_capacity, dtype=np.intp)
+        free[:extra] = np.arange(new_capacity - 1, self.capacity - 1, -1)
+        free[extra:extra + self.n_free] = self.free[:self.n_free]
+        self.free = free
+        self.n_free += extra
+        self.capacity = new_capacity
+
+    def state(self):
+        """Havuzun tüm durumunu (alanlar, aktif maske, boş yuvalar) sözlük olarak döner (kontrol noktası için)."""
+        state = {name: getattr(self, name) for name in self.fields}
+        state['active'] = self.active
+        state['free'] = self.free[:self.n_free]
+        return state
+
+    def load_state(self, state):
+        """state() ile alınmış durumu havuza yükler; gerekirse kapasiteyi büyütür."""
+        capacity = len(state['active'])
+        if capacity > self.capacity:
+            self.grow(capacity)
+        self.clear()
+        for name in self.fields:
+            getattr(self, name)[:capacity] = state[name]
+        self.active[:capacity] = state['active']
+        # Kaydedilen boş yuvalar yığının tepesinde, fazla kapasite altta kalır
+        extra = np.arange(self.capacity - 1, capacity - 1, -1)
+        free = np.asarray(state['free'], dtype=np.intp)
+        self.n_free = len(extra) + len(free)
+        self.free[:len(extra)] = extra
+        self.free[len(extra):self.n_free] = free
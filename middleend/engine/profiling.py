@@ -0,0 +1,225 @@
+import atexit
+import contextlib
+import contextvars
+import cProfile
+import functools
+import inspect
+import io
+import itertools
+import os
+import pstats
+import sys
+import threading
+import time
+
+# İsteğe bağlı (opt-in) profil kancaları.
+#
+# VOLCANO_PROFILE ortam değişkeniyle açılır; süreç başlamadan önce ayarlanmalıdır:
+#   (boş) / 0  kapalı: profiled() fonksiyonu olduğu gibi döner, span() paylaşılan boş
+#              bağlamı döner; üretimde bırakılabilecek kadar ucuzdur.
+#   1 / spans  zaman aralıkları (span): her aşamanın süresi ve çağrı yığını kaydedilir.
+#   cprofile   span'lere ek olarak her koşu (istek / run) cProfile ile profillenir (.prof).
+#   sample     span'lere ek olarak her koşu ayrı bir thread'le örneklenir (yığın örnekleri).
+#
+# Her koşunun sonunda VOLCANO_PROFILE_DIR (varsayılan: profiles) klasörüne flame graph
+# uyumlu "collapsed stack" dosyası (flamegraph.pl, speedscope, inferno ile açılır) ve
+# aşama bazında özet tablo yazılır. Koşu dışında kalan span'ler süreç kapanırken raporlanır.
+
+profile_mode = os.environ.get('VOLCANO_PROFILE', '').strip().lower()
+if profile_mode in ('', '0', 'off', 'false'):
+    profile_mode = ''
+elif profile_mode in ('1', 'on', 'true'):
+    profile_mode = 'spans'
+enabled = bool(profile_mode)
+profile_dir = os.environ.get('VOLCANO_PROFILE_DIR', 'profiles')
+sample_interval = float(os.environ.get('VOLCANO_PROFILE_INTERVAL', 0.001))  # Örnekleme aralığı (s)
+
+_NULL_SPAN = contextlib.nullcontext()
+_run_ids = itertools.count(1)
+
+class Recorder:
+    """Bir koşunun span kayıtları: yığın başına öz süre ve aşama başına çağrı istatistikleri."""
+
+    def __init__(self, name):
+        self.name = name
+        self.self_times = {}  # ('a', 'b', ...) yığını -> öz süre (s)
+        self.stages = {}  # aşama adı -> [çağrı, toplam, en uzun, öz süre]
+        self._local = threading.local()
+
+    @property
+    def stack(self):
+        """Bu thread'in açık span yığını: [(ad, alt span süreleri toplamı), ...]."""
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def record(self, path, elapsed, own):
+        self.self_times[path] = self.self_times.get(path, 0.0) + own
+        stage = self.stages.setdefault(path[-1], [0, 0.0, 0.0, 0.0])
+        stage[0] += 1
+        stage[1] += elapsed
+        stage[2] = max(stage[2], elapsed)
+        stage[3] += own
+
+_global_recorder = Recorder('process')
+_current = contextvars.ContextVar('volcano_profile_recorder', default=None)
+
+class _Span:
+    __slots__ = ('name', 'recorder', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.recorder = _current.get() or _global_recorder
+        self.recorder.stack.append([self.name, 0.0])
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        stack = self.recorder.stack
+        path = tuple(name for name, _ in stack)
+        _, children = stack.pop()
+        self.recorder.record(path, elapsed, elapsed - children)
+        if stack:
+            stack[-1][1] += elapsed
+        return False
+
+def span(name):
+    """name adlı zaman aralığı bağlamı; profil kapalıyken hiçbir şey yapmaz."""
+    return _Span(name) if enabled else _NULL_SPAN
+
+def profiled(name=None, run=False):
+    """
+    Fonksiyonu bir span (run=True ise ayrı raporlanan bir koşu) ile saran dekoratör.
+
+    Profil kapalıyken fonksiyon değiştirilmeden döner. async fonksiyonlar da desteklenir.
+    """
+    def decorator(fn):
+        if not enabled:
+            return fn
+        label = name or fn.__name__
+        context = functools.partial(profile_run, label) if run else functools.partial(_Span, label)
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with context():
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with context():
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# #########################
+# # Koşular (istek / run başına rapor)
+# #########################
+class _Sampler:
+    """Verilen thread'in çağrı yığınını sabit aralıklarla örnekleyen arka plan thread'i."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack and not self._stop.is_set():  # Durdurulurken alınan örnek (join) sayılmaz
+                path = tuple(reversed(stack))
+                self.counts[path] = self.counts.get(path, 0) + 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+@contextlib.contextmanager
+def profile_run(name):
+    """
+    Bir koşuyu (ör. tek API isteği) ayrı kaydedip sonunda raporlayan bağlam.
+
+    İç içe çağrıldığında sadece span gibi davranır. Profil kapalıyken hiçbir şey yapmaz.
+    """
+    if not enabled or _current.get() is not None:
+        with span(name):
+            yield
+        return
+
+    recorder = Recorder(name)
+    token = _current.set(recorder)
+    profiler = sampler = None
+    if profile_mode == 'cprofile':
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # Başka bir profil aracı (eşzamanlı istek) zaten çalışıyor
+            profiler = None
+    elif profile_mode == 'sample':
+        sampler = _Sampler(threading.get_ident(), sample_interval).__enter__()
+    try:
+        with _Span(name):
+            yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        if sampler is not None:
+            sampler.__exit__()
+        _current.reset(token)
+        write_report(recorder, profiler, sampler)
+
+def collapsed_stacks(counts):
+    """Yığın -> değer sözlüğünü collapsed stack satırlarına ("a;b;c değer") çevirir."""
+    return [f"{';'.join(path)} {value}" for path, value in sorted(counts.items()) if value > 0]
+
+def summary_table(recorder):
+    """Aşama bazında özet tablo (toplam süreye göre azalan) metni."""
+    total = sum(recorder.self_times.values()) or 1.0
+    lines = [f"{'Aşama':<40}{'çağrı':>8}{'toplam ms':>12}{'ort. ms':>10}{'en uzun ms':>12}"
+             f"{'öz ms':>10}{'öz %':>7}"]
+    for stage, (calls, elapsed, longest, own) in sorted(recorder.stages.items(), key=lambda kv: -kv[1][1]):
+        lines.append(f"{stage:<40}{calls:>8}{elapsed * 1e3:>12.3f}{elapsed / calls * 1e3:>10.3f}"
+                     f"{longest * 1e3:>12.3f}{own * 1e3:>10.3f}{own / total * 100:>7.1f}")
+    return "\n".join(lines)
+
+def write_report(recorder, profiler=None, sampler=None):
+    """Koşunun collapsed stack, özet tablo (ve varsa .prof / örnek) dosyalarını yazar; tabloyu basar."""
+    if not recorder.stages:
+        return None
+    os.makedirs(profile_dir, exist_ok=True)
+    prefix = os.path.join(profile_dir, f"{recorder.name}-{os.getpid()}-{next(_run_ids)}")
+    # Öz süreler mikrosaniye cinsinden tam sayıya yuvarlanır (flame graph araçları tam sayı bekler)
+    micros = {path: int(round(own * 1e6)) for path, own in recorder.self_times.items()}
+    with open(prefix + '.collapsed', 'w') as f:
+        f.write("\n".join(collapsed_stacks(micros)) + "\n")
+    table = summary_table(recorder)
+    if profiler is not None:
+        profiler.dump_stats(prefix + '.prof')
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(25)
+        table += "\n\n" + out.getvalue()
+    if sampler is not None:
+        with open(prefix + '.sample.collapsed', 'w') as f:
+            f.write("\n".join(collapsed_stacks(sampler.counts)) + "\n")
+    with open(prefix + '.txt', 'w') as f:
+        f.write(table + "\n")
+    print(f"\n[profil] {recorder.name}\n{summary_table(recorder)}\n[profil] rapor: {prefix}.*", file=sys.stderr)
+    return prefix
+
+if enabled:
+    atexit.register(lambda: write_report(_global_recorder))
@@ -0,0 +1,109 @@
+import os
+
+import numpy as np
+
+# Monte Carlo sonuçlarının sütunlu (columnar) dosyalara parça parça yazılması.
+#
+# Her write() çağrısı bir parçayı (ör. deneme motorunun bir bellek parçası) dosyanın
+# sonuna ekler: Parquet'te bir row group, Feather'da (Arrow IPC) bir record batch,
+# CSV'de başlıksız satırlar. Böylece çok büyük koşular belleğe sığdırılmadan yazılır
+# ve analiz için sütun seçerek hızlıca geri okunur. pyarrow yoksa CSV'ye düşülür.
+
+_FORMATS = {'.parquet': 'parquet', '.pq': 'parquet', '.feather': 'feather', '.arrow': 'feather', '.csv': 'csv'}
+
+def result_format(path):
+    """Dosya uzantısından biçim: 'parquet', 'feather' ya da 'csv'."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in _FORMATS:
+        raise ValueError(f"Desteklenmeyen sonuç dosyası uzantısı: {extension}")
+    return _FORMATS[extension]
+
+class ResultWriter:
+    """
+    Sütun sözlüklerini (isim -> eşit uzunlukta dizi) tek dosyaya ekleyen yazıcı.
+
+    with ResultWriter('sonuclar.parquet') as writer:
+        writer.write({'trial': ..., 'max_distance': ...})
+    Sütun adları ve türleri ilk parçadan alınır; sonraki parçalar aynı sütunları içermelidir.
+    """
+
+    def __init__(self, path, format=None):
+        self.format = format or result_format(path)
+        if self.format != 'csv':
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                print("pyarrow bulunamadı, sonuçlar CSV olarak yazılıyor.")
+                self.format = 'csv'
+                path = os.path.splitext(path)[0] + '.csv'
+        self.path = path
+        self.rows = 0
+        self._writer = None
+        self._file = None
+        self._schema = None
+
+    def write(self, columns):
+        """Bir parça satırı dosyanın sonuna ekler."""
+        columns = {name: np.asarray(values) for name, values in columns.items()}
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) != 1:
+            raise ValueError("Tüm sütunlar aynı uzunlukta olmalıdır.")
+        if self.format == 'csv':
+            self._write_csv(columns)
+        else:
+            self._write_arrow(columns)
+        self.rows += lengths.pop()
+
+    def _write_csv(self, columns):
+        import pandas as pd
+
+        header = self._file is None
+        if header:
+            self._file = open(self.path, 'w', newline='')
+        pd.DataFrame(columns).to_csv(self._file, header=header, index=False)
+
+    def _write_arrow(self, columns):
+        import pyarrow as pa
+
+        if self._schema is None:
+            table = pa.table(columns)
+            self._schema = table.schema
+            if self.format == 'parquet':
+                import pyarrow.parquet as pq
+                self._writer = pq.ParquetWriter(self.path, self._schema)
+            else:
+                self._file = pa.OSFile(self.path, 'wb')
+                self._writer = pa.ipc.new_file(self._file, self._schema)
+        else:
+            table = pa.table(columns, schema=self._schema)
+        if self.format == 'parquet':
+            self._writer.write_table(table)
+        else:
+            for batch in table.to_batches():
+                self._writer.write_batch(batch)
+
+    def close(self):
+        """Dosyayı kapatır (Parquet/Feather alt bilgisi burada yazılır)."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def read_results(path, columns=None):
+    """Sonuç dosyasını (istenirse sadece verilen sütunları) pandas DataFrame olarak okur."""
+    import pandas as pd
+
+    format = result_format(path)
+    if format == 'parquet':
+        return pd.read_parquet(path, columns=columns)
+    if format == 'feather':
+        return pd.read_feather(path, columns=columns)
+    return pd.read_csv(path, usecols=columns)
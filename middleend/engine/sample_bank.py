@@ -0,0 +1,109 @@
+import os
+import tempfile
+
+import numpy as np
+
+# Ortak, bellek eşlemeli (memmap) parametre örnek bankası.
+#
+# Patlama parametrelerinin ortak örnekleri bir kez, seed'li olarak .npy dosyasına
+# (alan adlı yapısal dizi) yazılır. Tüm scriptler ve paralel işçiler aynı dosyayı
+# np.load(mmap_mode='r') ile açar; dilimler ve sütunlar kopyalanmadan okunur,
+# örnekler yeniden üretilmez ve process'ler arasında dizi taşınmaz (pickle yok).
+# Her parametre kendi rastgele akışından üretildiği için banka parça boyutundan
+# bağımsızdır ve aynı seed her zaman aynı bankayı verir.
+
+# Patlama parametreleri: isim -> (Generator dağılımı, argümanlar[, ölçek])
+eruption_parameters = {
+    'initial_mixture_density': ('normal', (5.74, 0.5)),
+    'mass_discharge_rate': ('normal', (1.5e6, 1e5)),
+    'magma_temperature': ('normal', (1273.15, 50)),
+    'volatile_content': ('beta', (3, 2), 100),
+    'gas_constant': ('normal', (462, 50)),
+    'Cva': ('triangular', (680, 710, 740)),
+    'Cvg': ('gamma', (2, 0.5)),
+    'Cvs': ('normal', (1100, 100))
+}
+
+bank_size = 1_000_000  # Varsayılan banka satır sayısı
+bank_seed = 0
+data_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # Üretilen bankalar middleend klasöründe tutulur
+default_bank_path = os.path.join(data_dir, 'parameter_bank.npy')
+
+def _draw(rng, spec, n):
+    distribution, args, *scale = spec
+    return getattr(rng, distribution)(*args, n) * (scale[0] if scale else 1)
+
+def sample_parameters(rng, n, parameters=eruption_parameters):
+    """Parametre dağılımlarından (n, k) örnek matrisi (bellekte); sütun sırası parameters sırasıdır."""
+    return np.column_stack([_draw(rng, spec, n) for spec in parameters.values()])
+
+def create_bank(path=default_bank_path, n=bank_size, seed=bank_seed, parameters=eruption_parameters,
+                chunk=1_000_000):
+    """
+    n satırlık örnek bankasını path'e yazar (parça parça, tüm banka belleğe alınmaz) ve memmap olarak döner.
+
+    Banka process'e özgü geçici dosyaya yazılıp path'e taşınır; aynı anda bankayı kuran
+    process'ler birbirinin dosyasını bozmaz, taşıma başka bir process'in yazdığı banka
+    açıkken başarısız olursa (aynı seed aynı bankayı verir) onun bankası kullanılır.
+    """
+    dtype = np.dtype([(name, np.float64) for name in parameters])
+    fd, tmp_path = tempfile.mkstemp(suffix='.npy', prefix=os.path.basename(path) + '.',
+                                    dir=os.path.dirname(os.path.abspath(path)))
+    os.close(fd)
+    try:
+        bank = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=dtype, shape=(n,))
+        streams = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(len(parameters))]
+        for start in range(0, n, chunk):
+            stop = min(start + chunk, n)
+            for rng, (name, spec) in zip(streams, parameters.items()):
+                bank[name][start:stop] = _draw(rng, spec, stop - start)
+        bank.flush()
+        del bank
+        os.chmod(tmp_path, 0o644)  # mkstemp dosyayı yalnız sahibine açık oluşturur
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            # Hedef başka bir process'te açık (ör. Windows'ta eşlenmiş dosya): onun yazdığı banka uygunsa kullanılır
+            if not (os.path.exists(path) and _bank_fits(open_bank(path), n, parameters)):
+                raise
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return open_bank(path)
+
+def _bank_fits(bank, n, parameters):
+    return len(bank) >= n and bank.dtype.names == tuple(parameters)
+
+def open_bank(path=default_bank_path):
+    """Bankayı salt okunur memmap olarak açar."""
+    return np.load(path, mmap_mode='r')
+
+def get_bank(path=default_bank_path, n=bank_size, seed=bank_seed, parameters=eruption_parameters):
+    """Bankayı açar; dosya yoksa, satırları yetmiyorsa ya da parametreler farklıysa yeniden üretir."""
+    if os.path.exists(path):
+        bank = open_bank(path)
+        if _bank_fits(bank, n, parameters):
+            return bank
+        del bank
+    return create_bank(path, n, seed, parameters)
+
+def bank_columns(bank, start=0, stop=None):
+    """[start, stop) satırlarının parametre sütunları: isim -> kopyasız görünüm."""
+    rows = bank[start:stop]
+    return {name: rows[name] for name in bank.dtype.names}
+
+def bank_matrix(bank, start=0, stop=None):
+    """[start, stop) satırlarını (n, k) float matrisi olarak döner (hesap için kopyalanır)."""
+    rows = bank[start:stop]
+    return np.column_stack([rows[name] for name in bank.dtype.names])
+
+def simulate_distribution(n=1000, start=0, bank=None):
+    """Bankanın [start, start + n) satırlarındaki parametre ortalamaları (isim -> ortalama)."""
+    bank = get_bank() if bank is None else bank
+    return {name: float(np.mean(values)) for name, values in bank_columns(bank, start, start + n).items()}
+
+def distribution_summary(n=1000, start=0, bank=None):
+    """Bankanın [start, start + n) satırlarındaki parametre ortalama ve standart sapmaları."""
+    bank = get_bank() if bank is None else bank
+    return {name: {'Mean': float(np.mean(values)), 'Std Dev': float(np.std(values))}
+            for name, values in bank_columns(bank, start, start + n).items()}
@@ -0,0 +1,164 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .trial_engine import evaluate_trials
+from .sample_bank import eruption_parameters, sample_parameters, bank_matrix, get_bank, bank_size
+
+# Patlama parametreleri üzerinde global duyarlılık analizi (Sobol indeksleri).
+#
+# Saltelli şeması: iki bağımsız örnek matrisi A ve B (N x k) ile her parametre i için
+# A'nın i. sütunu B'den alınmış AB_i matrisi kurulur; model N (k + 2) kez çalışır.
+# Birinci derece indeks Saltelli (2010), toplam indeks Jansen (1999) tahmincisiyle,
+# güven aralıkları satırların bootstrap'iyle hesaplanır. Model çağrıları satır grupları
+# (batch) halinde vektörel yapılır ve isteğe bağlı olarak process'lere dağıtılır.
+
+# Sekiz patlama parametresi ve dağılımları (ortak örnek bankasıyla aynı)
+parameters = eruption_parameters
+parameter_names = list(parameters)
+
+def saltelli_matrices(rng, n, bank=None):
+    """
+    A, B ve AB (k, n, k) matrisleri; AB[i], i. sütunu B'den alınmış A'dır.
+
+    bank verilirse A ve B ortak örnek bankasının ilk 2n satırından alınır (bkz. sample_bank.py).
+    """
+    if bank is not None:
+        A, B = bank_matrix(bank, 0, n), bank_matrix(bank, n, 2 * n)
+    else:
+        A = sample_parameters(rng, n)
+        B = sample_parameters(rng, n)
+    k = A.shape[1]
+    AB = np.repeat(A[None], k, axis=0)
+    AB[np.arange(k), :, np.arange(k)] = B.T
+    return A, B, AB
+
+# #########################
+# # Modeller: (n, k) parametre matrisi -> (n,) çıktı
+# #########################
+def survival_distance_model(X):
+    """
+    3_Ölüyormuyuyuz modelinde hayatta kalmanın mümkün olduğu en kısa mesafe (km).
+
+    Enerji I / (1 + 0.1 d²) <= 20 ve sıcaklık T e^{-d / 50} <= 473 K koşullarının ikisinin de
+    sağlandığı mesafe; I = 50 * (kütle debisi / 1.5e6).
+    """
+    p = dict(zip(parameter_names, X.T))
+    intensity = 50 * p['mass_discharge_rate'] / 1.5e6
+    d_energy = np.sqrt(np.maximum(intensity / 20 - 1, 0) / 0.1)
+    d_temperature = 50 * np.log(np.maximum(p['magma_temperature'] / 473, 1))
+    return np.maximum(d_energy, d_temperature)
+
+trial_model_bodies = 20  # Deneme motoru modelinde fırlatılan cisim sayısı
+trial_model_seed = 2024  # Sabit cisim seti (ortak rastgele sayılar) için seed
+trial_model_vent_height = 1421  # m
+
+def trial_engine_model(X):
+    """
+    Deneme motorunda en uzağa giden kayacın mesafesi (m).
+
+    Çıkış hızı gaz genleşmesinden w0 = sqrt(2 (uçucu / 100) R T) alınır. Her satır aynı
+    sabit cisim setini (yön ve göreli hız) w0 ile ölçekleyerek fırlatır; böylece çıktı
+    sadece parametrelerin fonksiyonudur ve Sobol tahmincileri gürültüsüz kalır.
+    """
+    p = dict(zip(parameter_names, X.T))
+    w0 = np.sqrt(2 * np.clip(p['volatile_content'], 0, None) / 100
+                 * np.clip(p['gas_constant'], 0, None) * p['magma_temperature'])
+    rng = np.random.default_rng(trial_model_seed)
+    theta = rng.uniform(0, 2 * np.pi, trial_model_bodies)
+    phi = rng.uniform(0, np.pi / 2, trial_model_bodies)
+    speed = rng.uniform(0.5, 1.0, trial_model_bodies) * w0[:, None]
+    horizontal = speed * np.cos(phi)
+    trials = evaluate_trials(horizontal * np.cos(theta), horizontal * np.sin(theta), speed * np.sin(phi),
+                             vent_height=trial_model_vent_height)
+    return trials['max_distance']
+
+models = {
+    'survival': survival_distance_model,
+    'trial_engine': trial_engine_model
+}
+
+def evaluate_model(model, X, batch_size=20000, workers=1):
+    """Modeli X satırları üzerinde batch'ler halinde (workers > 1 ise paralel) çalıştırır."""
+    batches = [X[i:i + batch_size] for i in range(0, len(X), batch_size)]
+    workers = os.cpu_count() if workers is None else workers
+    if workers > 1 and len(batches) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(batches))) as pool:
+            return np.concatenate(list(pool.map(model, batches)))
+    return np.concatenate([model(batch) for batch in batches])
+
+def sobol_indices(fA, fB, fAB):
+    """
+    Birinci derece (S1) ve toplam (ST) Sobol indeksleri.
+
+    fA, fB: (..., n), fAB: (k, ..., n). Baştaki ekstra eksenler bootstrap tekrarları içindir.
+    """
+    both = np.concatenate((fA, fB), axis=-1)
+    variance = np.var(both, axis=-1)
+    variance = np.where(variance > 0, variance, np.nan)
+    # Çıktılar ortalamadan arındırılır: ortalama, varyansa göre büyükken S1 tahmininin gürültüsünü azaltır
+    mean = np.mean(both, axis=-1, keepdims=True)
+    S1 = np.mean((fB - mean) * (fAB - fA), axis=-1) / variance
+    ST = 0.5 * np.mean((fA - fAB)**2, axis=-1) / variance
+    return S1, ST
+
+def sobol_analysis(model, n=10000, seed=None, bootstrap=200, confidence=0.95, batch_size=20000, workers=1,
+                   bank=None):
+    """
+    model için Saltelli örneklemesiyle Sobol indekslerini ve bootstrap güven aralıklarını hesaplar.
+
+    Model n (k + 2) kez değerlendirilir; bank verilirse A ve B bankadan okunur. Dönen sözlük: 'names', 'S1', 'ST', 'S1_conf', 'ST_conf'
+    (güven aralığı yarı genişlikleri), 'evaluations' ve 'variance'.
+    """
+    model = models[model] if isinstance(model, str) else model
+    rng = np.random.default_rng(seed)
+    A, B, AB = saltelli_matrices(rng, n, bank)
+    k = A.shape[1]
+
+    outputs = evaluate_model(model, np.concatenate((A, B, AB.reshape(-1, k))), batch_size, workers)
+    fA, fB, fAB = outputs[:n], outputs[n:2 * n], outputs[2 * n:].reshape(k, n)
+    S1, ST = sobol_indices(fA, fB, fAB)
+
+    # Bootstrap: satırlar yeniden örneklenir (model tekrar çalışmaz); bellek için tekrarlar gruplanır
+    per_group = max(1, 2**24 // (k * n))
+    S1_boot, ST_boot = [], []
+    for start in range(0, bootstrap, per_group):
+        resample = rng.integers(0, n, (min(per_group, bootstrap - start), n))
+        S1_group, ST_group = sobol_indices(fA[resample], fB[resample], fAB[:, resample])
+        S1_boot.append(S1_group)
+        ST_boot.append(ST_group)
+    S1_boot, ST_boot = np.concatenate(S1_boot, axis=1), np.concatenate(ST_boot, axis=1)
+    alpha = (1 - confidence) / 2
+    S1_low, S1_high = np.nanquantile(S1_boot, [alpha, 1 - alpha], axis=1)
+    ST_low, ST_high = np.nanquantile(ST_boot, [alpha, 1 - alpha], axis=1)
+    return {
+        'names': parameter_names,
+        'S1': S1,
+        'ST': ST,
+        'S1_conf': (S1_high - S1_low) / 2,
+        'ST_conf': (ST_high - ST_low) / 2,
+        'evaluations': len(outputs),
+        'variance': float(np.var(np.concatenate((fA, fB))))
+    }
+
+def format_indices(result):
+    """Sobol indekslerini tablo metni olarak döner (ST'ye göre azalan)."""
+    lines = [f"{'Parametre':<26}{'S1':>9}{'± CI':>9}{'ST':>9}{'± CI':>9}"]
+    for i in np.argsort(-np.nan_to_num(result['ST'])):
+        lines.append(f"{result['names'][i]:<26}{result['S1'][i]:>9.3f}{result['S1_conf'][i]:>9.3f}"
+                     f"{result['ST'][i]:>9.3f}{result['ST_conf'][i]:>9.3f}")
+    lines.append(f"Model değerlendirme sayısı: {result['evaluations']}")
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Patlama parametreleri için Sobol duyarlılık analizi")
+    parser.add_argument("--model", choices=list(models), default='trial_engine')
+    parser.add_argument("-n", type=int, default=10000, help="Temel örnek sayısı (değerlendirme: n * (k + 2))")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--bank", action="store_true", help="A ve B matrislerini ortak örnek bankasından oku")
+    args = parser.parse_args()
+    bank = get_bank(n=max(bank_size, 2 * args.n)) if args.bank else None
+    print(format_indices(sobol_analysis(args.model, args.n, args.seed, workers=args.workers, bank=bank)))
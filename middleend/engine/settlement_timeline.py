@@ -0,0 +1,93 @@
+import numpy as np
+
+# Yerleşim yerleri için eşik aşım zaman çizelgesi.
+#
+# 2_SONmagmalos_v2_random.py ve 3_Ölüyormuyuyuz_random.py modellerinde enerji ve
+# sıcaklık zamanla exp(-t / decay_time) şeklinde sönümlenir. Bu yüzden bir eşiğin
+# aşıldığı süre analitik olarak bulunabilir:
+#     peak * exp(-t / decay_time) > threshold  =>  t < decay_time * ln(peak / threshold)
+# Böylece binlerce yerleşim ve eşik için alarm takvimi frame frame simülasyon
+# yapmadan tek bir vektörel geçişte hesaplanır.
+
+def energy_at_distance(distance, intensity, time, decay_factor=0.1, decay_time=10.0):
+    """Patlama merkezinden belirli bir mesafede ve zamanda enerji (dizi girişlerini destekler)."""
+    distance = np.asarray(distance, dtype=float)
+    return intensity / (1 + decay_factor * distance**2) * np.exp(-np.asarray(time, dtype=float) / decay_time)
+
+def temperature_at_distance(distance, magma_temp, spread, time=0.0, decay_time=10.0):
+    """Mesafeye ve zamana göre sönümlenen sıcaklık (K)."""
+    distance = np.asarray(distance, dtype=float)
+    return magma_temp * np.exp(-distance / spread) * np.exp(-np.asarray(time, dtype=float) / decay_time)
+
+def is_survivable(distance, intensity, magma_temp, spread, energy_threshold=20, temperature_threshold=473,
+                  time=0.0, decay_factor=0.1, decay_time=10.0):
+    """Verilen mesafede enerji ve sıcaklığın ikisi de ölüm eşiklerinin altındaysa True (dizi girişlerini destekler)."""
+    energy = energy_at_distance(distance, intensity, time, decay_factor, decay_time)
+    temperature = temperature_at_distance(distance, magma_temp, spread, time, decay_time)
+    return (energy <= energy_threshold) & (temperature <= temperature_threshold)
+
+def exceedance_windows(peak, thresholds, decay_time=10.0, onset=0.0):
+    """
+    peak * exp(-(t - onset) / decay_time) > threshold koşulunun sağlandığı zaman aralıkları.
+
+    peak (S,) ve thresholds (K,) için (S, K) boyutlu başlangıç ve bitiş dizileri döner.
+    Eşik hiç aşılmıyorsa ilgili hücreler NaN olur.
+    """
+    peak = np.asarray(peak, dtype=float).reshape(-1, 1)
+    thresholds = np.asarray(thresholds, dtype=float).reshape(1, -1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        duration = decay_time * np.log(peak / thresholds)
+    exceeded = duration > 0
+    start = np.where(exceeded, onset, np.nan)
+    end = np.where(exceeded, onset + duration, np.nan)
+    return start, end
+
+def hazard_timeline(distances, energy_thresholds, temperature_thresholds=(), intensity=50,
+                    magma_temp=1273.15, spread=50, decay_factor=0.1, decay_time=10.0, onset=0.0):
+    """
+    Her yerleşim ve her tehlike eşiği için enerji ve sıcaklık eşiklerinin aşıldığı zaman pencereleri.
+
+    distances: yerleşim mesafeleri (km), energy_thresholds / temperature_thresholds: eşik listeleri.
+    Dönen sözlükteki '*_start' ve '*_end' dizileri (yerleşim, eşik) boyutundadır.
+    """
+    distances = np.abs(np.asarray(distances, dtype=float))
+    peak_energy = energy_at_distance(distances, intensity, 0.0, decay_factor, decay_time)
+    peak_temperature = temperature_at_distance(distances, magma_temp, spread)
+
+    energy_start, energy_end = exceedance_windows(peak_energy, energy_thresholds, decay_time, onset)
+    temperature_start, temperature_end = exceedance_windows(peak_temperature, temperature_thresholds, decay_time, onset)
+
+    return {
+        'distances': distances,
+        'energy_thresholds': np.asarray(energy_thresholds, dtype=float),
+        'temperature_thresholds': np.asarray(temperature_thresholds, dtype=float),
+        'peak_energy': peak_energy,
+        'peak_temperature': peak_temperature,
+        'energy_start': energy_start,
+        'energy_end': energy_end,
+        'temperature_start': temperature_start,
+        'temperature_end': temperature_end
+    }
+
+def alert_schedule(start, end):
+    """
+    (yerleşim, eşik) pencerelerini sadece aşım olan satırlardan oluşan kompakt aralık dizilerine çevirir.
+
+    Dönen sözlük: 'settlement', 'threshold', 'start', 'end' (hepsi aynı uzunlukta, başlangıca göre sıralı).
+    """
+    settlement, threshold = np.nonzero(~np.isnan(start))
+    order = np.lexsort((-end[settlement, threshold], start[settlement, threshold]))
+    settlement = settlement[order]
+    threshold = threshold[order]
+    return {
+        'settlement': settlement,
+        'threshold': threshold,
+        'start': start[settlement, threshold],
+        'end': end[settlement, threshold]
+    }
+
+def energy_table(distances, intensity, times, decay_factor=0.1, decay_time=10.0):
+    """Tüm zaman adımları ve yerleşimler için (zaman, yerleşim) boyutlu enerji tablosu."""
+    distances = np.abs(np.asarray(distances, dtype=float))
+    times = np.asarray(times, dtype=float)
+    return energy_at_distance(distances[None, :], intensity, times[:, None], decay_factor, decay_time)
@@ -0,0 +1,105 @@
+import itertools
+
+import numpy as np
+
+# Düzgün ızgara (cell list) ile komşu arama.
+#
+# Partiküller her adımda hücrelerine göre sıralanır, hücre doluluğu np.bincount ile
+# bulunur. Bir partikülün komşuları sadece kendi hücresinde ve bitişik hücrelerde
+# aranır; böylece tüm çiftleri denemek (O(n^2)) yerine maliyet partikül sayısıyla
+# yaklaşık doğrusal kalır.
+
+def build_cell_list(positions, cell_size):
+    """
+    Partikülleri cell_size boyutlu hücrelere yerleştirir.
+
+    Dönen sözlük: 'order' (hücreye göre sıralı partikül indeksleri), 'keys' (her partikülün
+    hücre anahtarı), 'cells' (dolu hücre anahtarları, sıralı), 'start' ve 'count'
+    (her dolu hücrenin order içindeki başlangıcı ve partikül sayısı), 'strides' (komşu
+    hücre anahtarlarını hesaplamak için eksen adımları).
+    """
+    positions = np.asarray(positions, dtype=float)
+    coords = np.floor(positions / cell_size).astype(np.int64)
+    # Komşu ofsetleri (-1, +1) taşma yapmasın diye her eksende bir hücre pay bırakılır
+    coords -= coords.min(axis=0) - 1
+    dims = coords.max(axis=0) + 2
+    if np.prod(dims.astype(float)) >= 2.0**62:
+        raise ValueError("Hücre ızgarası çok büyük: cell_size değerini büyütün.")
+
+    strides = np.ones(len(dims), dtype=np.int64)
+    for axis in range(len(dims) - 2, -1, -1):
+        strides[axis] = strides[axis + 1] * dims[axis + 1]
+    keys = coords @ strides
+
+    order = np.argsort(keys, kind='stable')
+    cells, cell_index = np.unique(keys[order], return_inverse=True)
+    count = np.bincount(cell_index, minlength=len(cells))
+    start = np.concatenate(([0], np.cumsum(count)[:-1]))
+    return {
+        'order': order,
+        'keys': keys,
+        'cells': cells,
+        'start': start,
+        'count': count,
+        'strides': strides
+    }
+
+def _half_shell_offsets(ndim):
+    """Her çift bir kez bulunsun diye komşu ofsetlerinin yarısı (kendi hücresi dahil)."""
+    offsets = [o for o in itertools.product((-1, 0, 1), repeat=ndim) if o > (0,) * ndim]
+    return [(0,) * ndim] + offsets
+
+def neighbor_pairs(positions, radius, cell_size=None):
+    """
+    Aralarındaki mesafe radius değerinden küçük olan tüm (i, j) çiftlerini bulur (i != j, her çift bir kez).
+
+    (i, j, mesafe) dizilerini döner.
+    """
+    positions = np.asarray(positions, dtype=float)
+    n = len(positions)
+    if n < 2:
+        empty = np.zeros(0, dtype=np.intp)
+        return empty, empty, np.zeros(0)
+
+    cell_list = build_cell_list(positions, cell_size or radius)
+    order = cell_list['order']
+    keys = cell_list['keys']
+    cells = cell_list['cells']
+    start = cell_list['start']
+    count = cell_list['count']
+    # Sorgular hücre sırasıyla yapılır; sıralı anahtarlarla searchsorted önbellek dostudur
+    sorted_keys = keys[order]
+
+    pairs_i = []
+    pairs_j = []
+    for offset in _half_shell_offsets(positions.shape[1]):
+        neighbor_keys = sorted_keys + np.dot(offset, cell_list['strides'])
+        slot = np.minimum(np.searchsorted(cells, neighbor_keys), len(cells) - 1)
+        found = cells[slot] == neighbor_keys
+        src = order[found]
+        slot = slot[found]
+
+        # Her kaynak partikülü, komşu hücredeki tüm partiküllerle eşleştir
+        reps = count[slot]
+        total = reps.sum()
+        if total == 0:
+            continue
+        first = np.repeat(start[slot], reps)
+        local = np.arange(total) - np.repeat(np.cumsum(reps) - reps, reps)
+        i = np.repeat(src, reps)
+        j = order[first + local]
+        if not any(offset):
+            keep = i < j
+            i = i[keep]
+            j = j[keep]
+        pairs_i.append(i)
+        pairs_j.append(j)
+
+    if not pairs_i:
+        empty = np.zeros(0, dtype=np.intp)
+        return empty, empty, np.zeros(0)
+    i = np.concatenate(pairs_i)
+    j = np.concatenate(pairs_j)
+    distance = np.sqrt(np.sum((positions[i] - positions[j])**2, axis=1))
+    close = distance < radius
+    return i[close], j[close], distance[close]
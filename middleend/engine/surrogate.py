@@ -0,0 +1,210 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .interpolation import regular_grid_interpolate, axis_spacing
+from .sample_bank import data_dir
+
+# run_full_simulation için hızlı vekil (surrogate) model.
+#
+# Düzenli bir (yükseklik x magma basıncı x rüzgar hızı) ızgarasının her noktasında tam
+# simülasyon replicates kez çalıştırılır; her çıktının ortalaması ve P5/P50/P95 değerleri
+# tek bir float32 dizisinde (.npz) saklanır. Sorgular bu dizide vektörel çok-doğrusal
+# interpolasyondur. Model kurulduktan sonra ızgara dışından rastgele noktalarda yeni
+# simülasyonlarla doğrulanır; doğrulama raporu (çıktı başına mutlak / göreli hata ve P5-P95 bandının
+# kapsama oranı) model dosyasına yazılır, böylece her sorgu bilinen bir hata sınırıyla döner.
+#
+#   python -m engine.surrogate --replicates 32 --workers 4 --output surrogate_model.npz
+#
+# Magma basıncı, run_full_simulation'daki gibi şiddet katsayısına çevrilir:
+# intensity_factor = yükseklik / 3000 + basınç / 20e6. Rüzgar yönü ve Monte Carlo
+# parametreleri (yoğunluk, sıcaklık) replikasyonlar arasında rastgele kalır.
+
+default_model_path = os.path.join(data_dir, 'surrogate_model.npz')
+inputs = ['elevation', 'pressure', 'wind_speed']
+outputs = ['crush_distance', 'safe_zone', 'intensity', 'impact_speed', 'particle_spread.x', 'particle_spread.y',
+           'particle_spread.z', 'atmosphere.drag_factor']
+statistics = ['mean', 'p5', 'p50', 'p95']
+default_axes = {
+    'elevation': np.linspace(0, 6000, 13),  # m
+    'pressure': np.linspace(5e6, 40e6, 8),  # Pa
+    'wind_speed': np.linspace(0, 60, 7)  # m/s
+}
+_models = {}  # (dosya yolu, değiştirilme zamanı) -> yüklenmiş model
+
+# #########################
+# # Kurulum
+# #########################
+def _output_values(result):
+    """Sonuç sözlüğünden outputs sırasıyla skaler çıktılar ('a.b' iç içe anahtar)."""
+    values = []
+    for name in outputs:
+        value = result
+        for key in name.split('.'):
+            value = value[key]
+        values.append(float(value))
+    return values
+
+def simulate_point(elevation, pressure, wind_speed, replicates, seed):
+    """
+    Bir girdi noktasında replicates adet tam simülasyon; (replicates, len(outputs)) dizisi döner.
+
+    run_full_simulation global np.random'ı kullanır; üreteç seed ile başlatılır ve çağıranın
+    RNG durumu dönüşte geri yüklenir.
+    """
+    from .full_simulation import run_full_simulation
+
+    saved_state = np.random.get_state()
+    np.random.seed(seed)
+    try:
+        intensity_factor = elevation / 3000 + pressure / 20e6
+        return np.array([_output_values(run_full_simulation(elevation, 'surrogate', intensity_factor, wind_speed))
+                         for _ in range(replicates)])
+    finally:
+        np.random.set_state(saved_state)
+
+def _simulate_task(task):
+    return simulate_point(*task)
+
+def summarize_samples(samples):
+    """(..., replicates, çıktı) örneklerinden (..., çıktı, istatistik) ortalama ve yüzdelikler."""
+    mean = samples.mean(axis=-2)
+    p5, p50, p95 = np.percentile(samples, [5, 50, 95], axis=-2)
+    return np.stack([mean, p5, p50, p95], axis=-1)
+
+def _map(tasks, workers):
+    """Görevleri (workers > 1 ise process havuzunda) sırasıyla çalıştırır."""
+    if workers > 1 and len(tasks) > 1:
+        from .full_simulation import get_monte_carlo_params
+        get_monte_carlo_params()  # Örnek bankası işçiler başlamadan bir kez üretilir
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            return list(pool.map(_simulate_task, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+    return [_simulate_task(task) for task in tasks]
+
+def build_surrogate(axes=None, replicates=32, seed=0, workers=None):
+    """
+    Izgaradaki her noktada replicates simülasyon çalıştırıp modeli kurar.
+
+    Dönen model sözlüğü: inputs sırasıyla eksenler ve (yükseklik, basınç, rüzgar, çıktı,
+    istatistik) boyutlu float32 'values' dizisi. Her ızgara noktası kendi seed'iyle çalışır.
+    """
+    axes = {name: np.asarray((axes or default_axes)[name], dtype=float) for name in inputs}
+    for name in inputs:
+        axis_spacing(axes[name])  # Eksenler düzenli olmalı
+    grid = np.meshgrid(*axes.values(), indexing='ij')
+    points = np.stack([g.ravel() for g in grid], axis=-1)
+    tasks = [(*point, replicates, seed + i) for i, point in enumerate(points)]
+
+    workers = os.cpu_count() if workers is None else workers
+    samples = np.stack(_map(tasks, workers))
+    values = summarize_samples(samples).reshape(grid[0].shape + (len(outputs), len(statistics)))
+    return {**axes, 'values': values.astype(np.float32), 'replicates': replicates, 'seed': seed, 'validation': None}
+
+def validate_surrogate(model, n_points=50, replicates=32, seed=1, workers=None):
+    """
+    Modeli ızgara aralığındaki rastgele noktalarda yeni simülasyonlarla karşılaştırır.
+
+    Çıktı başına: ortalamanın mutlak hatası (çıktının biriminde, en büyük değer sorgular
+    için hata sınırıdır), göreli hatası (sıfıra yakın ortalamalarda ızgaradaki en büyük
+    ortalamanın %1'ine bölünür) ve yeni örneklerin modelin P5-P95 bandına düşme oranı
+    (ideali ~0.90; replikasyonlar arasında değişmeyen çıktılar için None).
+    """
+    rng = np.random.default_rng(seed)
+    points = np.column_stack([rng.uniform(model[name][0], model[name][-1], n_points) for name in inputs])
+    tasks = [(*point, replicates, seed * 100003 + i) for i, point in enumerate(points)]
+    workers = os.cpu_count() if workers is None else workers
+    samples = np.stack(_map(tasks, workers))  # (nokta, replikasyon, çıktı)
+
+    predicted = predict_array(model, *points.T)  # (nokta, çıktı, istatistik)
+    fresh_mean = samples.mean(axis=1)
+    absolute_error = np.abs(predicted[..., 0] - fresh_mean)
+    grid_scale = np.abs(model['values'][..., 0]).reshape(-1, len(outputs)).max(axis=0)
+    relative_error = absolute_error / np.maximum(np.abs(fresh_mean), np.maximum(0.01 * grid_scale, 1e-12))
+    tolerance = 1e-5 * grid_scale  # float32 saklama yuvarlaması
+    inside = ((samples >= predicted[:, None, :, 1] - tolerance) & (samples <= predicted[:, None, :, 3] + tolerance))
+    stochastic = samples.std(axis=1).max(axis=0) > tolerance
+
+    report = {'n_points': n_points, 'replicates': replicates, 'seed': seed, 'outputs': {}}
+    for k, name in enumerate(outputs):
+        report['outputs'][name] = {
+            'max_abs_error': float(absolute_error[:, k].max()),
+            'mean_relative_error': float(relative_error[:, k].mean()),
+            'max_relative_error': float(relative_error[:, k].max()),
+            'p5_p95_coverage': float(inside[:, :, k].mean()) if stochastic[k] else None
+        }
+    return report
+
+# #########################
+# # Kaydetme / yükleme
+# #########################
+def save_surrogate(path, model):
+    """Modeli sıkıştırmasız .npz olarak kaydeder (doğrulama raporu JSON metni olarak)."""
+    np.savez(path, **{name: model[name] for name in inputs}, values=model['values'],
+             outputs=np.array(outputs), statistics=np.array(statistics),
+             replicates=model['replicates'], seed=model['seed'], validation=json.dumps(model['validation']))
+    return path
+
+def load_surrogate(path=default_model_path):
+    """Modeli yükler; dosya değişmedikçe tekrar okunmaz. Dosya yoksa FileNotFoundError."""
+    key = (path, os.stat(path).st_mtime_ns)
+    if key not in _models:
+        with np.load(path) as data:
+            if list(data['outputs']) != outputs or list(data['statistics']) != statistics:
+                raise ValueError(f"{path} farklı çıktılarla kurulmuş, modeli yeniden kurun.")
+            model = {name: data[name] for name in inputs}
+            model.update(values=data['values'], replicates=int(data['replicates']), seed=int(data['seed']),
+                         validation=json.loads(str(data['validation'])))
+        model['grid'] = [axis_spacing(model[name]) for name in inputs]
+        for stale in [cached for cached in _models if cached[0] == path]:
+            del _models[stale]  # Aynı dosyanın eski sürümü
+        _models[key] = model
+    return _models[key]
+
+# #########################
+# # Sorgu
+# #########################
+def predict_array(model, elevation, pressure, wind_speed):
+    """(..., çıktı, istatistik) dizisi; ızgara dışındaki girdiler kenar değerine kırpılır."""
+    grid = model.get('grid') or [axis_spacing(model[name]) for name in inputs]
+    origin, spacing = zip(*grid)
+    coords = (elevation, pressure, wind_speed)
+    values = model['values']
+    if all(np.ndim(c) == 0 for c in coords) and min(values.shape[:3]) > 1:
+        # Tek nokta: 2x2x2 hücre tek dilimle okunur, ağırlıklar tek einsum ile uygulanır
+        weights = []
+        cell = []
+        for axis, c in enumerate(coords):
+            f = min(max((float(c) - origin[axis]) / spacing[axis], 0.0), values.shape[axis] - 1)
+            i = min(int(f), values.shape[axis] - 2)
+            cell.append(slice(i, i + 2))
+            weights.append(np.array([1 - (f - i), f - i]))
+        return np.einsum('i,j,k,ijkos->os', *weights, values[tuple(cell)])
+    return regular_grid_interpolate(values, origin, spacing, coords)
+
+def predict(model, elevation, pressure, wind_speed):
+    """{çıktı: {istatistik: değer}} sözlüğü (dizi girdilerde değerler dizidir)."""
+    values = predict_array(model, elevation, pressure, wind_speed)
+    return {name: {stat: values[..., k, s] for s, stat in enumerate(statistics)} for k, name in enumerate(outputs)}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="run_full_simulation vekil modelini kurar ve doğrular")
+    parser.add_argument("--replicates", type=int, default=32, help="Izgara noktası başına simülasyon sayısı")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--validate", type=int, default=50, metavar="N", help="Doğrulama noktası sayısı (0: atla)")
+    parser.add_argument("--output", default=default_model_path, help="Model dosyası (.npz)")
+    args = parser.parse_args()
+
+    model = build_surrogate(replicates=args.replicates, seed=args.seed, workers=args.workers)
+    if args.validate:
+        model['validation'] = validate_surrogate(model, args.validate, args.replicates, args.seed + 1, args.workers)
+        print(f"{'Çıktı':<26}{'en büyük mutlak hata':>22}{'ort. göreli hata':>18}{'en büyük':>10}"
+              f"{'P5-P95 kapsama':>16}")
+        for name, row in model['validation']['outputs'].items():
+            coverage = '-' if row['p5_p95_coverage'] is None else f"{row['p5_p95_coverage']:.2f}"
+            print(f"{name:<26}{row['max_abs_error']:>22.4g}{row['mean_relative_error']:>18.2%}"
+                  f"{row['max_relative_error']:>10.2%}{coverage:>16}")
+    print(f"Model kaydedildi: {save_surrogate(args.output, model)}")
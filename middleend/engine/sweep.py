@@ -0,0 +1,226 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .sample_bank import data_dir
+
+# Senaryo taraması (parametre ızgarası) ve içerik adresli sonuç önbelleği.
+#
+# Izgaradaki her senaryo (ör. yükseklik x şiddet x rüzgar x vent yarıçapı) bir modelle
+# çalıştırılır. Sonuç, girdilerin (model, parametreler, seed) ve modelin kullandığı
+# engine modüllerinin kaynak kodunun özetiyle (SHA-256) anahtarlanan bir JSON dosyasına
+# yazılır. Örtüşen bir tarama tekrar çalıştırıldığında sadece yeni noktalar hesaplanır;
+# kod değişirse anahtar da değiştiği için eski sonuçlar kullanılmaz. Eksik senaryolar
+# process havuzuna dağıtılır.
+#
+#   python -m engine.sweep --model full_simulation --set elevation=1000,2000,3000 \
+#       --set intensity_factor=1,1.5,2 --set wind_speed=10,30 --workers 4 --output sweep.parquet
+
+default_cache_dir = os.path.join(data_dir, 'sweep_cache')
+
+# #########################
+# # Modeller: (parametreler, seed) -> skaler sonuç sözlüğü
+# #########################
+def _scalars(result, prefix=''):
+    """İç içe sonuç sözlüğünün skaler değerlerini 'a.b' anahtarlarıyla düzleştirir (listeler atlanır)."""
+    flat = {}
+    for key, value in result.items():
+        if isinstance(value, dict):
+            flat.update(_scalars(value, f"{prefix}{key}."))
+        elif isinstance(value, str):
+            flat[prefix + key] = value
+        elif np.ndim(value) == 0:
+            flat[prefix + key] = value.item() if isinstance(value, np.generic) else value
+    return flat
+
+def full_simulation_scenario(params, seed):
+    """API'nin tam simülasyonu; intensity_factor ve wind_* verilirse şiddet katsayısı ve rüzgar sabitlenir."""
+    from .full_simulation import run_full_simulation
+
+    np.random.seed(seed)
+    result = run_full_simulation(params['elevation'], 'sweep', params['intensity_factor'], params['wind_speed'],
+                                 params['wind_angle'])
+    return _scalars(result)
+
+def heat_field_scenario(params, seed):
+    """2_SONmagmalos sıcaklık alanının özeti: tepe ve ortalama değer, eşiği aşan alan oranı."""
+    from .heat_field import temperature_field
+
+    _, _, z, _ = temperature_field(params['intensity'], params['size'], params['spread'], params['time'],
+                                   params['vent_radius'], params['vent_height'], params['max_height'],
+                                   params['resolution'])
+    return {
+        'peak_temperature': float(z.max()),
+        'mean_temperature': float(z.mean()),
+        'hot_fraction': float(np.mean(z > params['threshold']))
+    }
+
+def trials_scenario(params, seed):
+    """Deneme motoru: en uzağa giden kayacın mesafe dağılımı (doğrusal sürüklenme, tau > 0 ise)."""
+    from .trial_engine import run_trials, summarize
+
+    tau = params['tau'] if params['tau'] > 0 else None
+    trials = run_trials(int(params['n_trials']), int(params['n_bodies']), params['w0'], seed=seed,
+                        vent_height=params['vent_height'], tau=tau)
+    return {f"max_distance.{key}": float(value) for key, value in summarize(trials['max_distance']).items()}
+
+# Model adı -> çalıştırıcı, varsayılan parametreler ve sonucu etkileyen engine modülleri
+models = {
+    'full_simulation': {
+        'run': full_simulation_scenario,
+        'defaults': {'elevation': 1421, 'intensity_factor': None, 'wind_speed': None, 'wind_angle': None},
+        'modules': ('full_simulation', 'atmosphere', 'ballistics', 'interpolation', 'sample_bank')
+    },
+    'heat_field': {
+        'run': heat_field_scenario,
+        'defaults': {'intensity': 50, 'size': 100, 'spread': 50, 'time': 0, 'vent_radius': 350,
+                     'vent_height': 1700, 'max_height': 2000, 'resolution': 800, 'threshold': 1.0},
+        'modules': ('heat_field',)
+    },
+    'trials': {
+        'run': trials_scenario,
+        'defaults': {'w0': 200.0, 'vent_height': 1421, 'tau': 0.0, 'n_trials': 10000, 'n_bodies': 20},
+        'modules': ('trial_engine', 'ballistics', 'interpolation')
+    }
+}
+
+# #########################
+# # Önbellek
+# #########################
+def code_version(model):
+    """Modelin kullandığı engine modüllerinin (ve bu dosyanın) kaynak kodunun SHA-256 özeti."""
+    digest = hashlib.sha256()
+    engine_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in sorted(models[model]['modules']) + ['sweep']:
+        with open(os.path.join(engine_dir, name + '.py'), 'rb') as f:
+            digest.update(name.encode() + b'\0' + f.read())
+    return digest.hexdigest()
+
+def scenario_key(model, params, seed, code):
+    """Senaryonun içerik adresi: model, parametreler, seed ve kod sürümünün SHA-256 özeti."""
+    payload = json.dumps({'model': model, 'params': params, 'seed': seed, 'code': code}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def cache_path(cache_dir, key):
+    return os.path.join(cache_dir, key[:2], key + '.json')
+
+def load_cached(cache_dir, key):
+    """Önbellekteki sonuç (yoksa None)."""
+    try:
+        with open(cache_path(cache_dir, key)) as f:
+            return json.load(f)['result']
+    except (OSError, ValueError, KeyError):
+        return None
+
+def store_result(cache_dir, key, record):
+    """Sonucu önbelleğe yazar (önce geçici dosyaya, sonra yerine taşınır)."""
+    path = cache_path(cache_dir, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(record, f)
+    os.replace(path + '.tmp', path)
+
+# #########################
+# # Tarama
+# #########################
+def scenario_grid(grid):
+    """{parametre: değer listesi} ızgarasının tüm kombinasyonları (liste olmayan değerler sabittir)."""
+    axes = {name: values if isinstance(values, list) else [values] for name, values in grid.items()}
+    return [dict(zip(axes, combination)) for combination in itertools.product(*axes.values())]
+
+def _run_scenario(task):
+    model, params, seed = task
+    return models[model]['run'](params, seed)
+
+def run_sweep(model, grid, seed=0, cache_dir=default_cache_dir, workers=None):
+    """
+    Izgaradaki senaryoları çalıştırır; önbellekte olanları tekrar hesaplamaz.
+
+    Her senaryo aynı seed ile çalışır (ortak rastgele sayılar), böylece ızgara noktaları
+    arasındaki farklar sadece parametrelerden gelir. (satırlar, {'total', 'cached',
+    'computed'}) döner; her satır parametreleri, sonucu ve 'cache_key' sütununu içerir.
+    """
+    unknown = set(grid) - set(models[model]['defaults'])
+    if unknown:
+        raise ValueError(f"{model} modeli bu parametreleri tanımıyor: {sorted(unknown)}")
+    if model == 'full_simulation':  # Örnek bankası işçiler başlamadan bir kez üretilir
+        from .full_simulation import get_monte_carlo_params
+        get_monte_carlo_params()
+
+    code = code_version(model)
+    scenarios = [{**models[model]['defaults'], **point} for point in scenario_grid(grid)]
+    keys = [scenario_key(model, params, seed, code) for params in scenarios]
+    results = [load_cached(cache_dir, key) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+
+    tasks = [(model, scenarios[i], seed) for i in missing]
+    workers = os.cpu_count() if workers is None else workers
+    if workers > 1 and len(tasks) > 1:
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(tasks)))
+        computed = pool.map(_run_scenario, tasks, chunksize=max(1, len(tasks) // (4 * workers)))
+    else:
+        pool = None
+        computed = map(_run_scenario, tasks)
+    try:
+        for i, result in zip(missing, computed):  # Her sonuç geldikçe yazılır; yarıda kalan tarama kaldığı yerden devam eder
+            store_result(cache_dir, keys[i], {'model': model, 'params': scenarios[i], 'seed': seed,
+                                              'code': code, 'result': result})
+            results[i] = result
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    rows = [{**params, **result, 'cache_key': key} for params, result, key in zip(scenarios, results, keys)]
+    return rows, {'total': len(scenarios), 'cached': len(scenarios) - len(missing), 'computed': len(missing)}
+
+def parse_values(text):
+    """'1,2.5,3' -> [1, 2.5, 3] (JSON değerleri; sayı olmayanlar metin olarak kalır)."""
+    values = []
+    for item in text.split(','):
+        try:
+            values.append(json.loads(item))
+        except ValueError:
+            values.append(item)
+    return values
+
+def write_rows(path, rows):
+    """Tarama satırlarını sütunlu dosyaya (Parquet / Feather / CSV) yazar."""
+    from .result_export import ResultWriter
+
+    names = list(dict.fromkeys(name for row in rows for name in row))
+    with ResultWriter(path) as writer:
+        writer.write({name: [row.get(name) for row in rows] for name in names})
+    return writer.path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parametre ızgarası taraması (önbellekli)")
+    parser.add_argument("--model", choices=list(models), default='full_simulation')
+    parser.add_argument("--grid", help="JSON ızgara dosyası: {\"model\": ..., \"seed\": ..., \"grid\": {isim: [değerler]}}")
+    parser.add_argument("--set", action="append", default=[], metavar="İSİM=D1,D2,...",
+                        help="Izgara ekseni (birden çok kez verilebilir, --grid'dekini geçersiz kılar)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache", default=default_cache_dir, help="Önbellek klasörü")
+    parser.add_argument("--output", help="Sonuç dosyası (.parquet, .feather, .csv)")
+    args = parser.parse_args()
+
+    spec = {}
+    if args.grid:
+        with open(args.grid) as f:
+            spec = json.load(f)
+    model = spec.get('model', args.model) if args.model == parser.get_default('model') else args.model
+    grid = dict(spec.get('grid', {}))
+    for item in args.set:
+        name, _, values = item.partition('=')
+        grid[name] = parse_values(values)
+    seed = args.seed if args.seed is not None else spec.get('seed', 0)
+
+    rows, counts = run_sweep(model, grid, seed, args.cache, args.workers)
+    print(f"{counts['total']} senaryo: {counts['cached']} önbellekten, {counts['computed']} yeni hesaplandı.")
+    if args.output:
+        print(f"Sonuçlar kaydedildi: {write_rows(args.output, rows)}")
@@ -0,0 +1,164 @@
+import csv
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from .heightmap import heightmap_from_array
+from .sample_bank import data_dir
+
+# Sayısal yükseklik modeli (DEM) döşemelerinden gerçek arazi.
+#
+# Döşemeler bir klasörde SRTM adlandırmasıyla durur: güneybatı köşesinin enlem / boylamı,
+# ör. N37E014.hgt ya da S02E147.npy (tile_degrees derecelik kare). Satırlar kuzeyden güneye,
+# sütunlar batıdan doğuya gider ve kenar satır / sütunlar komşu döşemeyle ortaktır (SRTM
+# 1201 / 3601 düzeni). .npy ve .hgt (ham big-endian int16) döşemeleri memmap olarak açılır,
+# sadece örneklenen hücreler diskten okunur; GeoTIFF döşemeleri (tifffile ya da rasterio
+# kuruluysa) okunup belleğe açılır. Açık döşemeler küçük bir LRU önbellekte tutulur.
+#
+# Örnekleme vektöreldir (bilinear yükseklik ve eğim). volcano_heightmap, bir yanardağın
+# çevresini heightmap.py'nin yerel (doğu, kuzey) metre ızgarasına çevirir; böylece
+# partikül çarpışmaları ve çizimler analitik koni yerine gerçek topoğrafyada yapılır.
+
+meters_per_degree = 111320.0  # Enlem derecesi başına metre (boylamda cos(enlem) ile çarpılır)
+void_threshold = -1000  # Bu değerin altındaki yükseklikler boşluk (SRTM: -32768) sayılır
+tile_extensions = ('.npy', '.hgt', '.tif', '.tiff')
+default_catalog_path = os.path.normpath(os.path.join(data_dir, '..', 'backend', 'processed_volcanoes.csv'))
+
+def tile_name(lat_index, lon_index, tile_degrees=1):
+    """Güneybatı köşesi (lat_index, lon_index) * tile_degrees olan döşemenin adı (uzantısız)."""
+    lat = lat_index * tile_degrees
+    lon = lon_index * tile_degrees
+    return f"{'N' if lat >= 0 else 'S'}{abs(lat):02d}{'E' if lon >= 0 else 'W'}{abs(lon):03d}"
+
+def read_tile(path):
+    """Döşemeyi (satır: kuzey -> güney, sütun: batı -> doğu) dizi olarak açar."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.npy':
+        return np.load(path, mmap_mode='r')
+    if extension == '.hgt':
+        size = int(round(np.sqrt(os.path.getsize(path) // 2)))
+        return np.memmap(path, dtype='>i2', mode='r', shape=(size, size))
+    try:
+        import tifffile
+        return tifffile.imread(path)
+    except ImportError:
+        pass
+    try:
+        import rasterio
+    except ImportError:
+        raise ImportError(f"{path} okunamadı: GeoTIFF için tifffile ya da rasterio gerekli.")
+    with rasterio.open(path) as dataset:
+        return dataset.read(1)
+
+class TerrainSource:
+    """
+    Bir klasördeki DEM döşemelerinden enlem / boylama göre yükseklik okuyan kaynak.
+
+    Eksik döşemeler (ör. SRTM'de deniz) ve boşluklar missing_value alır. cache_size kadar
+    açık döşeme tutulur; en uzun süre kullanılmayan önce kapatılır.
+    """
+
+    def __init__(self, directory, tile_degrees=1, cache_size=8, missing_value=0.0):
+        self.directory = directory
+        self.tile_degrees = tile_degrees
+        self.cache_size = cache_size
+        self.missing_value = float(missing_value)
+        self._tiles = OrderedDict()
+
+    def tile_path(self, lat_index, lon_index):
+        """Döşemenin dosya yolu (yoksa None)."""
+        name = tile_name(lat_index, lon_index, self.tile_degrees)
+        for extension in tile_extensions:
+            path = os.path.join(self.directory, name + extension)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def tile(self, lat_index, lon_index):
+        """Döşeme dizisi (LRU önbellekten; dosya yoksa None)."""
+        key = (lat_index, lon_index)
+        if key in self._tiles:
+            self._tiles.move_to_end(key)
+            return self._tiles[key]
+        path = self.tile_path(lat_index, lon_index)
+        tile = None if path is None else read_tile(path)
+        self._tiles[key] = tile
+        if len(self._tiles) > self.cache_size:
+            self._tiles.popitem(last=False)
+        return tile
+
+    def sample(self, latitude, longitude, gradient=False):
+        """
+        (enlem, boylam) noktalarında bilinear yükseklik (m).
+
+        gradient=True ise (yükseklik, dz/dx, dz/dy) döner; eğimler doğu ve kuzey yönünde
+        metre başına metredir.
+        """
+        lat, lon = np.broadcast_arrays(np.asarray(latitude, dtype=float), np.asarray(longitude, dtype=float))
+        height = np.full(lat.shape, self.missing_value)
+        dzdx = np.zeros(lat.shape)
+        dzdy = np.zeros(lat.shape)
+        td = self.tile_degrees
+        keys = np.stack([np.floor(lat / td), np.floor(lon / td)], axis=-1).reshape(-1, 2).astype(np.int64)
+        tiles, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.reshape(lat.shape)
+
+        for k, (i, j) in enumerate(tiles):
+            z = self.tile(int(i), int(j))
+            if z is None:
+                continue
+            mask = inverse == k
+            rows, cols = z.shape
+            fy = np.clip(((i + 1) * td - lat[mask]) / td * (rows - 1), 0, rows - 1)  # Satır 0 kuzey kenarı
+            fx = np.clip((lon[mask] - j * td) / td * (cols - 1), 0, cols - 1)
+            iy = np.minimum(fy.astype(np.intp), rows - 2)
+            ix = np.minimum(fx.astype(np.intp), cols - 2)
+            ty = fy - iy
+            tx = fx - ix
+
+            corners = [np.asarray(z[iy + a, ix + b], dtype=float) for a in (0, 1) for b in (0, 1)]
+            z00, z01, z10, z11 = [np.where(c < void_threshold, self.missing_value, c) for c in corners]
+            north = z00 + (z01 - z00) * tx
+            south = z10 + (z11 - z10) * tx
+            height[mask] = north + (south - north) * ty
+            if gradient:
+                cell_y = td / (rows - 1) * meters_per_degree
+                cell_x = td / (cols - 1) * meters_per_degree * np.cos(np.radians(lat[mask]))
+                dzdx[mask] = ((z01 - z00) * (1 - ty) + (z11 - z10) * ty) / cell_x
+                dzdy[mask] = (north - south) / cell_y  # Kuzeye doğru artış
+        if gradient:
+            return height, dzdx, dzdy
+        return height
+
+    def elevation(self, latitude, longitude):
+        """(enlem, boylam) noktalarında yükseklik (m)."""
+        return self.sample(latitude, longitude)
+
+    def slope(self, latitude, longitude):
+        """(enlem, boylam) noktalarında eğim açısı (derece)."""
+        _, dzdx, dzdy = self.sample(latitude, longitude, gradient=True)
+        return np.degrees(np.arctan(np.hypot(dzdx, dzdy)))
+
+def volcano_heightmap(source, latitude, longitude, extent, resolution=512, relative_to=0.0):
+    """
+    (enlem, boylam) merkezli [-extent, extent]² metrelik yerel ızgarada yükseklik haritası.
+
+    x doğuya, y kuzeye metre (yerel eşdikdörtgen izdüşüm); yükseklikler relative_to
+    çıkarılarak verilir. Dönen sözlük heightmap.py fonksiyonlarıyla kullanılır.
+    """
+    x = np.linspace(-extent, extent, resolution)
+    y = np.linspace(-extent, extent, resolution)
+    X, Y = np.meshgrid(x, y, indexing='ij')
+    lat = latitude + Y / meters_per_degree
+    lon = longitude + X / (meters_per_degree * np.cos(np.radians(latitude)))
+    z = source.elevation(lat, lon) - relative_to
+    return heightmap_from_array(z, x[0], y[0], x[1] - x[0], y[1] - y[0])
+
+def catalog_site(name, path=default_catalog_path):
+    """Katalogdaki yanardağın (enlem, boylam, yükseklik (m)); bulunamazsa KeyError."""
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if row['Volcano Name'].strip().lower() == name.strip().lower():
+                return float(row['Latitude']), float(row['Longitude']), float(row['Elevation (m)'])
+    raise KeyError(f"Katalogda bulunamadı: {name}")
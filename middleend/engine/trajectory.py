@@ -0,0 +1,178 @@
+import json
+import os
+
+import numpy as np
+
+# Partikül yörüngelerinin bellek eşlemeli (memmap) dosyaya kaydı ve geri okunması.
+#
+# Kayıt dosyası (kare, partikül, boyut) biçiminde önceden ayrılmış bir float32 .npy
+# dizisidir; simülasyon ilerledikçe her stride adımda bir kare doğrudan dosyaya yazılır,
+# yani RAM'e sığmayan koşular da kaydedilebilir. Yanındaki .json dosyası grupları
+# (ör. 'particles', 'rocks'), kaydedilen partikül indekslerini, adım aralığını ve kaç
+# karenin yazıldığını tutar. Okuyucu istenen zaman aralığını ya da partikül alt kümesini
+# dosyanın tamamını yüklemeden dilimler.
+#
+# Partikül havuzlarında (particle_pool.py) satırlar havuz yuvalarıdır; canlı olmayan
+# yuvalar maske ile NaN yazılır.
+
+sidecar_version = 1
+
+def sidecar_path(path):
+    return path + '.json'
+
+def _write_sidecar(path, meta):
+    """Yan dosyayı önce geçici dosyaya yazıp yerine taşır."""
+    tmp_path = sidecar_path(path) + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, sidecar_path(path))
+
+def _read_sidecar(path):
+    with open(sidecar_path(path)) as f:
+        return json.load(f)
+
+class TrajectoryRecorder:
+    """
+    Adım adım partikül konumlarını memmap .npy dosyasına yazan kaydedici.
+
+    groups: {'particles': 100, 'rocks': 20} (grup başına partikül sayısı). subset: grup adı
+    -> kaydedilecek indeksler ya da slice (verilmeyen gruplar tümüyle kaydedilir).
+    n_steps adımlık bir koşuda her stride adımda bir kare yazılır (adım 0, stride, 2 stride, ...).
+    resume=True ise aynı düzenle kurulmuş mevcut kayda kaldığı yerden devam edilir.
+
+    recorder = TrajectoryRecorder('run.npy', {'particles': 100}, 30000, dims=2, stride=10, dt=0.05)
+    recorder.record(step, particles=positions)
+    recorder.close()
+    """
+
+    def __init__(self, path, groups, n_steps, dims=3, stride=1, subset=None, dt=1.0, resume=False, flush_every=50):
+        subset = subset or {}
+        self.path = path
+        self.stride = int(stride)
+        self.flush_every = flush_every
+        self.indices = {name: np.arange(count)[subset.get(name, slice(None))] for name, count in groups.items()}
+        self.offsets = {}
+        offset = 0
+        for name, indices in self.indices.items():
+            self.offsets[name] = offset
+            offset += len(indices)
+        n_frames = len(range(0, int(n_steps), self.stride))
+
+        self.meta = {
+            'version': sidecar_version,
+            'shape': [n_frames, offset, int(dims)],
+            'stride': self.stride,
+            'dt': float(dt),
+            'groups': {name: {'offset': self.offsets[name], 'count': len(indices), 'indices': indices.tolist()}
+                       for name, indices in self.indices.items()},
+            'frames_recorded': 0
+        }
+        if resume and os.path.exists(path) and os.path.exists(sidecar_path(path)):
+            existing = _read_sidecar(path)
+            if {k: v for k, v in existing.items() if k != 'frames_recorded'} != \
+                    {k: v for k, v in self.meta.items() if k != 'frames_recorded'}:
+                raise ValueError(f"{path} farklı bir düzenle kaydedilmiş, devam edilemez.")
+            self.meta['frames_recorded'] = existing['frames_recorded']
+            self.data = np.load(path, mmap_mode='r+')
+        else:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self.data = np.lib.format.open_memmap(path, mode='w+', dtype=np.float32, shape=tuple(self.meta['shape']))
+            _write_sidecar(path, self.meta)
+        self._unflushed = 0
+
+    def record(self, step, masks=None, **positions):
+        """
+        step adımındaki konumları yazar (step stride'ın katı değilse ya da kayıt doluysa yazmaz).
+
+        positions: grup adı -> (n, dims) konumlar; masks: grup adı -> canlılık maskesi (False
+        olan satırlar NaN yazılır). Grup kurulduğundan büyükse fazla satırlar kaydedilmez.
+        Kare yazıldıysa True döner.
+        """
+        frame, remainder = divmod(int(step), self.stride)
+        if remainder or not 0 <= frame < len(self.data):
+            return False
+        masks = masks or {}
+        for name, values in positions.items():
+            indices = self.indices[name]
+            rows = np.asarray(values, dtype=np.float32)[indices]
+            if name in masks:
+                rows = np.where(np.asarray(masks[name])[indices, None], rows, np.nan)
+            offset = self.offsets[name]
+            self.data[frame, offset:offset + len(indices)] = rows
+        self.meta['frames_recorded'] = max(self.meta['frames_recorded'], frame + 1)
+        self._unflushed += 1
+        if self.flush_every and self._unflushed >= self.flush_every:
+            self.flush()
+        return True
+
+    def flush(self):
+        """Yazılan kareleri diske, kare sayısını yan dosyaya işler."""
+        self.data.flush()
+        _write_sidecar(self.path, self.meta)
+        self._unflushed = 0
+
+    def close(self):
+        if self.data is not None:
+            self.flush()
+            self.data = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class TrajectoryReader:
+    """
+    TrajectoryRecorder kaydını salt okunur memmap olarak açar.
+
+    reader = TrajectoryReader('run.npy')
+    start, stop = reader.frame_range(10.0, 20.0)
+    rocks = reader.read('rocks', start, stop, particles=[0, 5])   # (kare, 2, dims)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.meta = _read_sidecar(path)
+        self.data = np.load(path, mmap_mode='r')
+        self.stride = self.meta['stride']
+        self.dt = self.meta['dt']
+        self.groups = {name: group['count'] for name, group in self.meta['groups'].items()}
+
+    def __len__(self):
+        """Yazılmış kare sayısı."""
+        return self.meta['frames_recorded']
+
+    def times(self, start=None, stop=None, step=None):
+        """Karelerin simülasyon zamanları (s)."""
+        return np.arange(len(self))[start:stop:step] * self.stride * self.dt
+
+    def frame_range(self, t_start, t_end):
+        """[t_start, t_end] zaman aralığını kapsayan (start, stop) kare dilimi."""
+        frame_time = self.stride * self.dt
+        start = int(np.clip(np.ceil(t_start / frame_time - 1e-9), 0, len(self)))
+        stop = int(np.clip(np.floor(t_end / frame_time + 1e-9) + 1, start, len(self)))
+        return start, stop
+
+    def particle_indices(self, group):
+        """Grubun kaydedilen satırlarının simülasyondaki partikül indeksleri."""
+        return np.array(self.meta['groups'][group]['indices'], dtype=np.intp)
+
+    def read(self, group=None, start=None, stop=None, step=None, particles=None):
+        """
+        (kare, partikül, boyut) konumlar; sadece istenen dilim diskten okunur.
+
+        group verilmezse tüm gruplar (kayıt sırasıyla) döner. particles: grup içindeki
+        kayıt satırları (particle_indices sırasıyla).
+        """
+        frames = slice(*slice(start, stop, step).indices(len(self)))
+        if group is None:
+            columns = slice(None)
+        else:
+            offset, count = self.meta['groups'][group]['offset'], self.meta['groups'][group]['count']
+            columns = slice(offset, offset + count)
+        block = self.data[frames, columns]
+        if particles is not None:
+            block = block[:, np.asarray(particles, dtype=np.intp)]
+        return np.array(block)
@@ -0,0 +1,111 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .ballistics import launch_angles, vacuum_trajectory, linear_drag_trajectory, quadratic_drag_trajectory
+
+# Çok denemeli (Monte Carlo) balistik motoru.
+#
+# N denemenin her biri n_bodies cismin fırlatılmasıdır; tüm denemeler (deneme x cisim)
+# dizileri üzerinde tek seferde hesaplanır. Denemeler bellek bütçesine göre parçalara
+# bölünür, her parça kendi bağımsız rastgele akışıyla (SeedSequence) üretildiği için
+# aynı parça planında sonuçlar işçi (process) sayısından bağımsızdır.
+
+# Bir deneme-cisim hücresi için yaklaşık bellek (hız bileşenleri, açılar, yörünge sonuçları, ara diziler)
+_BYTES_PER_BODY = 24 * 8
+
+def trial_chunks(n_trials, n_bodies, memory_budget=64 * 2**20):
+    """Denemeleri memory_budget (bayt) bütçesine sığan [başlangıç, bitiş) parçalarına böler."""
+    per_chunk = max(1, int(memory_budget // (n_bodies * _BYTES_PER_BODY)))
+    starts = np.arange(0, n_trials, per_chunk)
+    return [(int(s), int(min(s + per_chunk, n_trials))) for s in starts]
+
+def launch_velocities(rng, n_trials, n_bodies, w0):
+    """
+    Ventten rastgele yön (azimut 0-2π, yükseliş 0-90°) ve hızla (w0/2 - w0) fırlatılan
+    cisimlerin (n_trials, n_bodies) hız bileşenleri. w0 skaler ya da deneme başına dizi olabilir.
+    """
+    w0 = np.asarray(w0, dtype=float).reshape(-1, 1) if np.ndim(w0) else float(w0)
+    theta = rng.uniform(0, 2 * np.pi, (n_trials, n_bodies))
+    phi = rng.uniform(0, np.pi / 2, (n_trials, n_bodies))
+    speed = rng.uniform(0.5, 1.0, (n_trials, n_bodies)) * w0
+    horizontal = speed * np.cos(phi)
+    return horizontal * np.cos(theta), horizontal * np.sin(theta), speed * np.sin(phi)
+
+def evaluate_trials(vx, vy, vz, g=9.81, vent_height=0.0, tau=None, k=None):
+    """
+    (deneme x cisim) hızlarından her denemenin en uzağa giden cismini bulur.
+
+    Yörüngeler ballistics modülüyle kapalı formda çözülür: tau verilirse doğrusal, k verilirse
+    karesel sürüklenme, ikisi de yoksa vakum. Dönen sözlükteki diziler deneme başınadır:
+    'max_distance', 'max_id', 'impact_speed' (en uzağa gidenin çarpma hızı),
+    'landing_x', 'landing_y' ve 'flight_time'.
+    """
+    speed, elevation, azimuth = launch_angles(vx, vy, vz)
+    if tau is not None:
+        trajectory = linear_drag_trajectory(speed, elevation, azimuth, vent_height, tau, g)
+    elif k is not None:
+        trajectory = quadratic_drag_trajectory(speed, elevation, azimuth, vent_height, k, g)
+    else:
+        trajectory = vacuum_trajectory(speed, elevation, azimuth, vent_height, g)
+    ranges = trajectory['range']
+    max_id = np.argmax(ranges, axis=1)
+    rows = np.arange(len(max_id))
+    return {
+        'max_distance': ranges[rows, max_id],
+        'max_id': max_id,
+        'impact_speed': trajectory['impact_speed'][rows, max_id],
+        'landing_x': trajectory['x'][rows, max_id],
+        'landing_y': trajectory['y'][rows, max_id],
+        'flight_time': trajectory['flight_time'][rows, max_id]
+    }
+
+def _run_chunk(args):
+    seed, n_trials, n_bodies, w0, g, trajectory_options = args
+    rng = np.random.default_rng(seed)
+    vx, vy, vz = launch_velocities(rng, n_trials, n_bodies, w0)
+    return evaluate_trials(vx, vy, vz, g, **trajectory_options)
+
+def iter_trials(n_trials, n_bodies, w0, g=9.81, seed=None, memory_budget=64 * 2**20, workers=1,
+                vent_height=0.0, tau=None, k=None, chunks=None):
+    """
+    Denemeleri parça parça hesaplar; her parça için (başlangıç, bitiş, sonuç sözlüğü) üretir.
+
+    Parçalar sırayla gelir ve sadece o anki parça bellekte tutulur (sonuçlar diske akıtılabilir).
+    w0: çıkış hızı, skaler ya da deneme başına (n_trials,) dizi.
+    seed: aynı seed ve parça planıyla sonuçlar işçi sayısından bağımsız olarak tekrarlanır.
+    workers: >1 ise parçalar ayrı process'lerde hesaplanır (None: tüm çekirdekler).
+    vent_height, tau, k: yörünge modeli (bkz. evaluate_trials).
+    chunks: [(başlangıç, bitiş), ...] parça planı; verilmezse memory_budget'tan hesaplanır.
+    """
+    chunks = trial_chunks(n_trials, n_bodies, memory_budget) if chunks is None else chunks
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    per_trial_w0 = np.ndim(w0) > 0
+    trajectory_options = {'vent_height': vent_height, 'tau': tau, 'k': k}
+    tasks = [(s, stop - start, n_bodies, w0[start:stop] if per_trial_w0 else w0, g, trajectory_options)
+             for s, (start, stop) in zip(seeds, chunks)]
+
+    workers = os.cpu_count() if workers is None else workers
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            for (start, stop), part in zip(chunks, pool.map(_run_chunk, tasks)):
+                yield start, stop, part
+    else:
+        for (start, stop), task in zip(chunks, tasks):
+            yield start, stop, _run_chunk(task)
+
+def run_trials(n_trials, n_bodies, w0, g=9.81, seed=None, memory_budget=64 * 2**20, workers=1,
+               vent_height=0.0, tau=None, k=None, chunks=None):
+    """n_trials denemeyi (her biri n_bodies cisim) hesaplar; deneme başına sonuç dizileri döner (bkz. iter_trials)."""
+    parts = [part for _, _, part in iter_trials(n_trials, n_bodies, w0, g, seed, memory_budget, workers,
+                                                vent_height, tau, k, chunks)]
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+def summarize(values, percentiles=(5, 50, 95)):
+    """Deneme başına değerlerin ortalama, standart sapma, min, max ve yüzdelikleri."""
+    values = np.asarray(values, dtype=float)
+    summary = {'Mean': values.mean(), 'Std Dev': values.std(), 'Min': values.min(), 'Max': values.max()}
+    for p, v in zip(percentiles, np.percentile(values, percentiles)):
+        summary[f'P{p}'] = v
+    return summary
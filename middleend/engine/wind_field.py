@@ -0,0 +1,86 @@
+import os
+import struct
+import zipfile
+
+import numpy as np
+
+from .interpolation import regular_grid_interpolate, axis_spacing
+
+# Izgaralı 3B rüzgar alanı (zaman x yükseklik x X x Y).
+#
+# Rüzgar dizisi (nt, nz, nx, ny, bileşen) boyutundadır ve diskten bellek eşlemeli
+# (memmap) okunur; RAM'den büyük alanlar da kullanılabilir. Partiküller her adımda
+# zaman + trilinear interpolasyonla (toplam 4 eksen) vektörel olarak örnekler.
+#
+# Dosya biçimleri:
+#   .npz: 'wind' dizisi ve 't', 'z', 'x', 'y' eksenleri (np.savez ile sıkıştırmadan
+#         kaydedilmişse 'wind' doğrudan zip içinden memmap edilir)
+#   .npy: sadece 'wind' dizisi; eksenler axes argümanıyla verilir
+
+def save_wind_field(path, wind, t, z, x, y):
+    """Rüzgar alanını memmap ile okunabilecek şekilde (sıkıştırmasız .npz) kaydeder."""
+    np.savez(path, wind=np.asarray(wind, dtype=np.float32), t=t, z=z, x=x, y=y)
+
+def _memmap_npz_member(path, name):
+    """Sıkıştırmasız bir .npz içindeki diziyi kopyalamadan memmap olarak açar; sıkıştırılmışsa None."""
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo(name)
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+    with open(path, 'rb') as f:
+        f.seek(info.header_offset)
+        local_header = f.read(30)
+        name_length, extra_length = struct.unpack('<HH', local_header[26:30])
+        f.seek(info.header_offset + 30 + name_length + extra_length)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape,
+                     order='F' if fortran_order else 'C')
+
+def load_wind_field(path, axes=None):
+    """
+    Rüzgar alanını yükler (veri memmap olarak kalır).
+
+    axes: .npy dosyaları için {'t': ..., 'z': ..., 'x': ..., 'y': ...} eksen dizileri.
+    Dönen sözlük: 'wind' (nt, nz, nx, ny, bileşen), 'origin' ve 'spacing' (t, z, x, y sırasıyla).
+    """
+    if os.path.splitext(path)[1] == '.npz':
+        with np.load(path) as data:
+            axes = {name: np.array(data[name]) for name in ('t', 'z', 'x', 'y')}
+        wind = _memmap_npz_member(path, 'wind.npy')
+        if wind is None:
+            with np.load(path) as data:
+                wind = data['wind']
+    else:
+        if axes is None:
+            raise ValueError(".npy rüzgar alanı için eksenler (axes) verilmelidir.")
+        wind = np.load(path, mmap_mode='r')
+
+    if wind.ndim == 4:
+        wind = wind[..., None]
+    expected = tuple(len(axes[name]) for name in ('t', 'z', 'x', 'y'))
+    if wind.shape[:4] != expected:
+        raise ValueError(f"Rüzgar dizisi boyutu {wind.shape[:4]} eksenlerle {expected} uyuşmuyor.")
+
+    origin, spacing = zip(*(axis_spacing(axes[name]) for name in ('t', 'z', 'x', 'y')))
+    return {'wind': wind, 'origin': origin, 'spacing': spacing}
+
+def sample_wind(field, t, z, x, y):
+    """
+    Rüzgar alanını (t, z, x, y) noktalarında örnekler; (n, bileşen) dizisi döner.
+
+    t skaler (tüm partiküller için aynı an) ya da dizi olabilir.
+    """
+    return regular_grid_interpolate(field['wind'], field['origin'], field['spacing'], (t, z, x, y))
+
+def sample_air_velocity(field, t, positions):
+    """(n, 3) konumlardaki hava hızını (u, v, w) döner; alanda dikey bileşen yoksa w = 0."""
+    wind = sample_wind(field, t, positions[:, 2], positions[:, 0], positions[:, 1])
+    velocity = np.zeros((len(positions), 3))
+    components = min(wind.shape[-1], 3)
+    velocity[:, :components] = wind[:, :components]
+    return velocity
@@ -1,6 +1,7 @@
 import matplotlib.pyplot as plt
 import numpy as np
 import matplotlib.animation as animation
+from engine.heat_field import temperature_field
 
 # Simulation parameters
 vent_radius = 50  # Volcano diameter (m)
@@ -25,25 +26,7 @@ settlements = [
 
 def simulate_volcano(intensity, size, spread, time, vent_radius, vent_height):
     """Simulate volcanic eruption temperature distribution."""
-    # Create a grid of points
-    x = np.linspace(-size, size, 800)  # Increased resolution
-    y = np.linspace(-size, size, 800)
-    x, y = np.meshgrid(x, y)
-
-    # Calculate distance from the center
-    d = np.sqrt(x**2 + y**2)
-
-    # Temperature distribution based on intensity, spread, and time
-    z = intensity * np.exp(-d / spread) * np.exp(-time / 10)
-
-    # Add shockwave effect for dynamic eruption visuals
-    shockwave = np.sin(d - time) * (np.exp(-d / spread) * 0.5)
-    z += shockwave * np.clip(intensity / (time + 1), 0, 1)
-
-    # Incorporate vent-specific effects
-    vent_effect = (vent_radius / (vent_radius + d)) * np.exp(-vent_height / max_height)
-    z += vent_effect
-
+    x, y, z, _ = temperature_field(intensity, size, spread, time, vent_radius, vent_height, max_height)
     return x, y, z
 
 def update_plot(frame, intensity, size, spread, vent_radius, vent_height, plot, settlements):